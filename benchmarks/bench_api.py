@@ -0,0 +1,133 @@
+"""API (rota/api.py) x caminho Streamlit, contra o stand-in local do Supabase.
+
+    python -m benchmarks.bench_api
+    python -m benchmarks.bench_api --requests 5000 --concorrencia 50 --latencia-ms 10 30
+
+API: chama o app ASGI em processo (sem rede), com `--concorrencia` tasks
+simultâneas: GET /lista (com e sem If-None-Match), GET /posicao (com o token
+de sessão de cada usuário) e POST /presenca.
+Streamlit: reruns do script (AppTest) de um usuário logado clicando "ATUALIZAR",
+que é o que o mini-app faz hoje para ver a lista.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from benchmarks.fake_supabase import FakeSupabase, semear
+from benchmarks.bench_caminhos import imprimir, _pct
+from benchmarks.carga_apptest import relogio_lista_aberta, sessao
+
+from rota import api, db, sessao as sessoes
+from rota.ciclo import definir_relogio
+
+
+async def chamar(metodo: str, caminho: str, corpo=None, headers=None, query=b""):
+    enviado = False
+    saida = {}
+
+    async def receive():
+        nonlocal enviado
+        if enviado:
+            return {"type": "http.disconnect"}
+        enviado = True
+        return {"type": "http.request", "body": json.dumps(corpo).encode() if corpo is not None else b"", "more_body": False}
+
+    async def send(msg):
+        if msg["type"] == "http.response.start":
+            saida["status"] = msg["status"]
+            saida["headers"] = dict(msg["headers"])
+        else:
+            saida["body"] = msg.get("body", b"")
+
+    scope = {"type": "http", "method": metodo, "path": caminho, "query_string": query,
+             "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]}
+    await api.app(scope, receive, send)
+    return saida
+
+
+async def rodar_api(nome, total, concorrencia, fabrica):
+    tempos, falhas = [], 0
+    fila = iter(range(total))
+
+    async def worker():
+        nonlocal falhas
+        for i in fila:
+            t0 = time.perf_counter()
+            r = await fabrica(i)
+            tempos.append(time.perf_counter() - t0)
+            if r.get("status", 500) >= 400:
+                falhas += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concorrencia)))
+    dur = time.perf_counter() - t0
+    return {"cenario": nome, "n": total, "ops_s": total / dur if dur else 0.0,
+            "p50_ms": 1000 * _pct(tempos, 0.5), "p95_ms": 1000 * _pct(tempos, 0.95),
+            "max_ms": 1000 * max(tempos) if tempos else 0.0, "req_op": 0.0, "erros_inj": 0, "falhas": falhas}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--concorrencia", type=int, default=32)
+    ap.add_argument("--usuarios", type=int, default=500)
+    ap.add_argument("--presencas", type=int, default=60)
+    ap.add_argument("--latencia-ms", type=float, nargs=2, default=(5.0, 20.0), metavar=("MIN", "MAX"))
+    ap.add_argument("--reruns-streamlit", type=int, default=30)
+    args = ap.parse_args(argv)
+
+    fake = FakeSupabase(latencia_ms=tuple(args.latencia_ms))
+    semear(fake, usuarios=args.usuarios, presencas=args.presencas)
+    db.definir_cliente(fake)
+    definir_relogio(relogio_lista_aberta())
+    usuarios = [u for u in fake.linhas("usuarios") if u["status"] == "ATIVO"]
+    livres = usuarios[args.presencas:]
+    os.environ.setdefault("ROTA_SESSAO_SEGREDO", "bench-api")
+    tokens = [sessoes.emitir(u) for u in usuarios]
+    linhas = []
+
+    async def cenarios():
+        etag = (await chamar("GET", "/lista"))["headers"][b"etag"].decode()
+        for nome, fab in [
+            ("api GET /lista", lambda i: chamar("GET", "/lista")),
+            ("api GET /lista 304", lambda i: chamar("GET", "/lista", headers={"If-None-Match": etag})),
+            ("api GET /posicao", lambda i: chamar("GET", "/posicao", headers={"Authorization": f"Bearer {tokens[i % len(tokens)]}"})),
+        ]:
+            fake.zerar_contadores()
+            r = await rodar_api(nome, args.requests, args.concorrencia, fab)
+            r["req_op"] = fake.total_requests() / args.requests
+            linhas.append(r)
+        n_post = min(len(livres), max(1, args.requests // 10))
+        fake.zerar_contadores()
+        r = await rodar_api("api POST /presenca", n_post, args.concorrencia, lambda i: chamar(
+            "POST", "/presenca", corpo={"email": livres[i]["email"], "telefone": livres[i]["telefone"], "senha": livres[i]["senha"]}))
+        r["req_op"] = fake.total_requests() / n_post
+        linhas.append(r)
+
+    asyncio.run(cenarios())
+
+    # Streamlit: mesmo usuário logado clicando ATUALIZAR (rerun completo do script)
+    fake.zerar_contadores()
+    tempos = []
+    for i in range(args.reruns_streamlit):
+        t, _ = sessao(usuarios[i % len(usuarios)], 60.0)
+        tempos.append(t.get("atualizar", 0.0))
+    linhas.append({"cenario": "streamlit ATUALIZAR", "n": len(tempos),
+                   "ops_s": len(tempos) / sum(tempos) if sum(tempos) else 0.0,
+                   "p50_ms": 1000 * _pct(tempos, 0.5), "p95_ms": 1000 * _pct(tempos, 0.95),
+                   "max_ms": 1000 * max(tempos) if tempos else 0.0,
+                   "req_op": fake.total_requests() / max(1, len(tempos)), "erros_inj": 0, "falhas": 0})
+
+    print(f"\nrequests={args.requests} concorrencia={args.concorrencia} latencia_ms={tuple(args.latencia_ms)}\n")
+    imprimir(linhas)
+    print("\n(req_op da linha streamlit inclui abrir + login + confirmar + atualizar + pdf de cada sessão)")
+    definir_relogio(None)
+    db.definir_cliente(None)
+    return linhas
+
+
+if __name__ == "__main__":
+    main()
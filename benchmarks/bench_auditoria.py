@@ -0,0 +1,84 @@
+"""Auditoria: custo no clique e garantias do buffer (rota/auditoria.py).
+
+    python -m benchmarks.bench_auditoria
+    python -m benchmarks.bench_auditoria --eventos 5000 --threads 20 --latencia-ms 20 60
+
+Compara o tempo que o handler gasta para registrar um evento com insert
+direto (um request por evento) x buffer (o insert fica com a thread), e mede
+quanto o buffer leva para escoar uma rajada com o banco lento. As garantias
+do buffer (fechamento, buffer cheio, banco fora) estão em tests/test_auditoria.py.
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.bench_caminhos import _pct
+
+from rota import db
+from rota.auditoria import BufferAuditoria
+from rota.ciclo import br_now
+
+
+def _evento(i: int) -> dict:
+    return {"em": br_now().isoformat(), "ator": f"u{i:05d}@exemplo.com", "acao": "presenca_confirmada",
+            "alvo": None, "rota": "nova-iguacu", "detalhes": {"i": i}}
+
+
+def tempo_no_clique(registrar, eventos: int, threads: int) -> list:
+    tempos, lock = [], threading.Lock()
+
+    def clique(i):
+        t0 = time.perf_counter()
+        registrar(_evento(i))
+        with lock:
+            tempos.append(time.perf_counter() - t0)
+
+    with ThreadPoolExecutor(max_workers=threads) as ex:
+        list(ex.map(clique, range(eventos)))
+    return tempos
+
+
+def tempo_de_descarga(fake, eventos: int, lote: int):
+    """Rajada de `eventos` registros: segundos até o último chegar ao banco e quantos inserts."""
+    fake.linhas("auditoria").clear()
+    fake.zerar_contadores()
+    buf = BufferAuditoria(capacidade=eventos * 2, lote=lote, intervalo=0.2)
+    t0 = time.perf_counter()
+    for i in range(eventos):
+        buf.registrar(_evento(i))
+    limite = time.monotonic() + 60
+    while len(fake.linhas("auditoria")) < eventos and time.monotonic() < limite:
+        time.sleep(0.005)
+    gasto = time.perf_counter() - t0
+    buf.fechar()
+    return gasto, fake.requests[("auditoria", "insert")]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--eventos", type=int, default=2000)
+    ap.add_argument("--threads", type=int, default=20)
+    ap.add_argument("--latencia-ms", type=float, nargs=2, default=(10.0, 30.0), metavar=("MIN", "MAX"))
+    args = ap.parse_args(argv)
+
+    fake = FakeSupabase(latencia_ms=tuple(args.latencia_ms), conexoes=10)
+    db.definir_cliente(fake)
+
+    direto = tempo_no_clique(lambda ev: db.auditoria_insert([ev]), args.eventos // 10, args.threads)
+    buf = BufferAuditoria()
+    bufferizado = tempo_no_clique(buf.registrar, args.eventos, args.threads)
+    buf.fechar()
+    print(f"\neventos={args.eventos} threads={args.threads} latencia_ms={tuple(args.latencia_ms)}\n")
+    print(f"{'cenario':<16} {'n':>6} {'p50_us':>10} {'p99_us':>10}")
+    for nome, t in (("insert direto", direto), ("buffer", bufferizado)):
+        print(f"{nome:<16} {len(t):>6} {1e6 * _pct(t, 0.5):>10.1f} {1e6 * _pct(t, 0.99):>10.1f}")
+    gasto, inserts = tempo_de_descarga(fake, args.eventos, 100)
+    print(f"\nrajada de {args.eventos}: no banco em {gasto * 1000:.0f} ms, {inserts} inserts (lote 100)")
+    db.definir_cliente(None)
+
+
+if __name__ == "__main__":
+    main()
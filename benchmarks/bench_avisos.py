@@ -0,0 +1,214 @@
+"""Avisos de promoção do excedente (rota/avisos.py) contra o stand-in local.
+
+    python -m benchmarks.bench_avisos
+    python -m benchmarks.bench_avisos --inscritos 500 --vagas 38 --latencia-ms 20 60
+
+Mede quanto `observar` acrescenta à ordenação de uma versão da lista e
+confere, com `assert`:
+
+- detecção: excluídas k presenças com vaga, exatamente os k primeiros "Exc-"
+  da versão anterior são avisados (e ninguém num ciclo novo);
+- de-duplicação: duas réplicas que veem a mesma troca de versão enfileiram
+  um aviso por promoção, e três entregadores ao mesmo tempo mandam cada
+  e-mail uma vez só;
+- lotes: N avisos saem em ceil(N / lote) conexões SMTP;
+- falha do SMTP: o lote volta para a fila e sai na tentativa seguinte;
+- thread: do `observar` ao envio sem ninguém recarregar a página.
+"""
+
+import argparse
+import math
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from benchmarks.fake_supabase import FakeSupabase, semear, _quando
+from benchmarks.bench_caminhos import _pct
+
+from rota import avisos, db
+from rota.avisos import Carteiro
+from rota.constantes import ROTA_PADRAO
+from rota.modelos import Rota
+from rota.ordenacao import ordenar_presencas
+
+
+class Correio:
+    """Stand-in do SMTP: conta conexões (lotes) e e-mails por destinatário."""
+
+    def __init__(self, latencia: float = 0.0, falhar: int = 0):
+        self.latencia = latencia
+        self.falhar = falhar
+        self.lotes = 0
+        self.enviados = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, lote):
+        time.sleep(self.latencia)
+        with self._lock:
+            if self.falhar:
+                self.falhar -= 1
+                raise ConnectionError("Connection unexpectedly closed")
+            self.lotes += 1
+            self.enviados.update(a["destino"] for a in lote)
+        return [None] * len(lote)
+
+
+def _lista(fake, rota):
+    df_o, _ = ordenar_presencas(fake.linhas("presencas"), rota.vagas)
+    return df_o
+
+
+def _excluir_sentados(fake, df_o, k: int) -> list:
+    """Apaga as k primeiras vagas; devolve os e-mails dos k primeiros "Exc-" (que devem subir)."""
+    sai = set(df_o["EMAIL"].iloc[:k])
+    sobem = [e for n, e in zip(df_o["Nº"], df_o["EMAIL"]) if n.startswith("Exc-")][:k]
+    ps = fake.linhas("presencas")
+    ps[:] = [p for p in ps if p["email"] not in sai]
+    return sobem
+
+
+def _novo_cenario(fake, inscritos: int):
+    for t in ("presencas", "avisos", "usuarios", "config"):
+        fake.linhas(t).clear()
+    semear(fake, usuarios=inscritos, presencas=inscritos)
+    avisos._anteriores.clear()
+
+
+def checar_deteccao(fake, rota, inscritos: int, k: int = 5):
+    _novo_cenario(fake, inscritos)
+    c = Carteiro(entregar=False)
+    df1 = _lista(fake, rota)
+    avisos.observar(rota, 1, df1, carteiro=c)
+    sobem = _excluir_sentados(fake, df1, k)
+    avisos.observar(rota, 2, _lista(fake, rota), carteiro=c)
+    c.gravar()
+    assert sorted(a["destino"] for a in fake.linhas("avisos")) == sorted(sobem), "promovidos errados"
+
+    # ciclo novo: as mesmas pessoas confirmam de novo (outro horário) -> nenhuma promoção
+    for p in fake.linhas("presencas"):
+        p["data_hora"] = (_quando(p["data_hora"]) + timedelta(hours=12)).isoformat()
+    avisos.observar(rota, 3, _lista(fake, rota), carteiro=c)
+    c.gravar()
+    assert len(fake.linhas("avisos")) == k, "confirmação de um ciclo novo virou promoção"
+    c.fechar()
+    return f"ok: {k} vagas liberadas -> {k} avisos, para os {k} primeiros do excedente; ciclo novo sem avisos"
+
+
+def checar_deduplicacao(fake, rota, inscritos: int, k: int = 5):
+    _novo_cenario(fake, inscritos)
+    df1 = _lista(fake, rota)
+    _excluir_sentados(fake, df1, k)
+    df2 = _lista(fake, rota)
+    replicas = [Carteiro(entregar=False) for _ in range(2)]
+    for c in replicas:
+        # cada réplica com a própria memória da versão anterior
+        avisos._anteriores.clear()
+        avisos.observar(rota, 1, df1, carteiro=c)
+        avisos.observar(rota, 2, df2, carteiro=c)
+        c.gravar()
+    assert len(fake.linhas("avisos")) == k, len(fake.linhas("avisos"))
+
+    correio = Correio(latencia=0.05)
+    entregadores = [Carteiro(lote=2, enviar=correio, entregar=True) for _ in range(3)]
+    ts = [threading.Thread(target=c.entregar) for c in entregadores]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    assert len(correio.enviados) == k and set(correio.enviados.values()) == {1}, correio.enviados
+    assert all(a.get("enviado_em") for a in fake.linhas("avisos"))
+    return f"ok: 2 réplicas x {k} promoções -> {k} avisos; 3 entregadores -> cada e-mail 1 vez"
+
+
+def checar_lotes(fake, rota, inscritos: int, lote: int):
+    _novo_cenario(fake, inscritos)
+    k = min(inscritos - rota.vagas, rota.vagas)
+    c = Carteiro(lote=lote, entregar=True, enviar=(correio := Correio()))
+    df1 = _lista(fake, rota)
+    avisos.observar(rota, 1, df1, carteiro=c)
+    _excluir_sentados(fake, df1, k)
+    avisos.observar(rota, 2, _lista(fake, rota), carteiro=c)
+    c.gravar()
+    fake.zerar_contadores()
+    n = c.entregar()
+    assert n == k and correio.lotes == math.ceil(k / lote), (n, correio.lotes)
+    c.fechar()
+    return f"ok: {k} avisos em {correio.lotes} conexões SMTP (lote {lote}), {fake.total_requests()} requests ao banco"
+
+
+def checar_falha(fake, rota, inscritos: int):
+    _novo_cenario(fake, inscritos)
+    correio = Correio(falhar=1)
+    c = Carteiro(lote=10, entregar=True, enviar=correio, prazo=0)
+    df1 = _lista(fake, rota)
+    avisos.observar(rota, 1, df1, carteiro=c)
+    _excluir_sentados(fake, df1, 3)
+    avisos.observar(rota, 2, _lista(fake, rota), carteiro=c)
+    c.gravar()
+    assert c.entregar() == 0 and all(a.get("erro") for a in fake.linhas("avisos"))
+    assert c.entregar() == 3
+    assert all(a["tentativas"] == 2 and a["enviado_em"] for a in fake.linhas("avisos"))
+    c.fechar()
+    return "ok: SMTP caiu no 1º lote; os 3 avisos saíram na 2ª tentativa"
+
+
+def checar_thread(fake, rota, inscritos: int):
+    _novo_cenario(fake, inscritos)
+    correio = Correio()
+    c = Carteiro(espera=0.1, entregar=True, enviar=correio)
+    df1 = _lista(fake, rota)
+    avisos.observar(rota, 1, df1, carteiro=c)
+    sobem = _excluir_sentados(fake, df1, 2)
+    df2 = _lista(fake, rota)
+    t0 = time.perf_counter()
+    avisos.observar(rota, 2, df2, carteiro=c)
+    clique = time.perf_counter() - t0
+    limite = time.monotonic() + 10
+    while sum(correio.enviados.values()) < 2 and time.monotonic() < limite:
+        time.sleep(0.01)
+    gasto = time.perf_counter() - t0
+    assert sorted(correio.enviados) == sorted(sobem), correio.enviados
+    c.fechar()
+    return f"ok: observar {clique * 1000:.2f} ms (não espera o banco); e-mails enviados {gasto * 1000:.0f} ms depois"
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--inscritos", type=int, default=120)
+    ap.add_argument("--vagas", type=int, default=38)
+    ap.add_argument("--lote", type=int, default=20)
+    ap.add_argument("--repeticoes", type=int, default=50)
+    ap.add_argument("--latencia-ms", type=float, nargs=2, default=(10.0, 30.0), metavar=("MIN", "MAX"))
+    args = ap.parse_args(argv)
+
+    fake = FakeSupabase(latencia_ms=tuple(args.latencia_ms))
+    db.definir_cliente(fake)
+    rota = Rota(id=ROTA_PADRAO, vagas=args.vagas)
+
+    _novo_cenario(fake, args.inscritos)
+    c = Carteiro(entregar=False)
+    ordenar, observar = [], []
+    for v in range(args.repeticoes):
+        t0 = time.perf_counter()
+        df = _lista(fake, rota)
+        t1 = time.perf_counter()
+        avisos.observar(rota, v, df, carteiro=c)
+        ordenar.append(t1 - t0)
+        observar.append(time.perf_counter() - t1)
+    c.fechar()
+    print(f"\ninscritos={args.inscritos} vagas={args.vagas} latencia_ms={tuple(args.latencia_ms)}\n")
+    print(f"{'etapa':<22} {'p50_ms':>8} {'p99_ms':>8}")
+    for nome, t in (("ordenar_presencas", ordenar), ("avisos.observar", observar)):
+        print(f"{nome:<22} {1e3 * _pct(t, 0.5):>8.2f} {1e3 * _pct(t, 0.99):>8.2f}")
+    print()
+    print("detecção:      ", checar_deteccao(fake, rota, args.inscritos))
+    print("de-duplicação: ", checar_deduplicacao(fake, rota, args.inscritos))
+    print("lotes:         ", checar_lotes(fake, rota, args.inscritos, args.lote))
+    print("falha SMTP:    ", checar_falha(fake, rota, args.inscritos))
+    print("thread:        ", checar_thread(fake, rota, args.inscritos))
+    db.definir_cliente(None)
+
+
+if __name__ == "__main__":
+    main()
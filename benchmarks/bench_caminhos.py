@@ -0,0 +1,149 @@
+"""Benchmark offline dos caminhos reais do app contra o stand-in local do Supabase.
+
+Roda sem rede e sem secrets: injeta `FakeSupabase` via `rota.db.definir_cliente`.
+
+    python -m benchmarks.bench_caminhos
+    python -m benchmarks.bench_caminhos --usuarios 5000 --presencas 80 --latencia-ms 10 30 --erro 0.03
+
+Cenários: login (email+telefone), cadastro (com parte das tentativas duplicadas),
+presença (select + ordenação + PDF), ADM "ativar todos" e virada de ciclo.
+"""
+
+import argparse
+import random
+import statistics
+import time
+from datetime import timedelta
+
+import pandas as pd
+
+from benchmarks.fake_supabase import FakeSupabase, semear, usuario_fake, FUSO_BR
+
+from rota import db
+from rota.ciclo import br_now, ciclo_expirado, limpar_ciclo
+from rota.constantes import ROTA_PADRAO
+from rota.ordenacao import montar_linhas_presenca, aplicar_ordenacao
+from rota.pdf import gerar_pdf_apresentado
+from rota.usuarios import buscar_user_by_email_tel, cadastrar_usuario, ativar_todos
+
+
+def _pct(vals, p):
+    if not vals:
+        return 0.0
+    s = sorted(vals)
+    return s[min(len(s) - 1, int(round(p * (len(s) - 1))))]
+
+
+def executar(nome, fake, fn, repeticoes, preparo=None):
+    tempos, erros = [], 0
+    fake.zerar_contadores()
+    inicio = time.perf_counter()
+    for i in range(repeticoes):
+        if preparo:
+            preparo(i)
+        t0 = time.perf_counter()
+        try:
+            fn(i)
+        except Exception:
+            erros += 1
+        tempos.append(time.perf_counter() - t0)
+    total = time.perf_counter() - inicio
+    return {
+        "cenario": nome,
+        "n": repeticoes,
+        "ops_s": repeticoes / sum(tempos) if sum(tempos) else 0.0,
+        "p50_ms": 1000 * _pct(tempos, 0.50),
+        "p95_ms": 1000 * _pct(tempos, 0.95),
+        "max_ms": 1000 * max(tempos) if tempos else 0.0,
+        "media_ms": 1000 * statistics.mean(tempos) if tempos else 0.0,
+        "req_op": fake.total_requests() / repeticoes if repeticoes else 0.0,
+        "erros_inj": fake.erros_injetados,
+        "falhas": erros,
+        "total_s": total,
+    }
+
+
+COLUNAS = [
+    ("cenario", 22, "{:<22}"), ("n", 5, "{:>5}"), ("ops_s", 9, "{:>9.1f}"), ("p50_ms", 9, "{:>9.2f}"),
+    ("p95_ms", 9, "{:>9.2f}"), ("max_ms", 9, "{:>9.2f}"), ("req_op", 7, "{:>7.1f}"),
+    ("erros_inj", 9, "{:>9}"), ("falhas", 6, "{:>6}"),
+]
+
+
+def imprimir(linhas, colunas=COLUNAS):
+    print(" ".join(f"{c:<{w}}" if i == 0 else f"{c:>{w}}" for i, (c, w, _) in enumerate(colunas)))
+    for l in linhas:
+        print(" ".join(f.format(l[c]) for c, _, f in colunas))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--usuarios", type=int, default=1000)
+    ap.add_argument("--presencas", type=int, default=60)
+    ap.add_argument("--latencia-ms", type=float, nargs=2, default=(2.0, 8.0), metavar=("MIN", "MAX"))
+    ap.add_argument("--erro", type=float, default=0.0, help="probabilidade de 429/5xx por request")
+    ap.add_argument("--repeticoes", type=int, default=50)
+    args = ap.parse_args(argv)
+
+    # backoff curto: queremos medir o custo do retry, não esperar segundos
+    db.SB_BACKOFF_BASE, db.SB_BACKOFF_MAX, db.SB_JITTER = 0.005, 0.05, 0.002
+
+    fake = FakeSupabase(latencia_ms=tuple(args.latencia_ms), taxa_erro=args.erro)
+    semear(fake, usuarios=args.usuarios, presencas=args.presencas)
+    db.definir_cliente(fake)
+    rnd = random.Random(1)
+    usuarios = list(fake.linhas("usuarios"))
+    n = args.repeticoes
+    linhas = []
+
+    def login(i):
+        u = rnd.choice(usuarios)
+        assert buscar_user_by_email_tel(u["email"], u["telefone"]) is not None
+
+    def cadastro(i):
+        # gate do limite (count exato) + insert protegido pelos índices únicos;
+        # 1 em cada 5 tenta um e-mail já existente (caminho do conflito)
+        db.usuarios_contar()
+        novo = usuario_fake(10 ** 6 + i, rnd)
+        if i % 5 == 0:
+            novo["email"] = rnd.choice(usuarios)["email"]
+        cadastrar_usuario(novo)
+
+    def presenca(i):
+        dados = montar_linhas_presenca(db.presenca_select())
+        df_o, _ = aplicar_ordenacao(pd.DataFrame(dados[1:], columns=dados[0]))
+        gerar_pdf_apresentado(df_o, {"inscritos": len(df_o), "vagas": 38})
+
+    def ativar(i):
+        ativar_todos(db.usuarios_select())
+
+    ontem = br_now() - timedelta(days=1)
+
+    def preparar_reset(i):
+        fake.linhas("presencas").clear()
+        for j, u in enumerate(usuarios[:args.presencas]):
+            fake.linhas("presencas").append({
+                "id": j + 1, "rota": ROTA_PADRAO, "usuario_id": u["id"], "email": u["email"], "nome": u["nome"],
+                "graduacao": u["graduacao"], "lotacao": u["lotacao"], "origem": u["origem"],
+                "data_hora": (ontem + timedelta(seconds=j)).astimezone(FUSO_BR).isoformat(),
+            })
+
+    def reset(i):
+        rows = db.presenca_select()
+        if ciclo_expirado(rows):
+            limpar_ciclo()
+
+    linhas.append(executar("login", fake, login, n))
+    linhas.append(executar("cadastro", fake, cadastro, n))
+    linhas.append(executar("presenca+ordem+pdf", fake, presenca, n))
+    linhas.append(executar("adm_ativar_todos", fake, ativar, max(1, n // 10)))
+    linhas.append(executar("virada_ciclo", fake, reset, max(1, n // 5), preparo=preparar_reset))
+
+    print(f"\nusuarios={args.usuarios} presencas={args.presencas} latencia_ms={tuple(args.latencia_ms)} erro={args.erro}\n")
+    imprimir(linhas)
+    db.definir_cliente(None)
+    return linhas
+
+
+if __name__ == "__main__":
+    main()
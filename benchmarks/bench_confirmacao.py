@@ -0,0 +1,99 @@
+"""Rush da abertura da lista: inserts individuais x group commit (rota/confirmacao.py).
+
+    python -m benchmarks.bench_confirmacao
+    python -m benchmarks.bench_confirmacao --cliques 200 --threads 50 --latencia-ms 10 30
+
+`--cliques` usuários confirmam presença a partir de `--threads` threads ao
+mesmo tempo, contra o stand-in local do Supabase com um pool de `--conexoes` requests
+simultâneos (como o PostgREST). Relata vazão, latência por
+clique, requests ao banco e se a ordem de inserção (id) seguiu a ordem dos
+cliques (data_hora).
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from benchmarks.fake_supabase import FakeSupabase, semear, FUSO_BR
+from benchmarks.bench_caminhos import imprimir, _pct
+
+from rota import db
+from rota.confirmacao import LoteConfirmacoes
+from rota.usuarios import linha_presenca
+
+
+def rodar(nome, inserir, fake, usuarios, threads):
+    fake.linhas("presencas").clear()
+    fake.zerar_contadores()
+    base = datetime.now(FUSO_BR)
+    seq = iter(range(len(usuarios)))
+    lock = threading.Lock()
+    tempos, falhas = [], 0
+
+    def clique(u):
+        nonlocal falhas
+        with lock:
+            # data_hora estritamente crescente na ordem de chegada do clique
+            row = linha_presenca(u, (base + timedelta(microseconds=next(seq))).isoformat())
+        t0 = time.perf_counter()
+        try:
+            inserir(row)
+        except Exception:
+            with lock:
+                falhas += 1
+        with lock:
+            tempos.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as ex:
+        list(ex.map(clique, usuarios))
+    total = time.perf_counter() - t0
+
+    linhas = sorted(fake.linhas("presencas"), key=lambda r: r["id"])
+    inversoes = sum(1 for a, b in zip(linhas, linhas[1:]) if a["data_hora"] > b["data_hora"])
+    return {
+        "cenario": nome, "n": len(usuarios), "ops_s": len(usuarios) / total if total else 0.0,
+        "p50_ms": 1000 * _pct(tempos, 0.5), "p95_ms": 1000 * _pct(tempos, 0.95),
+        "max_ms": 1000 * max(tempos) if tempos else 0.0,
+        "req_op": fake.total_requests() / max(1, len(usuarios)),
+        "erros_inj": fake.erros_injetados, "falhas": falhas, "inversoes": inversoes,
+        "gravadas": len(linhas),
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--cliques", type=int, default=120)
+    ap.add_argument("--threads", type=int, default=40)
+    ap.add_argument("--latencia-ms", type=float, nargs=2, default=(5.0, 20.0), metavar=("MIN", "MAX"))
+    ap.add_argument("--erro", type=float, default=0.0)
+    ap.add_argument("--janela-ms", type=float, default=20.0)
+    ap.add_argument("--conexoes", type=int, default=10, help="requests simultâneos que o banco atende (0 = sem limite)")
+    args = ap.parse_args(argv)
+
+    db.SB_BACKOFF_BASE, db.SB_BACKOFF_MAX, db.SB_JITTER = 0.005, 0.05, 0.002
+    fake = FakeSupabase(latencia_ms=tuple(args.latencia_ms), taxa_erro=args.erro, conexoes=args.conexoes)
+    semear(fake, usuarios=args.cliques, presencas=0)
+    db.definir_cliente(fake)
+    usuarios = list(fake.linhas("usuarios"))
+
+    lote = LoteConfirmacoes(janela=args.janela_ms / 1000.0)
+    linhas = [
+        rodar("insert por clique", db.presenca_insert, fake, usuarios, args.threads),
+        rodar("group commit", lote.inserir, fake, usuarios, args.threads),
+    ]
+
+    print(f"\ncliques={args.cliques} threads={args.threads} latencia_ms={tuple(args.latencia_ms)} "
+          f"erro={args.erro} janela_ms={args.janela_ms} conexoes={args.conexoes}\n")
+    imprimir(linhas)
+    print()
+    for l in linhas:
+        print(f"  {l['cenario']:<20} gravadas={l['gravadas']} inversões de ordem (id x data_hora)={l['inversoes']}")
+    db.definir_cliente(None)
+    return linhas
+
+
+if __name__ == "__main__":
+    main()
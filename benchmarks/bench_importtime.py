@@ -0,0 +1,74 @@
+"""Custo de import (cold start) de cada tela, medido com `python -X importtime`.
+
+    python -m benchmarks.bench_importtime
+    python -m benchmarks.bench_importtime --repeticoes 7
+
+Cada alvo roda num processo novo. Mostra o tempo cumulativo (mediana) e quais
+dependências pesadas entraram no caminho. "monolito" reproduz o que o app.py
+antigo importava no topo antes de desenhar o formulário de login.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ALVOS = [
+    ("streamlit (base)", "import streamlit"),
+    ("monolito (antigo)", "import streamlit, pandas, fpdf, supabase, smtplib, email.message"),
+    ("login / publico", "import rota.ui.publico"),
+    ("painel adm", "import rota.ui.admin"),
+    ("usuario logado", "import rota.ui.usuario"),
+    ("pdf sob demanda", "import rota.pdf"),
+    ("smtp sob demanda", "import rota.correio, smtplib, email.message"),
+]
+PESADOS = ["pandas", "fpdf", "supabase", "smtplib", "email.message", "postgrest"]
+
+_LINHA = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def medir(codigo: str):
+    """(total_us, modulos_importados) de um processo novo executando `codigo`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=RAIZ, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "falhou")
+    total, modulos = 0, set()
+    for linha in proc.stderr.splitlines():
+        m = _LINHA.match(linha)
+        if not m:
+            continue
+        modulos.add(m.group(4))
+        # só os imports de nível 0 somam no total (os aninhados já estão no cumulativo)
+        if len(m.group(3)) == 1:
+            total += int(m.group(2))
+    return total, modulos
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeticoes", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    print(f"\n{'alvo':<20} {'mediana_ms':>10} {'min_ms':>8}  pesados carregados")
+    for nome, codigo in ALVOS:
+        try:
+            amostras, modulos = [], set()
+            for _ in range(args.repeticoes):
+                us, modulos = medir(codigo)
+                amostras.append(us / 1000.0)
+        except RuntimeError as ex:
+            print(f"{nome:<20} {'erro':>10}  {ex}")
+            continue
+        pesados = [p for p in PESADOS if p in modulos]
+        print(f"{nome:<20} {statistics.median(amostras):>10.1f} {min(amostras):>8.1f}  {', '.join(pesados) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
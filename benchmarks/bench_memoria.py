@@ -0,0 +1,95 @@
+"""Memória dos registros de usuário: dicts por sessão x `Usuario` compartilhado.
+
+    python -m benchmarks.bench_memoria
+    python -m benchmarks.bench_memoria --usuarios 1000 --sessoes 100
+
+Medido com `tracemalloc`, sem Streamlit:
+
+- "dict por sessão": o que o app fazia. Cada sessão recebe a cópia do cache
+  (`st.cache_data` desserializa a cada chamada), mapeia tudo para dicts de
+  12 chaves e guarda mais um dict em `usuario_logado`.
+- "Usuario compartilhado": uma tupla de `Usuario` por refresh do cache
+  (`st.cache_resource`) e, por sessão, só a referência ao próprio registro.
+"""
+
+import argparse
+import pickle
+import random
+import time
+import tracemalloc
+
+from benchmarks.fake_supabase import usuario_fake
+
+from rota.modelos import Usuario
+
+
+def _ui_dict_antigo(u: dict) -> dict:
+    # cópia do user_to_ui_dict antigo (dict de 12 chaves por usuário)
+    return {
+        "Nome": u.get("nome") or "",
+        "Graduação": u.get("graduacao") or "",
+        "Lotação": u.get("lotacao") or "",
+        "Senha": u.get("senha") or "",
+        "QG_RMCF_OUTROS": u.get("origem") or "",
+        "Email": u.get("email") or "",
+        "TELEFONE": u.get("telefone") or "",
+        "STATUS": u.get("status") or "PENDENTE",
+        "TEMP_SENHA": u.get("temp_senha") or "",
+        "TEMP_EXPIRA": u.get("temp_expira") or "",
+        "TEMP_USADA": u.get("temp_usada") if u.get("temp_usada") is not None else "",
+        "id": u.get("id"),
+    }
+
+
+def dict_por_sessao(cache_serializado: bytes, sessoes: int):
+    estado = []
+    for s in range(sessoes):
+        raw = pickle.loads(cache_serializado)
+        lista = [_ui_dict_antigo(u) for u in raw]
+        estado.append({"lista": lista, "usuario_logado": dict(lista[s % len(lista)])})
+    return estado
+
+
+def usuario_compartilhado(cache_serializado: bytes, sessoes: int):
+    registros = tuple(Usuario.de_linha(u) for u in pickle.loads(cache_serializado))
+    return [{"lista": registros, "usuario_logado": registros[s % len(registros)]} for s in range(sessoes)]
+
+
+def medir(fn, *args):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    vivo = fn(*args)
+    dur = time.perf_counter() - t0
+    atual, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del vivo
+    return atual, pico, dur
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--usuarios", type=int, default=1000)
+    ap.add_argument("--sessoes", type=int, default=100)
+    args = ap.parse_args(argv)
+
+    rnd = random.Random(7)
+    raw = []
+    for i in range(args.usuarios):
+        u = usuario_fake(i, rnd)
+        u["id"] = i + 1
+        raw.append(u)
+    cache_serializado = pickle.dumps(raw)
+
+    print(f"\nusuarios={args.usuarios} sessoes={args.sessoes}\n")
+    print(f"{'modelo':<24} {'retido_MB':>10} {'pico_MB':>9} {'bytes/usr/sessao':>17} {'tempo_ms':>9}")
+    linhas = []
+    for nome, fn in [("dict por sessao", dict_por_sessao), ("Usuario compartilhado", usuario_compartilhado)]:
+        atual, pico, dur = medir(fn, cache_serializado, args.sessoes)
+        por = atual / max(1, args.usuarios * args.sessoes)
+        print(f"{nome:<24} {atual / 2 ** 20:>10.2f} {pico / 2 ** 20:>9.2f} {por:>17.1f} {1000 * dur:>9.1f}")
+        linhas.append({"modelo": nome, "retido": atual, "pico": pico, "tempo_s": dur})
+    return linhas
+
+
+if __name__ == "__main__":
+    main()
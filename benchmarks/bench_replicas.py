@@ -0,0 +1,137 @@
+"""Várias réplicas do app lendo a lista: cache por processo x cache compartilhado (Redis).
+
+    python -m benchmarks.bench_replicas
+    python -m benchmarks.bench_replicas --replicas 4 --sessoes 20 --duracao 10
+
+Cada réplica é um processo separado com o próprio stand-in do Supabase (mesmos
+dados) e `--sessoes` threads fazendo o que um rerun da tela do usuário faz:
+versão da lista -> lista ordenada da versão -> total de usuários. No meio do
+teste o processo principal chama `.clear()` nas leituras, como faz um
+"ATUALIZAR" ou uma confirmação de presença em alguma réplica.
+
+Modos:
+- memoria: padrão do app, cada réplica busca e ordena por conta própria e o
+  `.clear()` só vale para quem chamou;
+- redis: todas apontam para o mesmo servidor (`benchmarks/fake_redis.py`),
+  com chaves versionadas e invalidação por pub/sub.
+"""
+
+import os
+
+os.environ.setdefault("ROTA_METRICAS", "1")
+
+import argparse
+import json
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.fake_redis import FakeRedis
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def replica(args):
+    # processo filho: uma réplica do app
+    from benchmarks.fake_supabase import FakeSupabase, semear
+    from rota import db, metricas
+    from rota.constantes import ROTA_PADRAO
+    from rota.modelos import ROTA_UNICA
+    from rota.ui.usuario import _lista_ordenada
+
+    fake = FakeSupabase(latencia_ms=tuple(args.latencia_ms))
+    semear(fake, usuarios=args.usuarios, presencas=args.presencas)
+    db.definir_cliente(fake)
+    fake.zerar_contadores()
+    reruns = [0]
+    lock = threading.Lock()
+    fim = time.monotonic() + args.duracao
+
+    def sessao():
+        while time.monotonic() < fim:
+            v = db.buscar_presenca_versao(ROTA_PADRAO)
+            if v >= 0:
+                _lista_ordenada(ROTA_PADRAO, v, ROTA_UNICA)
+            db.buscar_total_usuarios()
+            with lock:
+                reruns[0] += 1
+            time.sleep(args.intervalo_ms / 1000.0)
+
+    ts = [threading.Thread(target=sessao) for _ in range(args.sessoes)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    cont = metricas.contadores()
+    print(json.dumps({
+        "reruns": reruns[0],
+        "db": fake.total_requests(),
+        "backend_hits": sum(v for (n, _), v in cont.items() if n == "cache_backend_hit"),
+        "invalidacoes": sum(v for (n, _), v in cont.items() if n == "cache_invalidacao_recebida"),
+        "erros": sum(v for (n, _), v in cont.items() if n == "cache_backend_erro"),
+    }))
+
+
+def rodar_modo(nome, url, args):
+    env = dict(os.environ, ROTA_CACHE_URL=url)
+    cmd = [sys.executable, "-m", "benchmarks.bench_replicas", "--replica",
+           "--usuarios", str(args.usuarios), "--presencas", str(args.presencas),
+           "--sessoes", str(args.sessoes), "--duracao", str(args.duracao),
+           "--intervalo-ms", str(args.intervalo_ms), "--latencia-ms", *map(str, args.latencia_ms)]
+    procs = [subprocess.Popen(cmd, cwd=RAIZ, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+             for _ in range(args.replicas)]
+
+    limpezas = 0
+    if url:
+        # "outra réplica" confirmando presença: invalida para o cluster inteiro
+        from rota import cache, db
+        from rota.constantes import ROTA_PADRAO
+        cache.definir_backend(cache.RedisBackend(url))
+        time.sleep(args.duracao / 3)
+        for _ in range(args.limpezas):
+            db.buscar_presenca_versao.clear(ROTA_PADRAO)
+            db.buscar_total_usuarios.clear()
+            limpezas += 1
+            time.sleep(args.duracao / (3 * max(1, args.limpezas)))
+        cache.definir_backend(None)
+
+    res = [json.loads(p.communicate()[0].strip().splitlines()[-1]) for p in procs]
+    total = {k: sum(r[k] for r in res) for k in res[0]}
+    return {"modo": nome, "replicas": args.replicas, "limpezas": limpezas, **total,
+            "db_por_rerun": total["db"] / max(1, total["reruns"])}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--replica", action="store_true", help=argparse.SUPPRESS)
+    ap.add_argument("--replicas", type=int, default=4)
+    ap.add_argument("--sessoes", type=int, default=10, help="sessões (threads) por réplica")
+    ap.add_argument("--usuarios", type=int, default=500)
+    ap.add_argument("--presencas", type=int, default=60)
+    ap.add_argument("--duracao", type=float, default=8.0)
+    ap.add_argument("--intervalo-ms", type=float, default=200.0, help="pausa entre reruns de uma sessão")
+    ap.add_argument("--latencia-ms", type=float, nargs=2, default=(5.0, 20.0), metavar=("MIN", "MAX"))
+    ap.add_argument("--limpezas", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    if args.replica:
+        return replica(args)
+
+    srv = FakeRedis().iniciar()
+    linhas = [rodar_modo("memoria", "", args), rodar_modo("redis", srv.url, args)]
+
+    print(f"\nreplicas={args.replicas} sessoes/replica={args.sessoes} duracao={args.duracao}s "
+          f"latencia_ms={tuple(args.latencia_ms)}\n")
+    print(f"{'modo':<8} {'reruns':>7} {'req_db':>7} {'db/rerun':>9} {'hits_redis':>10} {'invalid.':>9} {'erros':>6}")
+    for l in linhas:
+        print(f"{l['modo']:<8} {l['reruns']:>7} {l['db']:>7} {l['db_por_rerun']:>9.3f} "
+              f"{l['backend_hits']:>10} {l['invalidacoes']:>9} {l['erros']:>6}")
+    print(f"\n(invalid. = avisos de .clear() recebidos pelas réplicas já inscritas; no máximo {args.limpezas} limpezas "
+          f"x 2 leituras x {args.replicas} réplicas no modo redis)")
+    print(f"comandos no redis: {dict(srv.comandos)}")
+    return linhas
+
+
+if __name__ == "__main__":
+    main()
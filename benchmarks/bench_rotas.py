@@ -0,0 +1,115 @@
+"""Custo da lista de uma rota com outras rotas recebendo confirmações ao mesmo tempo.
+
+    python -m benchmarks.bench_rotas
+    python -m benchmarks.bench_rotas --rotas 1 4 16 --sessoes 10 --duracao 6
+
+`--sessoes` threads leem a lista da rota "a" como um rerun da tela do usuário
+(versão da rota -> lista ordenada da versão), enquanto cada uma das outras
+rotas recebe uma confirmação a cada `--escrita-ms`. Relata, só para os
+leitores da rota "a": reruns, requests ao banco por rerun e latência.
+
+Modos:
+- por rota: versão, caches e `.clear()` separados por rota (o app);
+- versao unica: toda confirmação, de qualquer rota, sobe a versão da rota "a"
+  e limpa o cache dela, como seria com uma única versão/cache para todas.
+"""
+
+import argparse
+import threading
+import time
+from datetime import timedelta
+
+from benchmarks.fake_supabase import FakeSupabase, semear
+from benchmarks.bench_caminhos import _pct
+
+from rota import db
+from rota.ciclo import br_now
+from rota.modelos import Rota
+from rota.ui.usuario import _lista_ordenada
+from rota.usuarios import linha_presenca
+
+
+def rodar(modo, n_rotas, args):
+    fake = FakeSupabase(latencia_ms=tuple(args.latencia_ms))
+    semear(fake, usuarios=args.usuarios, presencas=args.presencas, rota="a")
+    db.definir_cliente(fake)
+    db.presenca_versao_bump("a")
+    rota_a = Rota(id="a", nome="ROTA A")
+    outras = [f"r{i:02d}" for i in range(1, n_rotas)]
+    usuarios = list(fake.linhas("usuarios"))
+    # caches do processo vêm da rodada anterior (outro fake): começa do zero
+    db.buscar_presenca_versao.clear()
+    db.buscar_presenca_versionada.clear()
+    _lista_ordenada.clear()
+    fake.zerar_contadores()
+
+    fim = time.monotonic() + args.duracao
+    tempos, lock = [], threading.Lock()
+
+    def leitor():
+        while time.monotonic() < fim:
+            t0 = time.perf_counter()
+            v = db.buscar_presenca_versao("a")
+            if v >= 0:
+                _lista_ordenada("a", v, rota_a)
+            with lock:
+                tempos.append(time.perf_counter() - t0)
+            time.sleep(args.intervalo_ms / 1000.0)
+
+    def escritor(rota_id, k):
+        i = 0
+        while time.monotonic() < fim:
+            u = usuarios[(k * 97 + i) % len(usuarios)]
+            db.presenca_insert(linha_presenca(u, (br_now() - timedelta(seconds=1)).isoformat(), rota=rota_id))
+            if modo == "versao unica":
+                db.presenca_versao_bump("a")
+                db.buscar_presenca_versao.clear("a")
+            else:
+                db.buscar_presenca_versao.clear(rota_id)
+            i += 1
+            time.sleep(args.escrita_ms / 1000.0)
+
+    ts = [threading.Thread(target=leitor, name=f"leitor-{i}") for i in range(args.sessoes)]
+    ts += [threading.Thread(target=escritor, args=(r, k), name=f"escritor-{k}") for k, r in enumerate(outras)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    db.definir_cliente(None)
+
+    reruns = len(tempos)
+    return {
+        "modo": modo, "rotas": n_rotas, "reruns": reruns,
+        "req_leitor": fake.por_thread["leitor"], "req_rerun": fake.por_thread["leitor"] / max(1, reruns),
+        "p50_ms": 1000 * _pct(tempos, 0.5), "p95_ms": 1000 * _pct(tempos, 0.95),
+        "escritas": fake.requests[("presencas", "insert")],
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rotas", type=int, nargs="+", default=[1, 4, 16])
+    ap.add_argument("--sessoes", type=int, default=10)
+    ap.add_argument("--usuarios", type=int, default=400)
+    ap.add_argument("--presencas", type=int, default=60)
+    ap.add_argument("--duracao", type=float, default=5.0)
+    ap.add_argument("--intervalo-ms", type=float, default=100.0, help="pausa entre reruns de um leitor")
+    ap.add_argument("--escrita-ms", type=float, default=200.0, help="pausa entre confirmações de cada outra rota")
+    ap.add_argument("--latencia-ms", type=float, nargs=2, default=(5.0, 20.0), metavar=("MIN", "MAX"))
+    args = ap.parse_args(argv)
+
+    db.SB_BACKOFF_BASE, db.SB_BACKOFF_MAX, db.SB_JITTER = 0.005, 0.05, 0.002
+    linhas = [rodar("por rota", n, args) for n in args.rotas]
+    linhas.append(rodar("versao unica", max(args.rotas), args))
+
+    print(f"\nsessoes={args.sessoes} (rota a) duracao={args.duracao}s escrita_ms={args.escrita_ms} "
+          f"latencia_ms={tuple(args.latencia_ms)}\n")
+    print(f"{'modo':<13} {'rotas':>5} {'reruns':>7} {'req_db':>7} {'req/rerun':>9} {'p50_ms':>8} {'p95_ms':>8} {'escritas':>8}")
+    for l in linhas:
+        print(f"{l['modo']:<13} {l['rotas']:>5} {l['reruns']:>7} {l['req_leitor']:>7} {l['req_rerun']:>9.3f} "
+              f"{l['p50_ms']:>8.2f} {l['p95_ms']:>8.2f} {l['escritas']:>8}")
+    return linhas
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Avisos de lista aberta/fechada pelo Telegram (rota/telegram.py) contra a Bot API falsa.
+
+    python -m benchmarks.bench_telegram
+    python -m benchmarks.bench_telegram --inscritos 1000 --taxa-erro 0.05
+
+Sobe benchmarks/fake_telegram.py (30 mensagens/s, 429 acima disso, alguns
+chats bloqueados, 502 aleatório) e o stand-in do banco, fixa o relógio logo
+depois da reabertura de segunda 07:00 e confere, com `assert`:
+
+- inscrição pelos comandos do bot (/avisos, /start avisos, /parar, rota errada);
+- balde de tokens: nenhuma janela de 1 s passa do limite, nenhum 429; sem o
+  balde (taxa alta) o servidor devolve 429 e o retry_after ainda entrega tudo;
+- cada inscrito recebe o aviso uma vez, com 502 no meio (backoff) e a
+  transmissão interrompida no meio + retomada por outro transmissor;
+- bloqueados saem da lista; a mesma mudança vista de novo não transmite de
+  novo; aviso vencido (a lista já mudou outra vez) não sai; deploy no meio do
+  período não anuncia nada.
+"""
+
+import argparse
+import threading
+import time
+from datetime import datetime
+
+from benchmarks.fake_supabase import FakeSupabase, semear
+from benchmarks.fake_telegram import FakeTelegram
+
+from rota import db, telegram
+from rota.ciclo import definir_relogio
+from rota.constantes import FUSO_BR, ROTA_PADRAO
+from rota.telegram import BotAPI, Transmissor
+
+SEGUNDA = FUSO_BR.localize(datetime(2026, 10, 19, 7, 0, 30))   # reabriu às 07:00
+BASE_CHAT = 10_000_000
+
+
+def _transmissor(srv, taxa: float) -> Transmissor:
+    return Transmissor(BotAPI(srv.token, srv.url), taxa=taxa)
+
+
+def _avisos_recebidos(srv, prefixo: str) -> dict:
+    with srv._lock:
+        msgs = list(srv.mensagens)
+    por_chat = {}
+    for chat, texto, _ in msgs:
+        if texto.startswith(prefixo):
+            por_chat[chat] = por_chat.get(chat, 0) + 1
+    return por_chat
+
+
+def _cenario(fake, srv, inscritos: int, bloqueados: int) -> list:
+    for t in ("telegram_inscritos", "telegram_transmissoes", "config", "usuarios"):
+        fake.linhas(t).clear()
+    semear(fake, usuarios=0)
+    srv.mensagens.clear()
+    srv.respostas.clear()
+    srv._updates.clear()
+    chats = [BASE_CHAT + i * 7 for i in range(inscritos)]
+    db.telegram_inscrever([{"rota": ROTA_PADRAO, "chat_id": c} for c in chats])
+    srv.bloqueados = set(chats[::max(1, inscritos // bloqueados)][:bloqueados]) if bloqueados else set()
+    return chats
+
+
+def checar_comandos(fake, srv):
+    _cenario(fake, srv, 0, 0)
+    srv.mandar(1, "/avisos")
+    srv.mandar(2, "/start avisos")
+    srv.mandar(3, "/avisos rota-que-nao-existe")
+    srv.mandar(4, "/avisos")
+    srv.mandar(4, "/parar")
+    srv.mandar(5, "bom dia")
+    tx = _transmissor(srv, 100)
+    assert tx.atualizar_inscritos() == 6
+    assert tx.atualizar_inscritos() == 0, "offset não avançou: as mesmas mensagens seriam relidas"
+    inscritos = sorted(db.telegram_inscritos(ROTA_PADRAO))
+    assert inscritos == [1, 2], inscritos
+    respostas = srv.por_chat()
+    assert respostas[1] == respostas[2] == respostas[3] == 1 and respostas[4] == 2 and 5 not in respostas, respostas
+    return "ok: /avisos e /start avisos inscrevem, /parar tira, rota errada responde a lista, texto solto é ignorado"
+
+
+def transmitir(fake, srv, inscritos: int, bloqueados: int, taxa: float, interromper: bool):
+    """Uma transmissão completa (interrompida na metade e retomada, se pedido); devolve métricas."""
+    chats = _cenario(fake, srv, inscritos, bloqueados)
+    tx = _transmissor(srv, taxa)
+    t0 = time.perf_counter()
+    if interromper:
+        def parar_na_metade():
+            while len(srv.mensagens) < inscritos // 2:
+                time.sleep(0.005)
+            tx.parar.set()
+        threading.Thread(target=parar_na_metade, daemon=True).start()
+    r = tx.rodada()
+    assert r["criadas"] == [f"{ROTA_PADRAO}|aberta|19/10/2026 18:30"], r["criadas"]
+    parcial = fake.linhas("telegram_transmissoes")[0].get("ultimo_chat")
+    if interromper:
+        assert not fake.linhas("telegram_transmissoes")[0].get("concluida_em")
+        # "reinício": outro transmissor continua de onde o primeiro gravou
+        r = _transmissor(srv, taxa).rodada()
+    gasto = time.perf_counter() - t0
+    t = fake.linhas("telegram_transmissoes")[0]
+    assert t.get("concluida_em"), "transmissão não terminou"
+
+    recebidos = _avisos_recebidos(srv, "🟢 Lista aberta")
+    esperados = set(chats) - srv.bloqueados
+    assert set(recebidos) == esperados, (len(recebidos), len(esperados))
+    assert set(recebidos.values()) == {1}, "alguém recebeu o aviso duas vezes"
+    assert set(db.telegram_inscritos(ROTA_PADRAO, limite=inscritos)) == esperados, "bloqueados continuam inscritos"
+    assert t["enviadas"] == len(esperados), t
+
+    # mesma mudança de estado de novo (outra rodada / outra réplica): nada sai
+    antes = len(srv.mensagens)
+    _transmissor(srv, taxa).rodada()
+    assert len(srv.mensagens) == antes and len(fake.linhas("telegram_transmissoes")) == 1
+    return {"tempo": gasto, "pico": srv.pico_por_segundo(), "r429": srv.respostas[429], "r502": srv.respostas[502],
+            "parcial": parcial, "entregues": len(recebidos)}
+
+
+def checar_vencida_e_janela(fake, srv):
+    _cenario(fake, srv, 5, 0)
+    tx = _transmissor(srv, 100)
+    definir_relogio(lambda: FUSO_BR.localize(datetime(2026, 10, 19, 5, 0, 30)))   # fechou às 05:00
+    assert tx.detectar() == [f"{ROTA_PADRAO}|fechada|19/10/2026 06:30"]
+    # o transmissor ficou fora do ar até depois da reabertura
+    definir_relogio(lambda: SEGUNDA)
+    tx.rodada()
+    assert not _avisos_recebidos(srv, "🔴"), "aviso de fechamento saiu depois da reabertura"
+    assert len(_avisos_recebidos(srv, "🟢")) == 5
+
+    _cenario(fake, srv, 5, 0)
+    definir_relogio(lambda: FUSO_BR.localize(datetime(2026, 10, 19, 10, 0)))
+    r = tx.rodada()
+    assert not r["criadas"] and not srv.mensagens, "deploy no meio do período anunciou"
+    definir_relogio(lambda: SEGUNDA)
+    return "ok: fechamento vencido encerrado sem enviar; 10:00 (sem mudança recente) não anuncia"
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--inscritos", type=int, default=300)
+    ap.add_argument("--bloqueados", type=int, default=10)
+    ap.add_argument("--taxa-erro", type=float, default=0.02)
+    ap.add_argument("--latencia-ms", type=float, nargs=2, default=(2.0, 5.0), metavar=("MIN", "MAX"))
+    args = ap.parse_args(argv)
+
+    fake = FakeSupabase(latencia_ms=tuple(args.latencia_ms))
+    db.definir_cliente(fake)
+    srv = FakeTelegram(taxa_erro=args.taxa_erro).iniciar()
+    # 502 aleatório: backoff curto para o benchmark não dormir à toa
+    telegram.BACKOFF_BASE = 0.05
+    definir_relogio(lambda: SEGUNDA)
+    try:
+        print(f"\ninscritos={args.inscritos} bloqueados={args.bloqueados} taxa_erro={args.taxa_erro} "
+              f"limite do servidor={srv.limite_s}/s\n")
+        print("comandos:        ", checar_comandos(fake, srv))
+        print()
+        print(f"{'cenario':<30} {'entregues':>9} {'tempo_s':>8} {'msg_s':>7} {'pico_1s':>8} {'429':>5} {'502':>5}")
+        for nome, taxa, interromper in (("balde 25/s", telegram.TAXA, False),
+                                        ("balde 25/s, parada + retomada", telegram.TAXA, True),
+                                        ("sem balde (só retry_after)", 1000.0, False)):
+            m = transmitir(fake, srv, args.inscritos, args.bloqueados, taxa, interromper)
+            print(f"{nome:<30} {m['entregues']:>9} {m['tempo']:>8.2f} {m['entregues'] / m['tempo']:>7.1f} "
+                  f"{m['pico']:>8} {m['r429']:>5} {m['r502']:>5}")
+            if taxa == telegram.TAXA:
+                assert m["pico"] <= srv.limite_s and m["r429"] == 0, m
+        print()
+        print("vencida/janela:  ", checar_vencida_e_janela(fake, srv))
+    finally:
+        definir_relogio(None)
+        srv.parar()
+        db.definir_cliente(None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Importação/exportação em massa (rota/transferencia.py) contra o stand-in local.
+
+    python -m benchmarks.bench_transferencia
+    python -m benchmarks.bench_transferencia --linhas 100000 --lote 1000 --latencia-ms 5 15
+
+Gera um CSV de `--linhas` usuários no formato da planilha (e-mails com
+maiúsculas, telefones formatados, ~1% de linhas inválidas e alguns e-mails
+repetidos) e um JSONL de presenças desses usuários, e mede:
+
+- importar usuarios com uma falha do banco no meio (erro que o retry não
+  cobre) + a retomada pelo checkpoint: nenhuma linha perdida ou duplicada;
+- importar presencas;
+- exportar as duas tabelas (CSV e JSONL), com o pico de memória do
+  tracemalloc para 10% e 100% das linhas: memória constante = picos iguais.
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from benchmarks.fake_supabase import FakeSupabase, FakeAPIError, semear, FUSO_BR, GRADS, ORIGENS
+
+from rota import db, transferencia
+
+
+class FakeQueCai(FakeSupabase):
+    """Derruba a conexão no upsert de número `cair_em` (um erro que o sb_call não repete)."""
+
+    def __init__(self, cair_em: int = 0, **kw):
+        super().__init__(**kw)
+        self.cair_em = cair_em
+
+    def _executar(self, q):
+        if q._op == "upsert" and self.cair_em and self.requests[(q._t, "upsert")] + 1 == self.cair_em:
+            self.cair_em = 0
+            self.requests[(q._t, "upsert")] += 1
+            raise FakeAPIError("server closed the connection unexpectedly", "08006")
+        return super()._executar(q)
+
+
+def gerar_usuarios(caminho: str, n: int, rnd: random.Random) -> int:
+    """CSV da planilha; devolve quantos e-mails válidos e distintos ele tem."""
+    validos = set()
+    with open(caminho, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["Nome", "Graduação", "Lotação", "Senha", "QG_RMCF_OUTROS", "Email", "TELEFONE", "STATUS"])
+        for i in range(n):
+            j = rnd.randrange(i) if i and rnd.random() < 0.005 else i   # e-mail repetido
+            email = f"  Pessoa{j:06d}@Exemplo.com "
+            tel = f"(21) 9{j // 10000:04d}.{j % 10000:04d}" if j % 2 else f"21 9{j:08d}"
+            if rnd.random() < 0.01:
+                tel = "1234"                                              # inválido
+            else:
+                validos.add(f"pessoa{j:06d}@exemplo.com")
+            w.writerow([f"PESSOA {j}", rnd.choice(GRADS), f"LOT {j % 40}", f"s{j}", rnd.choice(ORIGENS),
+                        email, tel, "ATIVO" if j % 10 else "PENDENTE"])
+    return len(validos)
+
+
+def gerar_presencas(caminho: str, emails: list, n: int, rnd: random.Random):
+    base = datetime.now(FUSO_BR) - timedelta(days=1)
+    with open(caminho, "w", encoding="utf-8") as f:
+        for i in range(n):
+            f.write(json.dumps({"rota": "nova-iguacu", "email": rnd.choice(emails).upper(), "nome": f"P {i}",
+                                "graduacao": rnd.choice(GRADS), "lotacao": "LOT", "origem": rnd.choice(ORIGENS),
+                                "data_hora": (base + timedelta(seconds=i)).isoformat()}) + "\n")
+
+
+def cronometrar(fn):
+    t0 = time.perf_counter()
+    r = fn()
+    return r, time.perf_counter() - t0
+
+
+def pico_exportacao(tabela: str, arquivo: str, lote: int) -> tuple:
+    tracemalloc.start()
+    n = transferencia.exportar(tabela, arquivo, lote=lote, log=lambda _m: None)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return n, pico
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--linhas", type=int, default=100_000)
+    ap.add_argument("--lote", type=int, default=1000)
+    ap.add_argument("--latencia-ms", type=float, nargs=2, default=(0.0, 0.0), metavar=("MIN", "MAX"))
+    args = ap.parse_args(argv)
+
+    rnd = random.Random(11)
+    calado = lambda _m: None
+    with tempfile.TemporaryDirectory() as d:
+        arq_u, arq_p = os.path.join(d, "usuarios.csv"), os.path.join(d, "presencas.jsonl")
+        esperados = gerar_usuarios(arq_u, args.linhas, rnd)
+
+        fake = FakeQueCai(cair_em=(args.linhas // args.lote) // 2, latencia_ms=tuple(args.latencia_ms))
+        semear(fake, usuarios=0)
+        db.definir_cliente(fake)
+        print(f"\nlinhas={args.linhas} lote={args.lote} latencia_ms={tuple(args.latencia_ms)}\n")
+
+        try:
+            transferencia.importar("usuarios", arq_u, lote=args.lote, log=calado)
+            raise SystemExit("a falha injetada não aconteceu")
+        except FakeAPIError:
+            ck = json.load(open(arq_u + ".ckpt"))
+            print(f"usuarios: banco caiu depois do registro {ck['registro']} ({len(fake.linhas('usuarios'))} gravados)")
+        antes = fake.total_requests()
+        r, t = cronometrar(lambda: transferencia.importar("usuarios", arq_u, lote=args.lote, log=calado))
+        emails = [u["email"] for u in fake.linhas("usuarios")]
+        assert len(emails) == len(set(emails)) == esperados, (len(emails), len(set(emails)), esperados)
+        assert all(u["telefone"].isdigit() and u["email"] == u["email"].strip().lower() for u in fake.linhas("usuarios"))
+        assert not os.path.exists(arq_u + ".ckpt")
+        print(f"usuarios: retomada do registro {r['retomado_de']}: {r['lidos']} lidos em {t:.2f} s "
+              f"({r['lidos'] / t:,.0f} linhas/s), {fake.total_requests() - antes} requests; "
+              f"total {len(emails)} usuários = esperado, {r['rejeitados']} rejeitados, {r['duplicados']} duplicados")
+
+        gerar_presencas(arq_p, emails, args.linhas, rnd)
+        fake.zerar_contadores()
+        r, t = cronometrar(lambda: transferencia.importar("presencas", arq_p, lote=args.lote, log=calado))
+        ids = {u["email"]: u["id"] for u in fake.linhas("usuarios")}
+        assert len(fake.linhas("presencas")) == args.linhas
+        assert all(p["usuario_id"] == ids[p["email"]] for p in fake.linhas("presencas"))
+        print(f"presencas: {r['gravados']} em {t:.2f} s ({r['gravados'] / t:,.0f} linhas/s), "
+              f"{fake.total_requests()} requests")
+
+        print()
+        print(f"{'exportação':<24} {'linhas':>8} {'tempo_s':>8} {'pico_kb':>9}")
+        for tabela, ext in (("usuarios", "csv"), ("usuarios", "jsonl"), ("presencas", "jsonl")):
+            saida = os.path.join(d, f"export_{tabela}.{ext}")
+            linhas = fake.linhas(tabela)
+            completas = list(linhas)
+            for frac in (0.1, 1.0):
+                linhas[:] = completas[:int(len(completas) * frac)]
+                (n, pico), t = cronometrar(lambda: pico_exportacao(tabela, saida, args.lote))
+                print(f"{tabela + '.' + ext + f' ({frac:.0%})':<24} {n:>8} {t:>8.2f} {pico / 1024:>9.0f}")
+            linhas[:] = completas
+        db.definir_cliente(None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Carga headless: N sessões simuladas rodando o script Streamlit de verdade.
+
+Usa `streamlit.testing.v1.AppTest` contra o stand-in local do Supabase
+(`benchmarks/fake_supabase.py`) e com o relógio fixado num horário de lista
+aberta. Cada sessão faz: abrir -> login -> confirmar presença -> atualizar -> PDF.
+
+    python -m benchmarks.carga_apptest --sessoes 30
+    python -m benchmarks.carga_apptest --sessoes 60 --threads 20 --latencia-ms 10 40 --erro 0.02
+    python -m benchmarks.carga_apptest --sessoes 30 --replica-atraso-ms 300
+
+Relata a distribuição de latência por passo, o total de requests ao banco
+(por tabela/operação; com `--replica-atraso-ms`, separado entre primário e
+réplica de leitura) e o hit ratio dos caches das leituras.
+"""
+
+import os
+
+# métricas ligadas antes de importar o pacote (decorators são decididos no import)
+os.environ.setdefault("ROTA_METRICAS", "1")
+
+import argparse
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.fake_supabase import FakeSupabase, FakeReplica, semear, FUSO_BR
+from benchmarks.bench_caminhos import imprimir, _pct
+
+from rota import db, metricas
+from rota.ciclo import definir_relogio
+from rota.validacao import tel_format_br
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+PASSOS = ["abrir", "login", "confirmar", "atualizar", "pdf"]
+
+
+def relogio_lista_aberta():
+    # terça-feira 10:00 (lista aberta), avançando junto com o tempo real
+    base = FUSO_BR.localize(datetime(2026, 10, 20, 10, 0, 0))
+    t0 = time.monotonic()
+    return lambda: base + timedelta(seconds=time.monotonic() - t0)
+
+
+def _botao(at, trecho: str):
+    for b in at.button:
+        if trecho in str(b.label):
+            return b
+    return None
+
+
+def sessao(usuario: dict, timeout: float):
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    tempos, falhas = {}, []
+
+    def passo(nome, fn):
+        t0 = time.perf_counter()
+        try:
+            fn()
+            if at.exception:
+                falhas.append((nome, str(at.exception[0].value)[:120]))
+        except Exception as ex:
+            falhas.append((nome, str(ex)[:120]))
+        tempos[nome] = time.perf_counter() - t0
+
+    def login():
+        aba = at.tabs[0]
+        aba.text_input[0].input(usuario["email"])
+        aba.text_input[1].input(tel_format_br(usuario["telefone"]))
+        aba.text_input[2].input(usuario["senha"])
+        aba.button[0].click()
+        at.run()
+
+    def clicar(trecho):
+        def _fn():
+            b = _botao(at, trecho)
+            if b is None:
+                raise RuntimeError(f"botão '{trecho}' não encontrado")
+            b.click()
+            at.run()
+        return _fn
+
+    def pdf():
+        # PDF sob demanda (botão) quando existir; senão o rerun já gera o PDF
+        b = _botao(at, "PDF")
+        if b is not None:
+            b.click()
+        at.run()
+
+    passo("abrir", at.run)
+    passo("login", login)
+    passo("confirmar", clicar("CONFIRMAR"))
+    passo("atualizar", clicar("ATUALIZAR"))
+    passo("pdf", pdf)
+    return tempos, falhas
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sessoes", type=int, default=20)
+    ap.add_argument("--threads", type=int, default=0, help="sessões simultâneas (padrão: todas)")
+    ap.add_argument("--usuarios", type=int, default=500)
+    ap.add_argument("--latencia-ms", type=float, nargs=2, default=(5.0, 20.0), metavar=("MIN", "MAX"))
+    ap.add_argument("--erro", type=float, default=0.0)
+    ap.add_argument("--timeout", type=float, default=60.0)
+    ap.add_argument("--replica-atraso-ms", type=float, default=None, help="liga a réplica de leitura com esse atraso")
+    args = ap.parse_args(argv)
+
+    db.SB_BACKOFF_BASE, db.SB_BACKOFF_MAX, db.SB_JITTER = 0.005, 0.05, 0.002
+    fake = FakeSupabase(latencia_ms=tuple(args.latencia_ms), taxa_erro=args.erro)
+    semear(fake, usuarios=args.usuarios, presencas=0)
+    replica = FakeReplica(fake, args.replica_atraso_ms) if args.replica_atraso_ms is not None else None
+    db.definir_cliente(fake, leitura=replica)
+    definir_relogio(relogio_lista_aberta())
+    metricas.zerar()
+    fake.zerar_contadores()
+
+    ativos = [u for u in fake.linhas("usuarios") if u["status"] == "ATIVO"][:args.sessoes]
+    por_passo = defaultdict(list)
+    todas_falhas = []
+    lock = threading.Lock()
+
+    def rodar(u):
+        tempos, falhas = sessao(u, args.timeout)
+        with lock:
+            for k, v in tempos.items():
+                por_passo[k].append(v)
+            todas_falhas.extend(falhas)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads or len(ativos) or 1) as ex:
+        list(ex.map(rodar, ativos))
+    total = time.perf_counter() - t0
+
+    linhas = []
+    for nome in PASSOS:
+        v = por_passo.get(nome, [])
+        linhas.append({
+            "cenario": nome, "n": len(v),
+            "ops_s": len(v) / total if total else 0.0,
+            "p50_ms": 1000 * _pct(v, 0.50), "p95_ms": 1000 * _pct(v, 0.95),
+            "max_ms": 1000 * max(v) if v else 0.0,
+            "req_op": 0.0, "erros_inj": 0, "falhas": sum(1 for f in todas_falhas if f[0] == nome),
+        })
+
+    print(f"\nsessoes={len(ativos)} threads={args.threads or len(ativos)} latencia_ms={tuple(args.latencia_ms)} "
+          f"erro={args.erro} duracao={total:.2f}s\n")
+    imprimir(linhas)
+
+    print(f"\nrequests ao banco: {fake.total_requests()} ({fake.total_requests() / max(1, len(ativos)):.1f} por sessão), "
+          f"erros injetados: {fake.erros_injetados}")
+    for (tabela, op), n in sorted(fake.requests.items()):
+        print(f"  {tabela:<14} {op:<8} {n:>7}")
+    if replica is not None:
+        cont = metricas.contadores()
+        print(f"\nréplica de leitura (atraso {args.replica_atraso_ms:.0f} ms): {replica.total_requests()} requests, "
+              f"atrasada -> primário: {sum(v for (n, _), v in cont.items() if n == 'replica_atrasada')}")
+        for (tabela, op), n in sorted(replica.requests.items()):
+            print(f"  {tabela:<14} {op:<8} {n:>7}")
+
+    print("\ncaches:")
+    for c in metricas.resumo_caches():
+        print(f"  {c['cache']:<32} chamadas={c['chamadas']:>6} hits={c['hits']:>6} misses={c['misses']:>5} hit_ratio={c['hit_ratio']:.3f}")
+
+    if todas_falhas:
+        print(f"\nfalhas ({len(todas_falhas)}):")
+        for nome, msg in todas_falhas[:10]:
+            print(f"  [{nome}] {msg}")
+
+    definir_relogio(None)
+    db.definir_cliente(None)
+    return linhas
+
+
+if __name__ == "__main__":
+    main()
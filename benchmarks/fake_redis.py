@@ -0,0 +1,187 @@
+"""Stand-in local de um servidor Redis (protocolo RESP) para benchmarks e testes.
+
+Só o subconjunto que `rota/cache.py` usa: GET, SET (com PX/EX/NX), INCR/INCRBY, DEL,
+PUBLISH, SUBSCRIBE/UNSUBSCRIBE e PING. Fala RESP de verdade, então o cliente
+`redis` oficial e processos separados (réplicas) conectam como num Redis real.
+
+    srv = FakeRedis().iniciar()          # porta livre em 127.0.0.1
+    os.environ["ROTA_CACHE_URL"] = srv.url
+
+    python -m benchmarks.fake_redis --porta 6390   # servidor avulso
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from collections import Counter
+
+
+class FakeRedis:
+    def __init__(self, host: str = "127.0.0.1", porta: int = 0):
+        self.host = host
+        self.porta = porta
+        self._dados = {}          # chave -> (valor bytes, expira_em | None)
+        self._assinantes = {}     # canal -> set(writer)
+        self._resp3 = set()       # conexões que pediram HELLO 3
+        self.comandos = Counter()
+        self._loop = None
+        self._pronto = threading.Event()
+
+    @property
+    def url(self) -> str:
+        return f"redis://{self.host}:{self.porta}/0"
+
+    # ---- protocolo ----
+    @staticmethod
+    def _bulk(v) -> bytes:
+        if isinstance(v, int):
+            return b":%d\r\n" % v
+        if isinstance(v, str):
+            v = v.encode()
+        return b"$%d\r\n%s\r\n" % (len(v), v)
+
+    def _array(self, itens, tipo: bytes = b"*") -> bytes:
+        return tipo + b"%d\r\n" % len(itens) + b"".join(self._bulk(i) for i in itens)
+
+    def _push(self, writer, itens) -> bytes:
+        # RESP3 entrega mensagens de pub/sub como "push" (>); RESP2 como array
+        return self._array(itens, b">" if writer in self._resp3 else b"*")
+
+    async def _ler_comando(self, reader):
+        linha = await reader.readline()
+        if not linha:
+            return None
+        if not linha.startswith(b"*"):
+            return linha.strip().split()
+        partes = []
+        for _ in range(int(linha[1:])):
+            tam = int((await reader.readline())[1:])
+            partes.append((await reader.readexactly(tam + 2))[:-2])
+        return partes
+
+    def _vivo(self, chave):
+        item = self._dados.get(chave)
+        if item is None:
+            return None
+        if item[1] is not None and item[1] <= time.monotonic():
+            del self._dados[chave]
+            return None
+        return item[0]
+
+    def _executar(self, cmd, args, writer):
+        self.comandos[cmd] += 1
+        if cmd == "PING":
+            return b"+PONG\r\n"
+        if cmd == "GET":
+            v = self._vivo(args[0])
+            if v is None:
+                return b"_\r\n" if writer in self._resp3 else b"$-1\r\n"
+            return self._bulk(v)
+        if cmd == "SET":
+            expira, nx, i = None, False, 2
+            while i < len(args):
+                op = args[i].decode().upper()
+                if op == "NX":
+                    nx = True
+                    i += 1
+                elif op == "PX":
+                    expira = time.monotonic() + int(args[i + 1]) / 1000.0
+                    i += 2
+                elif op == "EX":
+                    expira = time.monotonic() + int(args[i + 1])
+                    i += 2
+                else:
+                    i += 1
+            if nx and self._vivo(args[0]) is not None:
+                return b"_\r\n" if writer in self._resp3 else b"$-1\r\n"
+            self._dados[args[0]] = (args[1], expira)
+            return b"+OK\r\n"
+        if cmd in ("INCR", "INCRBY"):
+            n = int(self._vivo(args[0]) or 0) + (int(args[1]) if cmd == "INCRBY" else 1)
+            self._dados[args[0]] = (str(n).encode(), None)
+            return b":%d\r\n" % n
+        if cmd == "DEL":
+            return b":%d\r\n" % sum(1 for k in args if self._dados.pop(k, None) is not None)
+        if cmd == "PUBLISH":
+            canal, msg = args[0], args[1]
+            alvos = list(self._assinantes.get(canal, ()))
+            for w in alvos:
+                w.write(self._push(w, [b"message", canal, msg]))
+            return b":%d\r\n" % len(alvos)
+        if cmd == "SUBSCRIBE":
+            saida = b""
+            for canal in args:
+                self._assinantes.setdefault(canal, set()).add(writer)
+                saida += self._push(writer, [b"subscribe", canal, len(self._canais_de(writer))])
+            return saida
+        if cmd == "UNSUBSCRIBE":
+            saida = b""
+            for canal in args or list(self._canais_de(writer)):
+                self._assinantes.get(canal, set()).discard(writer)
+                saida += self._push(writer, [b"unsubscribe", canal, len(self._canais_de(writer))])
+            return saida
+        if cmd == "HELLO":
+            proto = int(args[0]) if args else 2
+            if proto == 3:
+                self._resp3.add(writer)
+                # mapa RESP3: "%<pares>" seguido de chave, valor, chave, valor...
+                return b"%3\r\n" + b"".join(self._bulk(x) for x in [b"server", b"redis", b"version", b"7.2.0", b"proto", 3])
+            return self._array([b"server", b"redis", b"version", b"7.2.0", b"proto", 2])
+        if cmd in ("CLIENT", "SELECT"):
+            return b"+OK\r\n"
+        return b"-ERR unknown command '%s'\r\n" % cmd.encode()
+
+    def _canais_de(self, writer):
+        return [c for c, ws in self._assinantes.items() if writer in ws]
+
+    async def _conexao(self, reader, writer):
+        try:
+            while True:
+                partes = await self._ler_comando(reader)
+                if not partes:
+                    break
+                writer.write(self._executar(partes[0].decode().upper(), partes[1:], writer))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for ws in self._assinantes.values():
+                ws.discard(writer)
+            self._resp3.discard(writer)
+            writer.close()
+
+    # ---- ciclo de vida ----
+    async def _servir(self):
+        srv = await asyncio.start_server(self._conexao, self.host, self.porta)
+        self.porta = srv.sockets[0].getsockname()[1]
+        self._pronto.set()
+        async with srv:
+            await srv.serve_forever()
+
+    def iniciar(self):
+        """Sobe o servidor numa thread daemon e devolve self (com a porta já definida)."""
+        def rodar():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self._servir())
+
+        threading.Thread(target=rodar, name="fake-redis", daemon=True).start()
+        self._pronto.wait(5)
+        return self
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--porta", type=int, default=6390)
+    args = ap.parse_args(argv)
+    srv = FakeRedis(porta=args.porta).iniciar()
+    print(f"fake redis em {srv.url} (Ctrl+C para sair)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,507 @@
+"""Stand-in local do cliente Supabase/PostgREST para benchmarks (sem rede).
+
+Implementa o subconjunto do query builder que o app usa:
+`table().select/insert/update/upsert/delete`, filtros `eq/neq/in_/lt/lte/gt/gte/like/is_`,
+`order`, `limit`, `range`, `execute()` e `rpc()` das funções SQL do app
+(`FUNCOES`, mesmas regras de sql/migracoes/). Tudo em memória, com:
+
+- latência configurável por request (`latencia_ms=(min, max)`) e, opcionalmente,
+  um limite de requests simultâneos (`conexoes`, o pool do PostgREST);
+- injeção de erros 429/5xx com probabilidade `taxa_erro` (a mensagem segue o
+  formato que o `sb_call` reconhece, então o retry real é exercitado);
+- contadores de requests por tabela/operação (`requests`, `total_requests()`);
+- `FakeReplica`: réplica de leitura atrasada, para `definir_cliente(fake, leitura=...)`.
+
+Uso:
+    fake = FakeSupabase(latencia_ms=(5, 15), taxa_erro=0.02)
+    semear(fake, usuarios=1000, presencas=120)
+    rota.db.definir_cliente(fake)
+"""
+
+import heapq
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytz
+
+from rota.constantes import ROTA_PADRAO
+
+FUSO_BR = pytz.timezone("America/Sao_Paulo")
+
+
+class FakeAPIError(Exception):
+    def __init__(self, message: str, code: str = ""):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+class _Resp:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class _Query:
+    def __init__(self, cliente, tabela: str):
+        self._c = cliente
+        self._t = tabela
+        self._op = None
+        self._cols = "*"
+        self._payload = None
+        self._on_conflict = None
+        self._ignorar_duplicadas = False
+        self._filtros = []
+        self._ordem = []
+        self._limite = None
+        self._offset = 0
+        self._count = None
+        self._head = False
+
+    # ---- operações ----
+    def select(self, columns="*", count=None, head=False):
+        self._op, self._cols, self._count, self._head = "select", columns, count, head
+        return self
+
+    def insert(self, rows, **kwargs):
+        self._op, self._payload = "insert", rows
+        return self
+
+    def upsert(self, rows, on_conflict=None, ignore_duplicates=False, **kwargs):
+        self._op, self._payload, self._on_conflict = "upsert", rows, on_conflict
+        self._ignorar_duplicadas = ignore_duplicates
+        return self
+
+    def update(self, patch):
+        self._op, self._payload = "update", patch
+        return self
+
+    def delete(self):
+        self._op = "delete"
+        return self
+
+    # ---- filtros / modificadores ----
+    def _f(self, fn):
+        self._filtros.append(fn)
+        return self
+
+    def eq(self, k, v):
+        return self._f(lambda r: r.get(k) == v)
+
+    def neq(self, k, v):
+        return self._f(lambda r: r.get(k) != v)
+
+    def in_(self, k, vs):
+        vs = set(vs)
+        return self._f(lambda r: r.get(k) in vs)
+
+    def lt(self, k, v):
+        return self._f(lambda r: r.get(k) is not None and r.get(k) < v)
+
+    def lte(self, k, v):
+        return self._f(lambda r: r.get(k) is not None and r.get(k) <= v)
+
+    def gt(self, k, v):
+        return self._f(lambda r: r.get(k) is not None and r.get(k) > v)
+
+    def gte(self, k, v):
+        return self._f(lambda r: r.get(k) is not None and r.get(k) >= v)
+
+    def like(self, k, padrao):
+        # só os curingas usados no app: "%" (qualquer sequência) e "_" (um caractere)
+        rx = re.compile("^" + "".join(".*" if c == "%" else "." if c == "_" else re.escape(c) for c in padrao) + "$", re.S)
+        return self._f(lambda r: r.get(k) is not None and rx.match(str(r.get(k))) is not None)
+
+    def is_(self, k, v):
+        alvo = None if str(v).lower() == "null" else v
+        return self._f(lambda r: r.get(k) is alvo)
+
+    def order(self, col, desc=False):
+        self._ordem.append((col, desc))
+        return self
+
+    def limit(self, n):
+        self._limite = int(n)
+        return self
+
+    def range(self, ini, fim):
+        self._offset, self._limite = int(ini), int(fim) - int(ini) + 1
+        return self
+
+    # ---- execução ----
+    def execute(self):
+        return self._c._executar(self)
+
+
+class FakeSupabase:
+    def __init__(self, latencia_ms=(0.0, 0.0), taxa_erro: float = 0.0, semente: int = 42, conexoes: int = 0):
+        self.latencia_ms = latencia_ms
+        # pool de conexões do PostgREST: no máximo `conexoes` requests simultâneos (0 = sem limite)
+        self._pool = threading.BoundedSemaphore(conexoes) if conexoes else None
+        self.taxa_erro = taxa_erro
+        self._rnd = random.Random(semente)
+        self._lock = threading.Lock()
+        self._tabelas = {}
+        self._seq = Counter()
+        self.requests = Counter()
+        # requests por "papel" da thread que chamou (prefixo do nome antes do "-")
+        self.por_thread = Counter()
+        self.erros_injetados = 0
+        # restrições de unicidade por tabela: lista de funções linha -> chave
+        self.unicos = {}
+
+    # API pública parecida com supabase.Client
+    def table(self, nome: str) -> _Query:
+        return _Query(self, nome)
+
+    def rpc(self, nome: str, params: dict = None):
+        return _Rpc(self, nome, params or {})
+
+    def linhas(self, nome: str) -> list:
+        return self._tabelas.setdefault(nome, [])
+
+    def total_requests(self) -> int:
+        return sum(self.requests.values())
+
+    def zerar_contadores(self):
+        self.requests.clear()
+        self.por_thread.clear()
+        self.erros_injetados = 0
+
+    # ---- interno ----
+    def _latencia(self):
+        lo, hi = self.latencia_ms
+        if hi <= 0:
+            return
+        if self._pool is None:
+            time.sleep(self._rnd.uniform(lo, hi) / 1000.0)
+            return
+        with self._pool:
+            time.sleep(self._rnd.uniform(lo, hi) / 1000.0)
+
+    def _talvez_falhar(self):
+        if self.taxa_erro and self._rnd.random() < self.taxa_erro:
+            self.erros_injetados += 1
+            if self._rnd.random() < 0.5:
+                raise FakeAPIError("429 Too Many Requests", "429")
+            raise FakeAPIError("503 Service Unavailable", "503")
+
+    def _novo_id(self, tabela):
+        self._seq[tabela] += 1
+        return self._seq[tabela]
+
+    def _checar_unicos(self, tabela, novas, ignorar=()):
+        for nome, chave in self.unicos.get(tabela, {}).items():
+            vistos = {chave(r) for r in self.linhas(tabela) if id(r) not in ignorar}
+            for r in novas:
+                k = chave(r)
+                if k in vistos:
+                    raise FakeAPIError(
+                        f'duplicate key value violates unique constraint "{nome}"', "23505")
+                vistos.add(k)
+
+    def _executar(self, q: _Query):
+        self.requests[(q._t, q._op)] += 1
+        self.por_thread[threading.current_thread().name.split("-")[0]] += 1
+        self._latencia()
+        self._talvez_falhar()
+        with self._lock:
+            linhas = self.linhas(q._t)
+            filtrar = (r for r in linhas if all(f(r) for f in q._filtros))
+
+            if q._op == "select" and q._limite is not None and not q._count and len(q._ordem) == 1:
+                # página ordenada por uma coluna (keyset, "top n"): como um index scan, só as
+                # `offset + limit` primeiras ficam em memória (heapq = sorted(...)[:k], estável)
+                col, desc = q._ordem[0]
+                escolher = heapq.nlargest if desc else heapq.nsmallest
+                alvo = escolher(q._offset + q._limite, filtrar, key=lambda r: (r.get(col) is None, r.get(col)))
+                return _Resp([] if q._head else [_projetar(r, q._cols) for r in alvo[q._offset:]])
+
+            alvo = list(filtrar)
+            if q._op == "select":
+                for col, desc in reversed(q._ordem):
+                    alvo.sort(key=lambda r: (r.get(col) is None, r.get(col)), reverse=desc)
+                total = len(alvo)
+                if q._offset:
+                    alvo = alvo[q._offset:]
+                if q._limite is not None:
+                    alvo = alvo[:q._limite]
+                if q._head:
+                    return _Resp([], total if q._count else None)
+                return _Resp([_projetar(r, q._cols) for r in alvo], total if q._count else None)
+
+            if q._op in ("insert", "upsert"):
+                rows = q._payload if isinstance(q._payload, list) else [q._payload]
+                if q._op == "upsert":
+                    chaves = [c.strip() for c in (q._on_conflict or "id").split(",")]
+                    out, novas = [], []
+                    # índice da chave de conflito: lotes grandes contra tabelas grandes sem O(n x m)
+                    por_chave = {tuple(r.get(c) for c in chaves): r for r in linhas}
+                    for row in rows:
+                        k = tuple(row.get(c) for c in chaves)
+                        existente = por_chave.get(k)
+                        if existente is not None:
+                            # "on conflict do nothing" com ignore_duplicates
+                            if not q._ignorar_duplicadas:
+                                existente.update(row)
+                                out.append(dict(existente))
+                        else:
+                            novas.append(row)
+                            if q._ignorar_duplicadas:
+                                por_chave[k] = row
+                    rows = novas
+                else:
+                    out = []
+                novas = []
+                for row in rows:
+                    r = dict(row)
+                    r.setdefault("id", self._novo_id(q._t))
+                    r.setdefault("created_at", datetime.now(FUSO_BR).isoformat())
+                    novas.append(r)
+                self._checar_unicos(q._t, novas)
+                linhas.extend(novas)
+                return _Resp(out + [dict(r) for r in novas])
+
+            if q._op == "update":
+                alterados = [dict(r, **q._payload) for r in alvo]
+                self._checar_unicos(q._t, alterados, ignorar={id(r) for r in alvo})
+                for r in alvo:
+                    r.update(q._payload)
+                return _Resp([dict(r) for r in alvo])
+
+            if q._op == "delete":
+                ids = {id(r) for r in alvo}
+                linhas[:] = [r for r in linhas if id(r) not in ids]
+                return _Resp([dict(r) for r in alvo])
+
+        raise FakeAPIError(f"operação não suportada: {q._op}")
+
+    def _executar_rpc(self, r):
+        self.requests[("rpc", r.nome)] += 1
+        self.por_thread[threading.current_thread().name.split("-")[0]] += 1
+        self._latencia()
+        self._talvez_falhar()
+        fn = FUNCOES.get(r.nome)
+        if fn is None:
+            raise FakeAPIError(f"Could not find the function public.{r.nome}", "PGRST202")
+        with self._lock:
+            return _Resp(fn(self, **r.params))
+
+
+class _Rpc:
+    def __init__(self, cliente, nome: str, params: dict):
+        self._c = cliente
+        self.nome = nome
+        self.params = params
+
+    def execute(self):
+        return self._c._executar_rpc(self)
+
+
+# ==========================================================
+# FUNÇÕES SQL (POST /rpc/<nome>), com o lock do fake: atômicas como no banco
+# ==========================================================
+def _atualizar_perfil(fake, p_id, p_email, p_nome, p_graduacao, p_lotacao, p_origem, p_telefone, p_senha=None):
+    # sql/migracoes/0006_atualizar_perfil.sql
+    us = fake.linhas("usuarios")
+    if any(u.get("telefone") == p_telefone and u.get("id") != p_id for u in us):
+        raise FakeAPIError('duplicate key value violates unique constraint "usuarios_telefone_key"', "23505")
+    out = []
+    for u in us:
+        if u.get("id") == p_id and u.get("email") == str(p_email or "").strip().lower():
+            u.update({
+                "nome": p_nome, "graduacao": p_graduacao, "lotacao": p_lotacao, "origem": p_origem,
+                "telefone": p_telefone, "senha": p_senha or u.get("senha"),
+                "temp_senha": None, "temp_expira": None, "temp_usada": True,
+            })
+            out.append(dict(u))
+    return out
+
+
+def _quando(v):
+    # timestamptz do fake: datetime ou texto ISO
+    if v is None or isinstance(v, datetime):
+        return v
+    return datetime.fromisoformat(str(v).replace("Z", "+00:00"))
+
+
+def _lote_ou_conta(alvo: list, p_lote: int, p_aplicar: bool):
+    # sql/migracoes/0007_manutencao.sql: dry-run conta tudo; aplicando, no máximo p_lote pelo id
+    return sorted(alvo, key=lambda r: r["id"])[:p_lote] if p_aplicar else alvo
+
+
+def _manutencao_senhas_temp(fake, p_lote=1000, p_aplicar=False):
+    agora = datetime.now(FUSO_BR)
+    alvo = [u for u in fake.linhas("usuarios") if (u.get("temp_senha") or "") != "" and (
+        u.get("temp_usada") is True or u.get("temp_expira") is None or _quando(u["temp_expira"]) < agora)]
+    alvo = _lote_ou_conta(alvo, p_lote, p_aplicar)
+    if p_aplicar:
+        for u in alvo:
+            u.update({"temp_senha": None, "temp_expira": None, "temp_usada": True})
+    return len(alvo)
+
+
+def _manutencao_pendentes(fake, p_dias=30, p_lote=1000, p_aplicar=False):
+    corte = datetime.now(FUSO_BR) - timedelta(days=p_dias)
+    us = fake.linhas("usuarios")
+    alvo = [u for u in us if u.get("status") == "PENDENTE" and u.get("created_at") and _quando(u["created_at"]) < corte]
+    alvo = _lote_ou_conta(alvo, p_lote, p_aplicar)
+    if p_aplicar:
+        ids = {id(u) for u in alvo}
+        us[:] = [u for u in us if id(u) not in ids]
+    return len(alvo)
+
+
+def _manutencao_presencas_orfas(fake, p_lote=1000, p_aplicar=False):
+    us = fake.linhas("usuarios")
+    ids, emails = {u.get("id") for u in us}, {u.get("email") for u in us}
+    ps = fake.linhas("presencas")
+    alvo = [p for p in ps if (p["usuario_id"] not in ids if p.get("usuario_id") is not None else p.get("email") not in emails)]
+    alvo = _lote_ou_conta(alvo, p_lote, p_aplicar)
+    if p_aplicar:
+        apagar = {id(p) for p in alvo}
+        ps[:] = [p for p in ps if id(p) not in apagar]
+    por_rota = Counter(p.get("rota") for p in alvo)
+    return [{"rota": r, "apagadas": n} for r, n in por_rota.items()]
+
+
+def _avisos_pegar(fake, p_lote=50, p_max=5, p_prazo=300):
+    # sql/migracoes/0009_avisos.sql: reserva os pendentes mais antigos (o lock do fake = skip locked)
+    agora = datetime.now(FUSO_BR)
+    vencido = agora - timedelta(seconds=p_prazo)
+    alvo = [a for a in fake.linhas("avisos") if a.get("enviado_em") is None and a.get("tentativas", 0) < p_max
+            and (a.get("pego_em") is None or _quando(a["pego_em"]) < vencido)]
+    alvo = sorted(alvo, key=lambda a: a["id"])[:p_lote]
+    for a in alvo:
+        a.update({"pego_em": agora.isoformat(), "tentativas": a.get("tentativas", 0) + 1})
+    return [dict(a) for a in alvo]
+
+
+def _presenca_versao_bump(fake, p_chave, p_minimo=0):
+    # sql/migracoes/0012_presenca_versao.sql: greatest(atual + 1, p_minimo), com o lock da linha
+    cfg = fake.linhas("config")
+    linha = next((r for r in cfg if r["key"] == p_chave), None)
+    if linha is None:
+        linha = {"key": p_chave, "value": "0"}
+        cfg.append(linha)
+    atual = int(linha["value"]) if str(linha["value"]).isdigit() else 0
+    linha["value"] = str(max(atual + 1, p_minimo))
+    return int(linha["value"])
+
+
+def _sessao_revogar(fake, p_usuario, p_em, p_validade):
+    # sql/migracoes/0011_sessao_revogacoes.sql: upsert com greatest + apaga as vencidas
+    rs = fake.linhas("sessao_revogacoes")
+    atual = next((r for r in rs if r["usuario"] == p_usuario), None)
+    if atual is None:
+        rs.append({"usuario": p_usuario, "revogado_em": p_em})
+    else:
+        atual["revogado_em"] = max(atual["revogado_em"], p_em)
+    rs[:] = [r for r in rs if r["revogado_em"] >= p_em - p_validade]
+    return None
+
+
+FUNCOES = {
+    "atualizar_perfil": _atualizar_perfil,
+    "manutencao_senhas_temp": _manutencao_senhas_temp,
+    "manutencao_pendentes": _manutencao_pendentes,
+    "manutencao_presencas_orfas": _manutencao_presencas_orfas,
+    "avisos_pegar": _avisos_pegar,
+    "sessao_revogar": _sessao_revogar,
+    "presenca_versao_bump": _presenca_versao_bump,
+}
+
+
+class FakeReplica(FakeSupabase):
+    """Réplica de leitura de um `FakeSupabase`: só aceita select e enxerga o
+    primário como ele estava há até `atraso_ms` (cópia refeita a cada atraso)."""
+
+    def __init__(self, primario: FakeSupabase, atraso_ms: float = 200.0, latencia_ms=None, semente: int = 43):
+        super().__init__(latencia_ms=latencia_ms or primario.latencia_ms, semente=semente)
+        self.primario = primario
+        self.atraso = atraso_ms / 1000.0
+        self._copiado_em = float("-inf")
+
+    def _executar(self, q: _Query):
+        if q._op != "select":
+            raise FakeAPIError("cannot execute %s in a read-only transaction" % q._op.upper(), "25006")
+        agora = time.monotonic()
+        if agora - self._copiado_em >= self.atraso:
+            with self.primario._lock:
+                copia = {t: [dict(r) for r in rs] for t, rs in self.primario._tabelas.items()}
+            with self._lock:
+                self._tabelas = copia
+            self._copiado_em = agora
+        return super()._executar(q)
+
+
+def _projetar(r: dict, cols: str) -> dict:
+    if not cols or cols.strip() == "*":
+        return dict(r)
+    return {c.strip(): r.get(c.strip()) for c in cols.split(",")}
+
+
+# ==========================================================
+# DATASET SINTÉTICO
+# ==========================================================
+GRADS = ["TCEL", "MAJ", "CAP", "1º TEN", "2º TEN", "SUBTEN", "1º SGT", "2º SGT", "3º SGT", "CB", "SD", "FC COM", "FC TER"]
+ORIGENS = ["QG", "RMCF", "OUTROS"]
+
+
+def usuario_fake(i: int, rnd: random.Random = random) -> dict:
+    return {
+        "nome": f"USUARIO {i:05d}",
+        "graduacao": rnd.choice(GRADS),
+        "lotacao": f"LOT {i % 40:02d}",
+        "senha": f"senha{i}",
+        "origem": rnd.choice(ORIGENS),
+        "email": f"u{i:05d}@exemplo.com",
+        "telefone": f"219{i:08d}",
+        "status": "ATIVO" if i % 10 else "PENDENTE",
+        "temp_senha": "",
+        "temp_expira": None,
+        "temp_usada": True,
+    }
+
+
+def semear(fake: FakeSupabase, usuarios: int = 1000, presencas: int = 0, agora: datetime = None, semente: int = 7,
+           rota: str = ROTA_PADRAO):
+    """Popula usuários e (opcionalmente) as `presencas` primeiras pessoas na lista do ciclo da `rota`."""
+    rnd = random.Random(semente)
+    agora = agora or datetime.now(FUSO_BR)
+    with fake._lock:
+        us = fake.linhas("usuarios")
+        for i in range(usuarios):
+            u = usuario_fake(i, rnd)
+            u["id"] = fake._novo_id("usuarios")
+            us.append(u)
+        ps = fake.linhas("presencas")
+        base = agora - timedelta(minutes=presencas + 1)
+        for i, u in enumerate(us[:presencas]):
+            ps.append({
+                "id": fake._novo_id("presencas"),
+                "rota": rota,
+                "usuario_id": u["id"],
+                "nome": u["nome"],
+                "graduacao": u["graduacao"],
+                "lotacao": u["lotacao"],
+                "origem": u["origem"],
+                "data_hora": (base + timedelta(minutes=i)).isoformat(),
+                "email": u["email"],
+                "telefone": u["telefone"],
+            })
+        fake.linhas("config").append({"key": "limite_usuarios", "value": str(max(usuarios * 2, 100))})
+        # mesmos índices únicos de sql/migracoes/0002_usuarios_unicos.sql
+        fake.unicos.setdefault("usuarios", {}).update({
+            "usuarios_email_key": lambda r: r.get("email"),
+            "usuarios_telefone_key": lambda r: r.get("telefone"),
+        })
+        # uma presença por pessoa e rota (sql/migracoes/0013_presencas_unicas.sql)
+        fake.unicos.setdefault("presencas", {})["presencas_rota_email_key"] = lambda r: (r.get("rota"), r.get("email"))
+        # chave primária (rota, ciclo) de sql/migracoes/0004_rotas.sql (um registro por ciclo)
+        fake.unicos.setdefault("estatisticas_ciclo", {})["estatisticas_ciclo_pkey"] = lambda r: (r.get("rota"), r.get("ciclo"))
+    return fake
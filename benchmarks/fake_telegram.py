@@ -0,0 +1,154 @@
+"""Stand-in local da Bot API do Telegram (HTTP) para benchmarks e testes.
+
+Só o que `rota/telegram.py` usa: POST /bot<token>/sendMessage e /getUpdates,
+com as respostas no formato da API ({"ok": false, "error_code", "description",
+"parameters": {"retry_after"}}). Imita os limites que importam:
+
+- mais de `limite_s` mensagens em 1 s -> 429 com retry_after (s inteiros);
+- chat em `bloqueados` -> 403 "Forbidden: bot was blocked by the user";
+- `taxa_erro` -> 502 Bad Gateway aleatório.
+
+    srv = FakeTelegram().iniciar()        # porta livre em 127.0.0.1
+    BotAPI("TOKEN", srv.url)
+    srv.mandar(123, "/avisos")            # mensagem de um usuário para o bot
+
+    python -m benchmarks.fake_telegram --porta 8081   # servidor avulso
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeTelegram:
+    def __init__(self, token: str = "TOKEN", host: str = "127.0.0.1", porta: int = 0, limite_s: int = 30,
+                 taxa_erro: float = 0.0, semente: int = 5):
+        self.token = token
+        self.host = host
+        self.porta = porta
+        self.limite_s = limite_s
+        self.taxa_erro = taxa_erro
+        self._rnd = random.Random(semente)
+        self._lock = threading.Lock()
+        self._janela = deque()           # instantes dos envios aceitos no último segundo
+        self._updates = []
+        self.bloqueados = set()
+        self.mensagens = []              # (chat_id, texto, instante)
+        self.respostas = Counter()       # código HTTP -> quantas
+        self._srv = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.porta}"
+
+    def mandar(self, chat_id: int, texto: str):
+        with self._lock:
+            self._updates.append({"update_id": len(self._updates) + 1,
+                                  "message": {"chat": {"id": chat_id, "type": "private"}, "text": texto}})
+
+    def por_chat(self) -> Counter:
+        with self._lock:
+            return Counter(c for c, _, _ in self.mensagens)
+
+    def pico_por_segundo(self) -> int:
+        """Maior número de mensagens aceitas em qualquer janela de 1 s."""
+        with self._lock:
+            ts = sorted(t for _, _, t in self.mensagens)
+        pico, ini = 0, 0
+        for fim, t in enumerate(ts):
+            while t - ts[ini] >= 1.0:
+                ini += 1
+            pico = max(pico, fim - ini + 1)
+        return pico
+
+    # ---- métodos da API ----
+    def _send_message(self, p: dict):
+        chat, agora = int(p["chat_id"]), time.monotonic()
+        with self._lock:
+            if self.taxa_erro and self._rnd.random() < self.taxa_erro:
+                return 502, {"ok": False, "error_code": 502, "description": "Bad Gateway"}
+            if chat in self.bloqueados:
+                return 403, {"ok": False, "error_code": 403, "description": "Forbidden: bot was blocked by the user"}
+            while self._janela and agora - self._janela[0] >= 1.0:
+                self._janela.popleft()
+            if len(self._janela) >= self.limite_s:
+                espera = max(1, int(1.0 - (agora - self._janela[0]) + 0.999))
+                return 429, {"ok": False, "error_code": 429, "description": f"Too Many Requests: retry after {espera}",
+                             "parameters": {"retry_after": espera}}
+            self._janela.append(agora)
+            self.mensagens.append((chat, p.get("text", ""), agora))
+            n = len(self.mensagens)
+        return 200, {"ok": True, "result": {"message_id": n, "chat": {"id": chat}, "text": p.get("text", "")}}
+
+    def _get_updates(self, p: dict):
+        offset = int(p.get("offset") or 0)
+        with self._lock:
+            return 200, {"ok": True, "result": [u for u in self._updates if u["update_id"] >= offset]}
+
+    def _responder(self, caminho: str, corpo: bytes):
+        prefixo = f"/bot{self.token}/"
+        if not caminho.startswith(prefixo):
+            return 401, {"ok": False, "error_code": 401, "description": "Unauthorized"}
+        p = json.loads(corpo or b"{}")
+        metodo = caminho[len(prefixo):]
+        if metodo == "sendMessage":
+            return self._send_message(p)
+        if metodo == "getUpdates":
+            return self._get_updates(p)
+        return 404, {"ok": False, "error_code": 404, "description": "Not Found: method not found"}
+
+    # ---- servidor ----
+    def iniciar(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                corpo = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                status, resp = fake._responder(self.path, corpo)
+                with fake._lock:
+                    fake.respostas[status] += 1
+                dados = json.dumps(resp).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(dados)))
+                self.end_headers()
+                self.wfile.write(dados)
+
+            def log_message(self, *args):
+                pass
+
+        self._srv = ThreadingHTTPServer((self.host, self.porta), Handler)
+        self._srv.daemon_threads = True
+        self.porta = self._srv.server_address[1]
+        threading.Thread(target=self._srv.serve_forever, name="fake-telegram", daemon=True).start()
+        return self
+
+    def parar(self):
+        if self._srv is not None:
+            self._srv.shutdown()
+            self._srv.server_close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--porta", type=int, default=8081)
+    ap.add_argument("--token", default="TOKEN")
+    ap.add_argument("--limite-s", type=int, default=30)
+    ap.add_argument("--taxa-erro", type=float, default=0.0)
+    args = ap.parse_args(argv)
+    srv = FakeTelegram(args.token, porta=args.porta, limite_s=args.limite_s, taxa_erro=args.taxa_erro).iniciar()
+    print(f"fake Bot API em {srv.url} (TELEGRAM_API_URL={srv.url} TELEGRAM_BOT_TOKEN={args.token})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        srv.parar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Módulos de apoio do app Rota Nova Iguaçu."""
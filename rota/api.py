@@ -0,0 +1,361 @@
+"""API JSON leve (ASGI puro) para confirmar/cancelar presença e ler a lista.
+
+Pensada para o mini-app do Telegram (@RotaNovaIguacuBot) e clientes que só
+precisam da lista, sem pagar o rerun completo do script Streamlit. Reusa os
+mesmos helpers de banco, regras de ciclo e ordenação do app.
+
+    pip install -r requirements-api.txt
+    uvicorn rota.api:app --host 0.0.0.0 --port 8000 --workers 4
+
+Endpoints:
+    GET    /lista               lista ordenada + resumo (cacheável, ETag)
+    GET    /posicao             posição de quem está logado (Authorization: Bearer <sessao>)
+    POST   /presenca            {"email", "telefone", "senha"} -> confirma
+    DELETE /presenca            {"email", "telefone", "senha"} -> cancela
+
+No lugar de email/telefone/senha o corpo pode trazer {"sessao": <token>}, o
+mesmo token assinado do link do app (`?s=`, rota/sessao.py). Em /posicao o
+token é obrigatório e o e-mail sai dele: a API não diz a posição de terceiros.
+
+Com várias rotas (rota/rotas.py): `?rota=<id>` nos GET e "rota" no corpo dos
+POST/DELETE; sem rota, vale a primeira configurada.
+
+A lista ordenada é recalculada só quando a versão da lista (bump a cada
+insert/delete) muda, e servida como bytes prontos para todos os requests.
+O ETag é a própria versão: clientes que reenviam o ETag recebem 304 sem corpo.
+Cada rota tem o próprio snapshot e a própria versão.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from urllib.parse import parse_qs
+
+from rota import auditoria, avisos, sessao
+from rota.ciclo import ciclo_expirado, limpar_ciclo, status_lista
+from rota.confirmacao import lote_confirmacoes
+from rota.db import presenca_select, presenca_delete, presenca_versao, buscar_presenca_versionada, conflito_unico
+from rota.ordenacao import ordenar_presencas
+from rota.rotas import buscar_rotas, rota_por_id
+from rota.usuarios import buscar_user_by_email_tel, user_to_ui_dict, senha_confere, linha_presenca
+from rota.validacao import tel_only_digits, tel_is_valid_11
+
+TTL_LISTA = 2.0
+TTL_VERSAO = 0.5
+
+_log = logging.getLogger(__name__)
+
+
+class ErroAPI(Exception):
+    def __init__(self, status: int, mensagem: str):
+        super().__init__(mensagem)
+        self.status = status
+        self.mensagem = mensagem
+
+
+# ==========================================================
+# SNAPSHOT DA LISTA (compartilhado entre requests do processo)
+# ==========================================================
+class _Snapshot:
+    """Lista pronta (bytes + ETag) amarrada à versão da lista (config: presenca_versao).
+
+    A versão é relida no máximo a cada `ttl_versao` segundos; enquanto não muda,
+    nada é buscado nem reordenado. Sem versão legível, cai para recálculo por `ttl`.
+    """
+
+    def __init__(self, rota, ttl: float, ttl_versao: float):
+        self.rota = rota
+        self.ttl = ttl
+        self.ttl_versao = ttl_versao
+        self._lock = threading.Lock()
+        self._em = 0.0
+        self._versao_em = 0.0
+        self._versao_lida = -1
+        self.versao = -1
+        self.aberto = None
+        self.corpo = b""
+        self.etag = ""
+        self.posicoes = {}
+
+    def invalidar(self):
+        with self._lock:
+            self._em = 0.0
+            self._versao_em = 0.0
+
+    def _ler_versao(self) -> int:
+        agora = time.monotonic()
+        if agora - self._versao_em >= self.ttl_versao:
+            try:
+                self._versao_lida = presenca_versao(rota=self.rota.id)
+            except Exception:
+                self._versao_lida = -1
+            self._versao_em = agora
+        return self._versao_lida
+
+    def fresco(self) -> bool:
+        if time.monotonic() - self._versao_em >= self.ttl_versao:
+            return False
+        # abertura/fechamento muda o corpo sem mudar a versão (regra só de horário)
+        if status_lista(rota=self.rota)[0] != self.aberto:
+            return False
+        if self._versao_lida >= 0:
+            return self._versao_lida == self.versao
+        return time.monotonic() - self._em < self.ttl
+
+    def atual(self):
+        if self.fresco():
+            return self
+        with self._lock:
+            # outro request pode ter recalculado enquanto esperávamos o lock
+            v = self._ler_versao()
+            if v < 0:
+                if time.monotonic() - self._em >= self.ttl:
+                    self._recalcular(v)
+            elif v != self.versao or status_lista(rota=self.rota)[0] != self.aberto:
+                self._recalcular(v)
+        return self
+
+    def _recalcular(self, versao: int):
+        # com versão: mesma busca compartilhada do app (rota/cache.py), uma por versão no cluster
+        rota = self.rota
+        rows = buscar_presenca_versionada(rota.id, versao) if versao >= 0 else presenca_select(rota=rota.id)
+        if ciclo_expirado(rows, rota=rota):
+            limpar_ciclo(rota)
+            rows = []
+            versao = self._versao_lida = -1
+        df_o, _ = ordenar_presencas(rows, rota.vagas)
+        avisos.observar(rota, versao, df_o)
+        itens, posicoes = [], {}
+        for i, r in df_o.iterrows():
+            email = str(r.get("EMAIL", "")).strip().lower()
+            posicoes[email] = (i + 1, str(r.get("Nº", "")))
+            itens.append({
+                "n": str(r.get("Nº", "")),
+                "graduacao": str(r.get("GRADUAÇÃO", "")),
+                "nome": str(r.get("NOME", "")),
+                "lotacao": str(r.get("LOTAÇÃO", "")),
+                "origem": str(r.get("QG_RMCF_OUTROS", "")),
+            })
+        aberto, _ = status_lista(rota=rota)
+        insc = len(itens)
+        corpo = json.dumps({
+            "rota": rota.id,
+            "aberto": aberto,
+            "inscritos": insc,
+            "vagas": rota.vagas,
+            "sobra": max(0, rota.vagas - insc),
+            "excedentes": max(0, insc - rota.vagas),
+            "lista": itens,
+        }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.corpo = corpo
+        self.etag = f'"v{versao}-{int(aberto)}"' if versao >= 0 else '"' + hashlib.sha1(corpo).hexdigest()[:16] + '"'
+        self.versao = versao
+        self.aberto = aberto
+        self.posicoes = posicoes
+        self._em = time.monotonic()
+
+
+_snapshots = {}   # id pedido ("" = rota padrão) -> _Snapshot
+_snapshots_lock = threading.Lock()
+
+
+def _id_rota(rota_id) -> str:
+    return str(rota_id or "").strip().lower()
+
+
+def _rota(rota_id: str = ""):
+    rota_id = _id_rota(rota_id)
+    if not rota_id:
+        return buscar_rotas()[0]
+    rota = rota_por_id(rota_id)
+    if rota is None:
+        raise ErroAPI(404, "Rota não encontrada.")
+    return rota
+
+
+def _snapshot(rota_id: str = "") -> _Snapshot:
+    rota_id = _id_rota(rota_id)
+    rota = _rota(rota_id)
+    snap = _snapshots.get(rota_id)
+    if snap is None or snap.rota != rota:
+        # primeira leitura da rota ou configuração (vagas, horários) alterada
+        with _snapshots_lock:
+            snap = _snapshots.get(rota_id)
+            if snap is None or snap.rota != rota:
+                snap = _snapshots[rota_id] = _Snapshot(rota, TTL_LISTA, TTL_VERSAO)
+    return snap
+
+
+def _invalidar(rota_id: str):
+    for snap in list(_snapshots.values()):
+        if snap.rota.id == rota_id:
+            snap.invalidar()
+
+
+# ==========================================================
+# REGRAS
+# ==========================================================
+def _autenticar(dados: dict) -> dict:
+    if dados.get("sessao"):
+        # token do app (rota/sessao.py): conferido sem ir ao cadastro
+        u, _ = sessao.restaurar(dados["sessao"])
+        if u is None:
+            raise ErroAPI(401, "Sessão inválida ou expirada.")
+        return u
+    email = str(dados.get("email", "") or "").strip().lower()
+    tel = tel_only_digits(dados.get("telefone", ""))
+    senha = str(dados.get("senha", "") or "")
+    if not email or not tel_is_valid_11(tel) or not senha:
+        raise ErroAPI(400, "Informe email, telefone (DDD + 9 dígitos) e senha.")
+    u_raw = buscar_user_by_email_tel(email, tel)
+    u = user_to_ui_dict(u_raw) if u_raw else None
+    if not u or senha_confere(u, senha)[0] != "REAL":
+        # senha temporária exige a troca no app (fluxo de edição de cadastro)
+        raise ErroAPI(401, "Dados incorretos.")
+    if str(u.get("STATUS", "")).strip().upper() != "ATIVO":
+        raise ErroAPI(403, "Acesso negado. Aguardando aprovação do Administrador.")
+    return u
+
+
+def confirmar(dados: dict) -> dict:
+    rota_id = str(dados.get("rota", "") or "")
+    rota = _rota(rota_id)
+    u = _autenticar(dados)
+    aberto, _ = status_lista(rota=rota)
+    if not aberto:
+        raise ErroAPI(409, "Lista fechada para novas inscrições.")
+    email = str(u.get("Email", "")).strip().lower()
+    # leitura direta (sem snapshot) para não duplicar quem acabou de confirmar
+    if any(str(r.get("email", "")).strip().lower() == email for r in presenca_select("email", primario=True, rota=rota.id)):
+        raise ErroAPI(409, "Presença já registrada.")
+    try:
+        lote_confirmacoes().inserir(linha_presenca(u, rota=rota.id))
+    except Exception as ex:
+        # dois pedidos ao mesmo tempo (clique duplo, retry) passam da leitura acima; o índice único barra o segundo
+        if conflito_unico(ex) == "presenca":
+            raise ErroAPI(409, "Presença já registrada.")
+        raise
+    auditoria.registrar("presenca_confirmada", email, rota=rota.id, via="api")
+    _invalidar(rota.id)
+    return posicao(email, rota_id)
+
+
+def cancelar(dados: dict) -> dict:
+    rota = _rota(dados.get("rota", ""))
+    u = _autenticar(dados)
+    email = str(u.get("Email", "")).strip().lower()
+    presenca_delete({"email": email}, rota=rota.id)
+    auditoria.registrar("presenca_excluida", email, rota=rota.id, via="api")
+    _invalidar(rota.id)
+    return {"email": email, "cancelado": True}
+
+
+def minha_posicao(headers: dict, rota_id: str = "") -> dict:
+    """Posição do dono do token em `Authorization: Bearer <sessao>`."""
+    tipo, _, token = headers.get(b"authorization", b"").decode("latin-1").strip().partition(" ")
+    if tipo.lower() != "bearer" or not token.strip():
+        raise ErroAPI(401, "Informe a sessão (Authorization: Bearer <token>).")
+    u = _autenticar({"sessao": token.strip()})
+    return posicao(u.get("Email", ""), rota_id)
+
+
+def posicao(email: str, rota_id: str = "") -> dict:
+    email = str(email or "").strip().lower()
+    if not email:
+        raise ErroAPI(400, "Informe o email.")
+    pos = _snapshot(rota_id).atual().posicoes.get(email)
+    if pos is None:
+        return {"email": email, "registrado": False}
+    return {"email": email, "registrado": True, "posicao": pos[0], "n": pos[1]}
+
+
+# ==========================================================
+# ASGI
+# ==========================================================
+def _json(status: int, obj):
+    corpo = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+    return status, [(b"content-type", b"application/json; charset=utf-8"), (b"cache-control", b"no-store")], corpo
+
+
+async def _ler_corpo(receive) -> bytes:
+    partes = []
+    while True:
+        msg = await receive()
+        partes.append(msg.get("body", b""))
+        if not msg.get("more_body"):
+            return b"".join(partes)
+
+
+def _resposta_lista(snap: _Snapshot, headers: dict):
+    cab = [
+        (b"etag", snap.etag.encode()),
+        (b"cache-control", f"public, max-age={int(TTL_LISTA)}".encode()),
+    ]
+    if headers.get(b"if-none-match", b"").decode() == snap.etag:
+        return 304, cab, b""
+    return 200, [(b"content-type", b"application/json; charset=utf-8")] + cab, snap.corpo
+
+
+def _despachar(metodo: str, caminho: str, query: dict, headers: dict, corpo: bytes):
+    rota_id = (query.get("rota") or [""])[0]
+    if caminho == "/lista" and metodo == "GET":
+        return _resposta_lista(_snapshot(rota_id).atual(), headers)
+
+    if caminho == "/posicao" and metodo == "GET":
+        return _json(200, minha_posicao(headers, rota_id))
+
+    if caminho == "/presenca" and metodo in ("POST", "DELETE"):
+        try:
+            dados = json.loads(corpo or b"{}")
+        except ValueError:
+            raise ErroAPI(400, "JSON inválido.")
+        if not isinstance(dados, dict):
+            raise ErroAPI(400, "JSON inválido.")
+        if metodo == "POST":
+            return _json(201, confirmar(dados))
+        return _json(200, cancelar(dados))
+
+    if caminho in ("/lista", "/posicao", "/presenca"):
+        raise ErroAPI(405, "Método não permitido.")
+    raise ErroAPI(404, "Não encontrado.")
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            msg = await receive()
+            if msg["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif msg["type"] == "lifespan.shutdown":
+                # eventos de auditoria ainda no buffer vão para o banco antes de sair
+                await asyncio.to_thread(auditoria.buffer_auditoria().fechar)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    corpo = await _ler_corpo(receive)
+    headers = {k.lower(): v for k, v in scope.get("headers", [])}
+    query = parse_qs(scope.get("query_string", b"").decode())
+    metodo, caminho = scope["method"], scope["path"]
+    try:
+        snap = _snapshots.get(_id_rota((query.get("rota") or [""])[0])) if metodo == "GET" and caminho == "/lista" else None
+        if snap is not None and snap.fresco():
+            # caminho quente: bytes prontos, sem sair do event loop (nem ler config de rotas)
+            status, cab, saida = _resposta_lista(snap, headers)
+        else:
+            # helpers de banco são bloqueantes: roda fora do event loop
+            status, cab, saida = await asyncio.to_thread(_despachar, metodo, caminho, query, headers, corpo)
+    except ErroAPI as ex:
+        status, cab, saida = _json(ex.status, {"erro": ex.mensagem})
+    except Exception:
+        # detalhe só no log do servidor; o cliente recebe a mensagem genérica
+        _log.exception("erro em %s %s", metodo, caminho)
+        status, cab, saida = _json(500, {"erro": "Erro interno."})
+
+    await send({"type": "http.response.start", "status": status,
+                "headers": cab + [(b"content-length", str(len(saida)).encode())]})
+    await send({"type": "http.response.body", "body": saida})
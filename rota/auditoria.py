@@ -0,0 +1,156 @@
+"""Trilha de auditoria (tabela `auditoria`, sql/migracoes/0008_auditoria.sql).
+
+`registrar(...)` só põe o evento num buffer circular em memória e volta: o
+clique não espera o banco. Uma thread do processo grava os eventos em inserts
+de várias linhas quando o buffer junta `lote` eventos ou `intervalo` s depois
+do primeiro pendente; no fim do processo (atexit) grava o que sobrou.
+
+Banco fora do ar: os eventos voltam para o buffer e a thread tenta de novo no
+próximo intervalo. Buffer cheio (`capacidade`): o evento mais antigo é
+descartado e conta `auditoria_descartada`; quem registra nunca bloqueia.
+"""
+
+import atexit
+import threading
+import time as time_module
+from collections import deque
+
+import streamlit as st
+
+from rota import metricas
+from rota.ciclo import br_now
+from rota.db import auditoria_insert
+
+ATOR_ADM = "ADM"
+# as ações registradas pelo app (filtro do painel do ADM)
+ACOES = (
+    "usuario_liberado", "usuario_bloqueado", "usuario_apagado", "ativar_todos",
+    "limite_usuarios", "rota_salva", "importacao",
+    "presenca_confirmada", "presenca_excluida", "perfil_editado",
+)
+
+
+class BufferAuditoria:
+    """Buffer circular + escritor em segundo plano. `gravar(rows)` faz o insert do lote."""
+
+    def __init__(self, capacidade: int = 5000, lote: int = 200, intervalo: float = 2.0, gravar=None):
+        self.capacidade = capacidade
+        self.lote = lote
+        self.intervalo = intervalo
+        self._gravar = gravar or auditoria_insert
+        self._lock = threading.Lock()
+        self._cheio = threading.Condition(self._lock)
+        self._gravando = threading.Lock()   # um insert por vez (thread ou `fechar`)
+        self._eventos = deque()
+        self._fechado = False
+        self._parar = threading.Event()
+        self._thread = None
+        self.descartados = 0
+
+    def registrar(self, evento: dict):
+        with self._lock:
+            if len(self._eventos) >= self.capacidade:
+                self._eventos.popleft()
+                self.descartados += 1
+                metricas.contar("auditoria_descartada")
+            self._eventos.append(evento)
+            if self._thread is None and not self._fechado:
+                self._thread = threading.Thread(target=self._laco, name="rota-auditoria", daemon=True)
+                self._thread.start()
+            if len(self._eventos) >= self.lote:
+                # lote completo: não espera o intervalo
+                self._cheio.notify()
+
+    def pendentes(self) -> int:
+        with self._lock:
+            return len(self._eventos)
+
+    def descarregar(self) -> bool:
+        """Grava um lote (até `lote` eventos). False se o banco recusou (eles voltam ao buffer)."""
+        with self._gravando:
+            with self._lock:
+                n = min(self.lote, len(self._eventos))
+                rows = [self._eventos.popleft() for _ in range(n)]
+            if not rows:
+                return True
+            try:
+                self._gravar(rows)
+                metricas.contar("auditoria_gravada", n=len(rows))
+                return True
+            except Exception:
+                metricas.contar("auditoria_erro")
+                with self._lock:
+                    # voltam na frente, na ordem; o que não couber sai pelo mais antigo
+                    self._eventos.extendleft(reversed(rows))
+                    while len(self._eventos) > self.capacidade:
+                        self._eventos.popleft()
+                        self.descartados += 1
+                        metricas.contar("auditoria_descartada")
+                return False
+
+    def descarregar_tudo(self) -> bool:
+        while self.pendentes():
+            if not self.descarregar():
+                return False
+        return True
+
+    def _laco(self):
+        while True:
+            with self._lock:
+                while not self._eventos and not self._fechado:
+                    self._cheio.wait()
+                # junta até completar o lote ou vencer o intervalo do primeiro pendente
+                limite = time_module.monotonic() + self.intervalo
+                while len(self._eventos) < self.lote and not self._fechado:
+                    resta = limite - time_module.monotonic()
+                    if resta <= 0:
+                        break
+                    self._cheio.wait(resta)
+                if self._fechado:
+                    return
+            # acumulou mais que um lote (pico de cliques): grava os lotes em sequência
+            ok = self.descarregar()
+            while ok and self.pendentes() >= self.lote:
+                ok = self.descarregar()
+            if not ok:
+                # banco recusou: espera um intervalo antes de tentar de novo (novos eventos
+                # não acordam a thread aqui; só o `fechar`)
+                self._parar.wait(self.intervalo)
+
+    def fechar(self, timeout: float = 5.0) -> bool:
+        """Para a thread e grava o que restou. True se nada ficou para trás."""
+        with self._lock:
+            self._fechado = True
+            self._parar.set()
+            self._cheio.notify_all()
+            t = self._thread
+        if t is not None:
+            t.join(timeout)
+        limite = time_module.monotonic() + timeout
+        while self.pendentes() and time_module.monotonic() < limite:
+            if self.descarregar_tudo():
+                break
+            time_module.sleep(0.2)
+        return self.pendentes() == 0
+
+
+@st.cache_resource
+def buffer_auditoria() -> BufferAuditoria:
+    b = BufferAuditoria()
+    atexit.register(b.fechar)
+    return b
+
+
+def registrar(acao: str, ator: str, alvo: str = "", rota: str = None, **detalhes):
+    """Anota a ação (sem esperar o banco). Falha aqui nunca derruba quem chamou."""
+    try:
+        buffer_auditoria().registrar({
+            "em": br_now().isoformat(),
+            "ator": str(ator or "").strip() or "?",
+            "acao": acao,
+            "alvo": str(alvo or "").strip() or None,
+            "rota": rota,
+            "detalhes": detalhes or None,
+        })
+    except Exception:
+        metricas.contar("auditoria_erro")
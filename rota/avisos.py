@@ -0,0 +1,317 @@
+"""Avisos de promoção do excedente (tabela `avisos`, sql/migracoes/0009_avisos.sql).
+
+    python -m rota.avisos enviar [--lote 50]    # entrega os pendentes (cron / outra máquina)
+
+Quando alguém das vagas exclui a presença, o primeiro "Exc-" passa a ter
+vaga. A ordenação de cada versão da lista (tela do usuário e API) chama
+`observar`, que compara os assentos com os da última versão vista: quem
+estava no excedente e agora tem número ganha um aviso por e-mail. Presença
+é identificada por e-mail + horário da confirmação: quem confirma de novo
+num ciclo novo não conta como promovido.
+
+A última versão vista fica no processo e, com ROTA_CACHE_URL, também no
+backend compartilhado (rota/cache.py): a réplica que calcula a versão nova
+compara com a anterior mesmo que outra tenha calculado aquela.
+
+`observar` não espera o banco: os avisos vão para o `Carteiro`, uma thread
+do processo que grava a fila (chave única: a mesma promoção vista por várias
+réplicas vira um aviso só) e entrega os pendentes em lotes, uma conexão SMTP
+por lote. A entrega só roda onde EMAIL_* (rota/correio.py) está configurado;
+aviso que falhou volta à fila depois de PRAZO s, até MAX_TENTATIVAS.
+"""
+
+import argparse
+import atexit
+import json
+import threading
+import time as time_module
+from collections import deque
+
+import streamlit as st
+
+from rota import cache, correio, metricas
+from rota.db import avisos_enfileirar, avisos_pegar, avisos_enviados, avisos_erro
+
+LOTE = 50
+MAX_TENTATIVAS = 5
+PRAZO = 300
+# a última versão vista no backend compartilhado vale bem mais que um ciclo
+TTL_ASSENTOS = 24 * 3600
+
+
+# ==========================================================
+# DETECÇÃO (versão anterior x versão nova da lista)
+# ==========================================================
+_anteriores = {}   # rota -> (versao, {presença no excedente})
+_anteriores_lock = threading.Lock()
+
+
+def _presenca(email, data_hora) -> str:
+    return f"{str(email or '').strip().lower()}|{data_hora}"
+
+
+def assentos(df_o) -> tuple:
+    """({presença: "Nº"} de quem tem vaga, {presença} do excedente) de uma lista ordenada."""
+    sentados, excedentes = {}, set()
+    if df_o is None or df_o.empty:
+        return sentados, excedentes
+    for n, email, dh in zip(df_o["Nº"], df_o["EMAIL"], df_o["DATA_HORA"]):
+        p = _presenca(email, dh)
+        if str(n).startswith("Exc-"):
+            excedentes.add(p)
+        else:
+            sentados[p] = str(n)
+    return sentados, excedentes
+
+
+def _chave_compartilhada(rota_id: str) -> str:
+    return f"{cache.PREFIXO}assentos:{rota_id}"
+
+
+def _anterior(rota_id: str):
+    with _anteriores_lock:
+        local = _anteriores.get(rota_id)
+    b = cache.backend()
+    if not b.externo:
+        return local
+    try:
+        v = b.get(_chave_compartilhada(rota_id))
+    except Exception:
+        metricas.contar("cache_backend_erro", "assentos")
+        return local
+    if v is None:
+        return local
+    d = json.loads(v)
+    if local is not None and local[0] >= d["versao"]:
+        return local
+    return d["versao"], set(d["excedentes"])
+
+
+def _guardar(rota_id: str, versao: int, excedentes: set):
+    with _anteriores_lock:
+        atual = _anteriores.get(rota_id)
+        if atual is None or atual[0] < versao:
+            _anteriores[rota_id] = (versao, excedentes)
+    b = cache.backend()
+    if b.externo:
+        try:
+            valor = json.dumps({"versao": versao, "excedentes": sorted(excedentes)}).encode()
+            b.set(_chave_compartilhada(rota_id), valor, TTL_ASSENTOS)
+        except Exception:
+            metricas.contar("cache_backend_erro", "assentos")
+
+
+def _aviso(rota, df_o, i: int) -> dict:
+    r = df_o.iloc[i]
+    email = str(r["EMAIL"]).strip().lower()
+    linhas = [
+        f"Olá, {r['GRADUAÇÃO']} {r['NOME']}!",
+        "",
+        f"Abriu vaga na lista de presença da rota {rota.nome}: você saiu do excedente "
+        f"e agora é o Nº {r['Nº']}.",
+        "",
+        "Se não for mais embarcar, exclua sua presença no app para liberar a vaga para o próximo.",
+        "",
+        "Mensagem automática.",
+    ]
+    return {
+        "chave": f"promocao|{rota.id}|{_presenca(email, r['DATA_HORA'])}",
+        "canal": "email",
+        "destino": email,
+        "assunto": f"Você tem vaga - {rota.nome}",
+        "corpo": "\n".join(linhas),
+    }
+
+
+def promovidos(rota, versao: int, df_o) -> list:
+    """Avisos de quem passou do excedente para uma vaga desde a última versão vista
+    (e guarda esta como a última). Versão mais velha que a vista: nada."""
+    sentados, excedentes = assentos(df_o)
+    anterior = _anterior(rota.id)
+    _guardar(rota.id, versao, excedentes)
+    if anterior is None or anterior[0] >= versao:
+        return []
+    antes = anterior[1]
+    if not antes:
+        return []
+    avisos = []
+    for i, (email, dh) in enumerate(zip(df_o["EMAIL"], df_o["DATA_HORA"])):
+        p = _presenca(email, dh)
+        if p in antes and p in sentados:
+            avisos.append(_aviso(rota, df_o, i))
+    return avisos
+
+
+def observar(rota, versao: int, df_o, carteiro=None):
+    """Chamado pela ordenação de cada versão da lista; nunca levanta nem espera o banco."""
+    if versao < 0:
+        return
+    try:
+        avisos = promovidos(rota, versao, df_o)
+        if avisos:
+            metricas.contar("promocao_detectada", rota.id, len(avisos))
+            (carteiro or carteiro_avisos()).enfileirar(avisos)
+    except Exception:
+        metricas.contar("avisos_erro", "observar")
+
+
+# ==========================================================
+# FILA + ENTREGA (thread do processo)
+# ==========================================================
+def _enviar_emails(lote: list) -> list:
+    return correio.enviar_emails([(a["destino"], a["assunto"], a["corpo"]) for a in lote])
+
+
+class Carteiro:
+    """Grava os avisos novos na fila do banco e entrega os pendentes em lotes.
+
+    `enviar(lote) -> [None | erro, ...]` entrega um lote (padrão: e-mail numa
+    conexão SMTP); `entregar=False` só grava a fila (outro processo entrega).
+    """
+
+    def __init__(self, lote: int = LOTE, intervalo: float = 60.0, espera: float = 1.0, capacidade: int = 1000,
+                 enviar=None, entregar=None, prazo: int = PRAZO, max_tentativas: int = MAX_TENTATIVAS):
+        self.lote = lote
+        self.intervalo = intervalo
+        self.espera = espera
+        self.capacidade = capacidade
+        self.prazo = prazo
+        self.max_tentativas = max_tentativas
+        self._enviar = enviar or _enviar_emails
+        self._entregar = entregar
+        self._lock = threading.Lock()
+        self._novo = threading.Condition(self._lock)
+        self._novos = deque()
+        self._fechado = False
+        self._parar = threading.Event()
+        self._thread = None
+        self.descartados = 0
+
+    @property
+    def entrega_ativa(self) -> bool:
+        if self._entregar is None:
+            self._entregar = correio.email_configurado()
+        return self._entregar
+
+    def enfileirar(self, avisos: list):
+        with self._lock:
+            for a in avisos:
+                if len(self._novos) >= self.capacidade:
+                    self._novos.popleft()
+                    self.descartados += 1
+                    metricas.contar("avisos_descartados")
+                self._novos.append(a)
+            if self._thread is None and not self._fechado:
+                self._thread = threading.Thread(target=self._laco, name="rota-avisos", daemon=True)
+                self._thread.start()
+            self._novo.notify()
+
+    def pendentes(self) -> int:
+        with self._lock:
+            return len(self._novos)
+
+    def gravar(self) -> bool:
+        """Grava na fila do banco os avisos novos. False se o banco recusou (eles esperam)."""
+        with self._lock:
+            rows = list({a["chave"]: a for a in self._novos}.values())
+            self._novos.clear()
+        if not rows:
+            return True
+        try:
+            avisos_enfileirar(rows)
+            metricas.contar("avisos_enfileirados", n=len(rows))
+            return True
+        except Exception:
+            metricas.contar("avisos_erro", "gravar")
+            with self._lock:
+                self._novos.extendleft(reversed(rows))
+                while len(self._novos) > self.capacidade:
+                    self._novos.popleft()
+                    self.descartados += 1
+            return False
+
+    def entregar(self) -> int:
+        """Entrega lote a lote até a fila esvaziar; devolve quantos foram enviados."""
+        total = 0
+        while True:
+            lote = avisos_pegar(self.lote, self.max_tentativas, self.prazo)
+            if not lote:
+                return total
+            try:
+                erros = self._enviar(lote)
+            except Exception as ex:
+                # conexão/login: o lote inteiro volta depois do prazo
+                erros = [str(ex) or type(ex).__name__] * len(lote)
+            ok = [a["id"] for a, erro in zip(lote, erros) if not erro]
+            avisos_enviados(ok)
+            metricas.contar("avisos_enviados", n=len(ok))
+            for a, erro in zip(lote, erros):
+                if erro:
+                    metricas.contar("avisos_erro", "enviar")
+                    avisos_erro(a["id"], erro)
+            total += len(ok)
+            if len(lote) < self.lote:
+                return total
+
+    def _laco(self):
+        while True:
+            with self._lock:
+                if not self._novos and not self._fechado:
+                    # sem avisos novos: a cada intervalo, entrega o que outros processos enfileiraram
+                    self._novo.wait(self.intervalo)
+                # junta as promoções de uma rajada de exclusões num lote só
+                limite = time_module.monotonic() + self.espera
+                while self._novos and not self._fechado:
+                    resta = limite - time_module.monotonic()
+                    if resta <= 0:
+                        break
+                    self._novo.wait(resta)
+                if self._fechado:
+                    return
+            if not self.gravar():
+                # banco fora do ar: espera um intervalo (só o `fechar` acorda)
+                self._parar.wait(self.intervalo)
+                continue
+            try:
+                if self.entrega_ativa:
+                    self.entregar()
+            except Exception:
+                metricas.contar("avisos_erro", "entregar")
+
+    def fechar(self, timeout: float = 5.0) -> bool:
+        """Para a thread e grava na fila o que ficou na memória (a entrega fica para depois)."""
+        with self._lock:
+            self._fechado = True
+            self._parar.set()
+            self._novo.notify_all()
+            t = self._thread
+        if t is not None:
+            t.join(timeout)
+        limite = time_module.monotonic() + timeout
+        while not self.gravar() and time_module.monotonic() < limite:
+            time_module.sleep(0.2)
+        return self.pendentes() == 0
+
+
+@st.cache_resource
+def carteiro_avisos() -> Carteiro:
+    c = Carteiro()
+    atexit.register(c.fechar)
+    return c
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("enviar", help="entrega os avisos pendentes")
+    p.add_argument("--lote", type=int, default=LOTE)
+    args = ap.parse_args(argv)
+
+    if args.cmd == "enviar":
+        n = Carteiro(lote=args.lote, entregar=True).entregar()
+        print(f"{n} avisos enviados")
+        return n
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+"""Cache das leituras (`buscar_*`) com backend plugável, compartilhável entre réplicas.
+
+Padrão: memória do processo (mesmo alcance do `st.cache_data`). Com várias
+réplicas do Streamlit atrás de um balanceador, aponte todas para o mesmo Redis:
+
+    ROTA_CACHE_URL=redis://host:6379/0      (pip install -r requirements-cache.txt)
+
+Cada função decorada com `compartilhado(nome, ttl)` guarda o resultado no
+backend sob uma chave versionada `rota:<nome>:g<geração>:<args>`. `.clear()`
+incrementa a geração no backend (as chaves antigas ficam órfãs e expiram pelo
+TTL) e publica no canal `rota:invalidar`, para que todas as réplicas larguem a
+cópia local na hora. Assim a lista de presença e a ordenação de uma versão são
+buscadas/calculadas uma vez para o cluster, não uma vez por réplica.
+
+Na frente do backend fica uma cópia local (L1) por processo, válida pelo mesmo
+TTL, que evita ida ao Redis a cada rerun. Quando várias réplicas erram a
+mesma chave ao mesmo tempo, só a que pega a trava (`SET NX`) vai ao banco.
+Falha do Redis nunca derruba a leitura: cai para calcular localmente e conta
+`cache_backend_erro`.
+
+`por_rota(nome, ttl)` faz o mesmo com um cache independente por rota (primeiro
+argumento): geração, LRU e `.clear(rota)` de uma rota não tocam nas outras.
+"""
+
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from rota import metricas
+
+PREFIXO = "rota:"
+CANAL_INVALIDAR = "rota:invalidar"
+
+# miss simultâneo em várias réplicas: uma busca no banco, as outras esperam o valor
+ESPERA_MAX = 2.0
+ESPERA_PASSO = 0.02
+
+
+# ==========================================================
+# BACKENDS
+# ==========================================================
+class MemoriaBackend:
+    """Sem backend externo: só a cópia local de cada processo (comportamento antigo)."""
+
+    externo = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._geracoes = {}
+
+    def get(self, chave: str):
+        return None
+
+    def set(self, chave: str, valor: bytes, ttl: float):
+        pass
+
+    def geracao(self, nome: str) -> int:
+        with self._lock:
+            return self._geracoes.get(nome, 0)
+
+    def incr_geracao(self, nome: str) -> int:
+        with self._lock:
+            self._geracoes[nome] = self._geracoes.get(nome, 0) + 1
+            return self._geracoes[nome]
+
+    def travar(self, chave: str, ttl: float) -> bool:
+        return True
+
+    def soltar(self, chave: str):
+        pass
+
+    def publicar(self, mensagem: str):
+        pass
+
+    def assinar(self, callback):
+        pass
+
+
+class RedisBackend:
+    """Qualquer servidor que fale o protocolo do Redis (Redis, Valkey, KeyDB...)."""
+
+    externo = True
+
+    def __init__(self, url: str = "", cliente=None):
+        if cliente is None:
+            import redis  # dependência opcional: só com ROTA_CACHE_URL configurado
+            cliente = redis.Redis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0)
+        self.r = cliente
+        self._ouvinte = None
+
+    def get(self, chave: str):
+        return self.r.get(chave)
+
+    def set(self, chave: str, valor: bytes, ttl: float):
+        self.r.set(chave, valor, px=max(1, int(ttl * 1000)))
+
+    def geracao(self, nome: str) -> int:
+        v = self.r.get(f"{PREFIXO}ger:{nome}")
+        return int(v) if v is not None else 0
+
+    def incr_geracao(self, nome: str) -> int:
+        return int(self.r.incr(f"{PREFIXO}ger:{nome}"))
+
+    def travar(self, chave: str, ttl: float) -> bool:
+        return bool(self.r.set(chave + ":trava", b"1", nx=True, px=max(1, int(ttl * 1000))))
+
+    def soltar(self, chave: str):
+        self.r.delete(chave + ":trava")
+
+    def publicar(self, mensagem: str):
+        self.r.publish(CANAL_INVALIDAR, mensagem)
+
+    def assinar(self, callback):
+        if self._ouvinte is not None:
+            return
+
+        def ouvir():
+            while True:
+                try:
+                    ps = self.r.pubsub(ignore_subscribe_messages=True)
+                    ps.subscribe(CANAL_INVALIDAR)
+                    for msg in ps.listen():
+                        dado = msg.get("data")
+                        callback(dado.decode() if isinstance(dado, bytes) else str(dado))
+                except Exception:
+                    # conexão caiu: sem avisos, a cópia local vale no máximo o TTL
+                    metricas.contar("cache_backend_erro", "pubsub")
+                    time.sleep(1.0)
+
+        self._ouvinte = threading.Thread(target=ouvir, name="rota-cache-pubsub", daemon=True)
+        self._ouvinte.start()
+
+
+# ==========================================================
+# ESTADO DO PROCESSO
+# ==========================================================
+_lock = threading.Lock()
+_backend = None
+_funcoes = {}   # nome -> _Compartilhado
+
+
+def _backend_padrao():
+    url = os.environ.get("ROTA_CACHE_URL", "").strip()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            return RedisBackend(url)
+        except Exception:
+            metricas.contar("cache_backend_erro", "conexao")
+    return MemoriaBackend()
+
+
+def backend():
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                _backend = _backend_padrao()
+                _backend.assinar(_ao_invalidar)
+    return _backend
+
+
+def definir_backend(b):
+    """Troca o backend (None volta ao padrão do ambiente) e zera as cópias locais."""
+    global _backend
+    with _lock:
+        _backend = b
+        if b is not None:
+            b.assinar(_ao_invalidar)
+    for f in list(_funcoes.values()):
+        f.esquecer()
+
+
+def _ao_invalidar(mensagem: str):
+    # "<nome>:<geração>"
+    nome, _, ger = mensagem.rpartition(":")
+    f = _funcoes.get(nome)
+    if f is not None:
+        metricas.contar("cache_invalidacao_recebida", nome)
+        f.esquecer(int(ger) if ger.isdigit() else None)
+
+
+# ==========================================================
+# DECORATOR
+# ==========================================================
+class _Compartilhado:
+    def __init__(self, fn, nome: str, ttl: float, max_entries: int):
+        self.fn = fn
+        self.nome = nome
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._local = OrderedDict()    # chave -> (expira_em, valor)
+        self._voando = {}              # chave -> Lock (uma busca por chave no processo)
+        self._ger = None               # (geração, lida_em)
+
+    def esquecer(self, geracao: int = None):
+        with self._lock:
+            self._local.clear()
+            self._ger = (geracao, time.monotonic()) if geracao is not None else None
+
+    def _geracao(self, b) -> int:
+        agora = time.monotonic()
+        g = self._ger
+        if g is not None and agora - g[1] < self.ttl:
+            return g[0]
+        try:
+            ger = b.geracao(self.nome)
+        except Exception:
+            metricas.contar("cache_backend_erro", "geracao")
+            ger = g[0] if g is not None else 0
+        self._ger = (ger, agora)
+        return ger
+
+    def _do_local(self, chave):
+        with self._lock:
+            item = self._local.get(chave)
+            if item is None:
+                return False, None
+            if item[0] <= time.monotonic():
+                del self._local[chave]
+                return False, None
+            self._local.move_to_end(chave)
+            return True, item[1]
+
+    def _guardar_local(self, chave, valor):
+        with self._lock:
+            self._local[chave] = (time.monotonic() + self.ttl, valor)
+            self._local.move_to_end(chave)
+            while self.max_entries and len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+    def _do_backend(self, b, chave):
+        try:
+            bruto = b.get(chave)
+        except Exception:
+            metricas.contar("cache_backend_erro", "get")
+            return False, None
+        if bruto is None:
+            return False, None
+        metricas.contar("cache_backend_hit", self.nome)
+        valor = pickle.loads(bruto)
+        self._guardar_local(chave, valor)
+        return True, valor
+
+    def _buscar(self, b, chave, args, kwargs):
+        dono = False
+        if b.externo:
+            achou, valor = self._do_backend(b, chave)
+            if achou:
+                return valor
+            try:
+                dono = b.travar(chave, ESPERA_MAX)
+            except Exception:
+                metricas.contar("cache_backend_erro", "trava")
+                dono = True
+            if not dono:
+                # outra réplica já está buscando (ex.: todas invalidadas pelo mesmo .clear()):
+                # espera o valor aparecer no backend em vez de ir ao banco também
+                fim = time.monotonic() + ESPERA_MAX
+                while time.monotonic() < fim:
+                    time.sleep(ESPERA_PASSO)
+                    achou, valor = self._do_backend(b, chave)
+                    if achou:
+                        return valor
+                metricas.contar("cache_espera_esgotada", self.nome)
+        valor = self.fn(*args, **kwargs)
+        if b.externo:
+            try:
+                b.set(chave, pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL), self.ttl)
+                if dono:
+                    b.soltar(chave)
+            except Exception:
+                metricas.contar("cache_backend_erro", "set")
+        self._guardar_local(chave, valor)
+        return valor
+
+    def __call__(self, *args, **kwargs):
+        b = backend()
+        chave = f"{PREFIXO}{self.nome}:g{self._geracao(b)}:{args!r}:{sorted(kwargs.items())!r}"
+        achou, valor = self._do_local(chave)
+        if achou:
+            return valor
+
+        with self._lock:
+            trava = self._voando.setdefault(chave, threading.Lock())
+        try:
+            with trava:
+                # quem esperava a trava encontra o valor que o primeiro acabou de buscar
+                achou, valor = self._do_local(chave)
+                if achou:
+                    return valor
+                return self._buscar(b, chave, args, kwargs)
+        finally:
+            with self._lock:
+                self._voando.pop(chave, None)
+
+    def clear(self):
+        b = backend()
+        try:
+            ger = b.incr_geracao(self.nome)
+            b.publicar(f"{self.nome}:{ger}")
+        except Exception:
+            metricas.contar("cache_backend_erro", "clear")
+            ger = None
+        self.esquecer(ger)
+
+
+def compartilhado(nome: str, ttl: float, max_entries: int = 0):
+    """Como `st.cache_data(ttl=...)`, mas no backend configurado e com `.clear()` que
+    vale para todas as réplicas. O valor devolvido é o mesmo objeto para todas as
+    sessões do processo: trate como somente leitura."""
+    def deco(fn):
+        c = _Compartilhado(fn, nome, ttl, max_entries)
+        _funcoes[nome] = c
+
+        @wraps(fn)
+        def chamada(*args, **kwargs):
+            return c(*args, **kwargs)
+
+        chamada.clear = c.clear
+        return chamada
+    return deco
+
+
+def por_rota(nome: str, ttl: float, max_entries: int = 0, padrao: str = None):
+    """Como `compartilhado`, particionado pelo primeiro argumento (id da rota).
+
+    Cada rota tem a própria geração e o próprio limite de entradas: confirmar
+    presença numa rota (`.clear(rota)`) não invalida a lista das outras, e mais
+    rotas não disputam as `max_entries` de uma. `.clear()` sem rota limpa todas
+    as rotas já vistas neste processo."""
+    def deco(fn):
+        partes = {}
+        trava = threading.Lock()
+
+        def de(rota):
+            c = partes.get(rota)
+            if c is None:
+                with trava:
+                    c = partes.get(rota)
+                    if c is None:
+                        c = partes[rota] = _Compartilhado(fn, f"{nome}@{rota}", ttl, max_entries)
+                        _funcoes[c.nome] = c
+            return c
+
+        @wraps(fn)
+        def chamada(*args, **kwargs):
+            if args:
+                rota, args = args[0], args[1:]
+            else:
+                rota = kwargs.pop("rota", padrao)
+            return de(rota)(rota, *args, **kwargs)
+
+        def clear(rota=None):
+            for c in ([de(rota)] if rota is not None else list(partes.values())):
+                c.clear()
+
+        chamada.clear = clear
+        return chamada
+    return deco
@@ -0,0 +1,184 @@
+"""Regras de ciclo: relógio BR, abertura/fechamento da lista e virada (limpeza).
+
+Os horários saem das duas saídas da rota (`Rota.saidas`, padrão 06:30 / 18:30):
+a lista fecha `FECHA_ANTES` minutos antes de cada saída e reabre
+`REABRE_APOS` depois; a virada (marco do ciclo) fica `MARCO_APOS` após a saída.
+"""
+
+from datetime import datetime, time, timedelta
+
+from dateutil.parser import isoparse
+
+from rota.constantes import FUSO_BR, FECHA_ANTES, REABRE_APOS, MARCO_APOS
+from rota import metricas
+from rota.db import presenca_select, presenca_delete, conferencia_delete_outros_ciclos
+from rota.modelos import ROTA_UNICA
+
+
+# ==========================================================
+# RELÓGIO
+# ==========================================================
+_relogio = None
+
+def definir_relogio(fn):
+    """Troca o relógio do app (ex.: simulações fixam um horário com a lista aberta). None volta ao real."""
+    global _relogio
+    _relogio = fn
+
+def br_now():
+    if _relogio is not None:
+        return _relogio()
+    return datetime.now(FUSO_BR)
+
+def fmt_dt(dt: datetime) -> str:
+    return dt.strftime("%d/%m/%Y %H:%M:%S")
+
+def parse_dt(s: str):
+    """Converte strings para datetime timezone-aware (FUSO_BR). Aceita 'DD/MM/YYYY HH:MM:SS' e ISO."""
+    if s is None:
+        return None
+    ss = str(s).strip()
+    if not ss:
+        return None
+    # Formato legado do Sheets
+    try:
+        return FUSO_BR.localize(datetime.strptime(ss, "%d/%m/%Y %H:%M:%S"))
+    except Exception:
+        pass
+    # ISO / Postgres
+    try:
+        if ss.endswith("Z"):
+            ss = ss[:-1] + "+00:00"
+        try:
+            dt2 = datetime.fromisoformat(ss.replace("T", " "))
+        except ValueError:
+            # antes do Python 3.11 o fromisoformat recusa fração com 1-5 dígitos
+            # ("...10:00:00.12345+00:00", como o PostgREST devolve) e fuso "+00"
+            dt2 = isoparse(ss)
+        if dt2.tzinfo is None:
+            dt2 = FUSO_BR.localize(dt2)
+        return dt2
+    except Exception:
+        return None
+
+# ==========================================================
+# HORÁRIOS DA ROTA (minutos desde 00:00)
+# ==========================================================
+def _minutos(hhmm: str) -> int:
+    h, m = str(hhmm).split(":")
+    return int(h) * 60 + int(m)
+
+def _hora(minutos: int) -> time:
+    # por timedelta: um horário fora de 00:00-23:59 dá a volta no dia em vez de
+    # derrubar a página (Rota.validar já recusa saídas assim)
+    return (datetime.min + timedelta(minutes=minutos)).time()
+
+def _no_dia(agora: datetime, minutos: int) -> datetime:
+    return agora.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(minutes=minutos)
+
+def _saidas(rota) -> tuple:
+    rota = rota or ROTA_UNICA
+    return _minutos(rota.saidas[0]), _minutos(rota.saidas[1])
+
+# ==========================================================
+# PRESENÇA: limpeza por ciclo (equivalente ao resize do Sheets)
+# ==========================================================
+def marco_do_ciclo(agora: datetime, rota=None) -> datetime:
+    s1, s2 = _saidas(rota)
+    m1, m2 = s1 + MARCO_APOS, s2 + MARCO_APOS
+    hora_atual = agora.time()
+    if hora_atual >= _hora(m2):
+        return _no_dia(agora, m2)
+    if hora_atual >= _hora(m1):
+        return _no_dia(agora, m1)
+    return _no_dia(agora - timedelta(days=1), m2)
+
+def ciclo_expirado(presencas_rows, agora: datetime = None, rota=None) -> bool:
+    """True se a presença mais recente for anterior ao marco do ciclo atual (lista deve ser zerada)."""
+    if not presencas_rows:
+        return False
+    agora = agora or br_now()
+    # pega a mais recente
+    last = max(presencas_rows, key=lambda r: str(r.get("data_hora", "")) or "")
+    last_dt = parse_dt(last.get("data_hora"))
+    if last_dt is None:
+        return False
+    return last_dt < marco_do_ciclo(agora, rota)
+
+def limpar_ciclo(rota=None):
+    rota = rota or ROTA_UNICA
+    # antes de apagar: resumo do ciclo que terminou (rota/estatisticas.py).
+    # Import local: estatisticas usa ordenacao, que importa este módulo.
+    from rota.estatisticas import registrar_ciclo
+    try:
+        registrar_ciclo(presenca_select(primario=True, rota=rota.id), rota)
+    except Exception:
+        # estatística nunca impede a virada
+        metricas.contar("estatisticas_erro")
+    presenca_delete(rota=rota.id)  # deleta tudo (da rota)
+    try:
+        ciclo_h, ciclo_d = obter_ciclo_atual(rota)
+        conferencia_delete_outros_ciclos(ciclo_conferencia(rota, ciclo_h, ciclo_d), rota.id)
+    except Exception:
+        pass
+
+def status_lista(agora: datetime = None, rota=None):
+    """(is_aberto, janela_conferencia) pelas regras de horário da rota."""
+    agora = agora or br_now()
+    hora_atual, dia_semana = agora.time(), agora.weekday()
+    s1, s2 = _saidas(rota)
+    fecha1, abre1 = _hora(s1 - FECHA_ANTES), _hora(s1 + REABRE_APOS)
+    fecha2, abre2 = _hora(s2 - FECHA_ANTES), _hora(s2 + REABRE_APOS)
+
+    # Regras de abertura/fechamento (idênticas)
+    if dia_semana == 5:  # Sábado
+        is_aberto = False
+    elif dia_semana == 6:  # Domingo
+        is_aberto = (hora_atual >= abre2)
+    elif dia_semana == 4:  # Sexta
+        if hora_atual >= fecha2:
+            is_aberto = False
+        elif fecha1 <= hora_atual < abre1:
+            is_aberto = False
+        else:
+            is_aberto = True
+    else:  # Segunda a Quinta
+        if (fecha1 <= hora_atual < abre1) or (fecha2 <= hora_atual < abre2):
+            is_aberto = False
+        else:
+            is_aberto = True
+
+    janela_conferencia = (fecha1 < hora_atual < abre1) or (fecha2 < hora_atual < abre2)
+    return is_aberto, janela_conferencia
+
+# ==========================================================
+# CICLO (texto abaixo do título)
+# ==========================================================
+def obter_ciclo_atual(rota=None, agora: datetime = None):
+    rota = rota or ROTA_UNICA
+    s1, s2 = _saidas(rota)
+    agora = agora or br_now()
+    t = agora.time()
+    wd = agora.weekday()
+
+    em_fechamento_fds = (wd == 4 and t >= _hora(s2 - FECHA_ANTES)) or (wd == 5) or (wd == 6 and t < _hora(s2 + REABRE_APOS))
+    if em_fechamento_fds:
+        dias_para_seg = (7 - wd) % 7
+        alvo_dt = (agora + timedelta(days=dias_para_seg)).date()
+        alvo_h = rota.saidas[0]
+    else:
+        if t >= _hora(s2 + REABRE_APOS):
+            alvo_dt = (agora + timedelta(days=1)).date()
+            alvo_h = rota.saidas[0]
+        elif t < _hora(s1 + REABRE_APOS):
+            alvo_dt = agora.date()
+            alvo_h = rota.saidas[0]
+        else:
+            alvo_dt = agora.date()
+            alvo_h = rota.saidas[1]
+
+    return alvo_h, alvo_dt.strftime("%d/%m/%Y")
+
+def ciclo_conferencia(rota, ciclo_h: str, ciclo_d: str) -> str:
+    """Chave do ciclo na tabela `conferencia`: "<rota>|DD/MM/YYYY HH:MM"."""
+    return f"{(rota or ROTA_UNICA).id}|{ciclo_d} {ciclo_h}"
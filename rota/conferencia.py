@@ -0,0 +1,74 @@
+"""Conferência de embarque: fila de gravação com debounce (compartilhada no processo)."""
+
+import threading
+import time as time_module
+
+import streamlit as st
+
+from rota.ciclo import br_now
+from rota.db import conferencia_upsert, buscar_conferencia_atualizada
+
+
+class FilaConferencia:
+    """Acumula as marcações dos checkboxes e grava tudo de uma vez (upsert em lote)
+    depois de `atraso` segundos sem novos cliques, ou no máximo `atraso_max` após o primeiro."""
+
+    def __init__(self, atraso: float = 1.0, atraso_max: float = 4.0):
+        self.atraso = atraso
+        self.atraso_max = atraso_max
+        self._lock = threading.Lock()
+        self._pendentes = {}
+        self._primeiro = None
+        self._timer = None
+
+    def marcar(self, ciclo: str, email: str, marcado: bool, por: str = ""):
+        with self._lock:
+            self._pendentes[(ciclo, email)] = {
+                "ciclo": ciclo,
+                "email": email,
+                "marcado": bool(marcado),
+                "marcado_por": por,
+                "atualizado_em": br_now().isoformat(),
+            }
+            agora = time_module.monotonic()
+            if self._primeiro is None:
+                self._primeiro = agora
+            espera = min(self.atraso, max(0.0, self._primeiro + self.atraso_max - agora))
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(espera, self.descarregar)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def pendentes(self, ciclo: str) -> dict:
+        with self._lock:
+            return {e: r["marcado"] for (c, e), r in self._pendentes.items() if c == ciclo}
+
+    def descarregar(self):
+        with self._lock:
+            lote = dict(self._pendentes)
+            self._pendentes.clear()
+            self._primeiro = None
+            self._timer = None
+        if not lote:
+            return
+        try:
+            conferencia_upsert(list(lote.values()))
+            # ciclo = "<rota>|...": invalida só as rotas que tiveram marcações
+            for rota in {c.split("|", 1)[0] for c, _ in lote}:
+                buscar_conferencia_atualizada.clear(rota)
+        except Exception:
+            # devolve para a fila o que não foi sobrescrito por um clique mais novo
+            with self._lock:
+                for k, r in lote.items():
+                    self._pendentes.setdefault(k, r)
+                if self._primeiro is None:
+                    self._primeiro = time_module.monotonic()
+                if self._timer is None:
+                    self._timer = threading.Timer(self.atraso_max, self.descarregar)
+                    self._timer.daemon = True
+                    self._timer.start()
+
+@st.cache_resource
+def fila_conferencia() -> FilaConferencia:
+    return FilaConferencia()
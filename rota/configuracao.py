@@ -0,0 +1,122 @@
+"""Configuração do deploy (tabela `config`) lida de uma vez, tipada e validada.
+
+Uma consulta traz a tabela inteira e vira um `Configuracao` imutável
+(limite de usuários, rotas). Ler um campo depois disso
+não custa nada: a tela pega `configuracao().limite_usuarios`, não uma chave.
+
+Cache por versão, como a lista de presença: a chave "config_versao" é gravada
+no mesmo upsert de cada alteração. O app relê só a versão a cada
+`TTL_VERSAO` s e a tabela inteira quando ela muda (ou a cada `TTL_TABELA` s,
+para pegar alterações feitas direto no SQL, sem versão nova).
+
+Chaves com cache próprio ficam de fora ("presenca_versao*", que muda a cada
+clique). Valor inválido no banco não derruba o app: vale o padrão do campo e
+conta `config_invalida`.
+"""
+
+import threading
+import time as time_module
+from dataclasses import dataclass
+
+from rota import cache, metricas
+from rota.constantes import ROTA_PADRAO
+from rota.db import config_get, config_todas, config_upsert
+from rota.modelos import Rota, ROTA_UNICA
+
+CHAVE_VERSAO = "config_versao"
+PREFIXO_ROTA = "rota:"
+TTL_VERSAO = 5
+TTL_TABELA = 300
+
+
+@dataclass(frozen=True)
+class Configuracao:
+    versao: int = 0
+    limite_usuarios: int = 100
+    # a rota padrão primeiro, depois pelo id; só a rota padrão se não houver nenhuma
+    rotas: tuple = (ROTA_UNICA,)
+
+
+# ==========================================================
+# TIPOS (texto do banco <-> valor do campo)
+# ==========================================================
+def _inteiro_positivo(v) -> int:
+    n = int(str(v).strip())
+    if n <= 0:
+        raise ValueError("Deve ser maior que zero.")
+    return n
+
+# chave -> (campo, texto -> valor, valor -> texto)
+CAMPOS = {
+    "limite_usuarios": ("limite_usuarios", _inteiro_positivo, str),
+}
+
+def montar(linhas) -> Configuracao:
+    """Linhas (key, value) do `config` -> Configuracao (inválidas ficam no padrão)."""
+    valores, rotas, versao = {}, [], 0
+    for r in linhas:
+        chave, valor = str(r.get("key", "")), r.get("value")
+        try:
+            if chave == CHAVE_VERSAO:
+                versao = int(str(valor))
+            elif chave.startswith("presenca_versao"):
+                continue
+            elif chave.startswith(PREFIXO_ROTA):
+                rotas.append(Rota.de_config(chave[len(PREFIXO_ROTA):], valor))
+            elif chave in CAMPOS:
+                campo, ler, _ = CAMPOS[chave]
+                valores[campo] = ler(valor)
+        except (ValueError, TypeError, KeyError, AttributeError):
+            metricas.contar("config_invalida", chave.split(":")[0])
+    rotas.sort(key=lambda r: (r.id != ROTA_PADRAO, r.id))
+    return Configuracao(versao=versao, rotas=tuple(rotas) or (ROTA_UNICA,), **valores)
+
+
+# ==========================================================
+# LEITURA (uma consulta por versão)
+# ==========================================================
+@metricas.cache_medido(cache.compartilhado("config_versao", ttl=TTL_VERSAO))
+def buscar_config_versao() -> int:
+    try:
+        return int(str(config_get(CHAVE_VERSAO, "0")))
+    except ValueError:
+        return 0
+
+@metricas.cache_medido(cache.compartilhado("configuracao", ttl=TTL_TABELA, max_entries=2))
+def buscar_configuracao(versao: int) -> Configuracao:
+    return montar(config_todas())
+
+def configuracao() -> Configuracao:
+    """Configuração atual. Erro do banco sobe (e não fica em cache)."""
+    return buscar_configuracao(buscar_config_versao())
+
+
+# ==========================================================
+# ESCRITA (upsert + versão nova no mesmo request)
+# ==========================================================
+def _texto(chave: str, valor) -> str:
+    """Valor validado no formato gravado no banco. ValueError se inválido."""
+    if chave.startswith(PREFIXO_ROTA):
+        r = valor if isinstance(valor, Rota) else Rota.de_config(chave[len(PREFIXO_ROTA):], valor)
+        r.validar()
+        return r.para_config()
+    if chave not in CAMPOS:
+        raise ValueError(f"Chave de configuração desconhecida: {chave}")
+    _, ler, escrever = CAMPOS[chave]
+    return escrever(ler(valor))
+
+_versao_lock = threading.Lock()
+_ultima_versao = 0
+
+def salvar(valores: dict) -> int:
+    """Grava {chave: valor} (validados antes de qualquer escrita) e devolve a versão nova."""
+    global _ultima_versao
+    linhas = {chave: _texto(chave, v) for chave, v in valores.items()}
+    with _versao_lock:
+        # duas gravações no mesmo milissegundo não podem repetir a versão (o cache é por versão)
+        versao = max(_ultima_versao + 1, int(time_module.time() * 1000))
+        _ultima_versao = versao
+    linhas[CHAVE_VERSAO] = str(versao)
+    config_upsert(linhas)
+    buscar_config_versao.clear()
+    return versao
@@ -0,0 +1,145 @@
+"""Confirmações de presença agrupadas (group commit, compartilhado no processo).
+
+Na abertura da lista (07:00 / 19:00) dezenas de cliques chegam em poucos
+segundos. Em vez de um insert (+ bump de versão) por clique, quem chega
+primeiro vira "líder": espera `janela` segundos, junta todos os pedidos que
+chegaram nesse meio tempo e grava tudo num insert de várias linhas, com um
+único bump de versão. Cada chamador recebe o próprio resultado (ou erro).
+
+Fora do pico (nenhum outro clique no último segundo) o líder não espera.
+
+Quem desiste (timeout) ainda na fila sai dela e a linha não é gravada; quem
+já está num lote em gravação espera o resultado (a linha pode ter entrado).
+A liderança só passa para quem ainda está na fila, ou seja, esperando.
+"""
+
+import threading
+import time as time_module
+
+import streamlit as st
+
+from rota import metricas
+from rota.db import presenca_insert, presenca_insert_lote
+
+
+class _Pedido:
+    __slots__ = ("row", "acordar", "feito", "lider", "gravando", "resultado", "erro")
+
+    def __init__(self, row: dict):
+        self.row = row
+        self.acordar = threading.Event()
+        self.feito = False
+        self.lider = False
+        self.gravando = False
+        self.resultado = None
+        self.erro = None
+
+
+def _erro_de_linha(ex) -> bool:
+    # SQLSTATE 23xxx (constraint) / 22xxx (dado inválido): culpa de uma linha, nada foi gravado
+    return str(getattr(ex, "code", "") or "")[:2] in ("22", "23")
+
+
+class LoteConfirmacoes:
+    """`inserir(row)` bloqueia até a linha ser gravada (em lote) e devolve `res.data` dela."""
+
+    def __init__(self, janela: float = 0.02, max_lote: int = 50, pico: float = 1.0):
+        self.janela = janela
+        self.max_lote = max_lote
+        self.pico = pico
+        self._lock = threading.Lock()
+        self._fila = []
+        self._conduzindo = False
+        self._ultima_chegada = float("-inf")
+        self._em_pico = False
+
+    def inserir(self, row: dict, timeout: float = 30.0):
+        p = _Pedido(row)
+        with self._lock:
+            agora = time_module.monotonic()
+            self._em_pico = agora - self._ultima_chegada < self.pico
+            self._ultima_chegada = agora
+            self._fila.append(p)
+            if not self._conduzindo:
+                self._conduzindo = True
+                p.lider = True
+
+        limite = time_module.monotonic() + timeout
+        while not p.feito:
+            if p.lider:
+                p.lider = False
+                self._conduzir()
+                continue
+            if not p.acordar.wait(max(0.0, limite - time_module.monotonic())):
+                with self._lock:
+                    if not p.lider and not p.gravando and not p.feito:
+                        # ainda na fila: sai dela (nunca vira líder nem entra num lote)
+                        self._fila.remove(p)
+                        metricas.contar("confirmacao_timeout")
+                        raise TimeoutError("Confirmação não gravada a tempo.")
+                # virou líder agora, ou a linha já está num lote: espera o resultado
+                if not p.lider:
+                    p.acordar.wait()
+                    p.acordar.clear()
+                continue
+            p.acordar.clear()
+        if p.erro is not None:
+            raise p.erro
+        return p.resultado
+
+    def _conduzir(self):
+        with self._lock:
+            esperar = self._em_pico and len(self._fila) < self.max_lote
+        if esperar:
+            # junta os cliques dos próximos milissegundos no mesmo insert
+            time_module.sleep(self.janela)
+        with self._lock:
+            lote, self._fila = self._fila[:self.max_lote], self._fila[self.max_lote:]
+            for p in lote:
+                p.gravando = True
+        try:
+            self._gravar(lote)
+        finally:
+            with self._lock:
+                for p in lote:
+                    p.feito = True
+                    p.acordar.set()
+                if self._fila:
+                    # passa a vez para o próximo da fila: quem desistiu já saiu dela (sob o
+                    # mesmo lock), então o próximo está vivo e esperando
+                    prox = self._fila[0]
+                    prox.lider = True
+                    prox.acordar.set()
+                else:
+                    self._conduzindo = False
+
+    def _gravar(self, lote):
+        # ordem do clique (data_hora) preservada também na ordem de inserção (ids)
+        lote.sort(key=lambda p: str(p.row.get("data_hora") or ""))
+        metricas.contar("confirmacao_lote")
+        metricas.contar("confirmacao_linhas", n=len(lote))
+        try:
+            res = presenca_insert_lote([p.row for p in lote])
+            for i, p in enumerate(lote):
+                p.resultado = [res[i]] if i < len(res) else []
+            return
+        except Exception as ex:
+            if len(lote) == 1 or not _erro_de_linha(ex):
+                # 429/5xx/rede (o sb_call já repetiu) ou resposta perdida: o lote pode até ter
+                # sido gravado; repetir linha a linha multiplicaria a carga e duplicaria presenças
+                for p in lote:
+                    p.erro = ex
+                return
+        # uma linha inválida (23xxx/22xxx) recusou o lote inteiro, que não foi gravado:
+        # cada um tenta sozinho e recebe o próprio resultado/erro
+        metricas.contar("confirmacao_lote_desfeito")
+        for p in lote:
+            try:
+                p.resultado = presenca_insert(p.row)
+            except Exception as ex:
+                p.erro = ex
+
+
+@st.cache_resource
+def lote_confirmacoes():
+    return LoteConfirmacoes()
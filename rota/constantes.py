@@ -0,0 +1,54 @@
+"""Constantes compartilhadas (fuso, tabelas, listas fixas)."""
+
+import pytz
+
+FUSO_BR = pytz.timezone("America/Sao_Paulo")
+
+# Tabelas no Supabase:
+TB_USUARIOS = "usuarios"
+TB_PRESENCA = "presencas"
+TB_CONFIG = "config"
+# Conferência de embarque compartilhada entre os checadores (chave: ciclo + email)
+#   create table conferencia (
+#     ciclo text not null, email text not null, marcado boolean not null default false,
+#     marcado_por text, atualizado_em timestamptz default now(),
+#     primary key (ciclo, email));
+TB_CONFERENCIA = "conferencia"
+# Resumo de cada ciclo e contadores por pessoa, gravados na virada (sql/migracoes/0003_estatisticas.sql)
+TB_EST_CICLO = "estatisticas_ciclo"
+TB_EST_USUARIO = "estatisticas_usuario"
+# Trilha de auditoria, só insert (sql/migracoes/0008_auditoria.sql)
+TB_AUDITORIA = "auditoria"
+# Fila de avisos (promoção do excedente), um por chave (sql/migracoes/0009_avisos.sql)
+TB_AVISOS = "avisos"
+# Inscritos e transmissões do bot do Telegram (sql/migracoes/0010_telegram.sql)
+TB_TG_INSCRITOS = "telegram_inscritos"
+TB_TG_TRANSMISSOES = "telegram_transmissoes"
+# Última revogação de sessão de cada usuário (sql/migracoes/0011_sessao_revogacoes.sql)
+TB_SESSAO_REVOGACOES = "sessao_revogacoes"
+
+
+# ==========================================================
+# ROTA PADRÃO (deploy com uma rota só; outras ficam em config: "rota:<id>")
+# ==========================================================
+ROTA_PADRAO = "nova-iguacu"
+ROTA_PADRAO_NOME = "ROTA NOVA IGUAÇU"
+VAGAS_PADRAO = 38
+SAIDAS_PADRAO = ("06:30", "18:30")
+# minutos em volta de cada saída (rota/ciclo.py): a lista fecha FECHA_ANTES antes,
+# reabre REABRE_APOS depois e o ciclo vira MARCO_APOS depois
+FECHA_ANTES = 90
+REABRE_APOS = 30
+MARCO_APOS = 20
+
+
+# ==========================================================
+# GIF NO FINAL DA PÁGINA
+# ==========================================================
+GIF_URL = "https://www.imagensanimadas.com/data/media/425/onibus-imagem-animada-0024.gif"
+
+# ==========================================================
+# LISTAS FIXAS (como você pediu)
+# ==========================================================
+LISTA_GRAD = ["TCEL", "MAJ", "CAP", "1º TEN", "2º TEN", "SUBTEN", "1º SGT", "2º SGT", "3º SGT", "CB", "SD", "FC COM", "FC TER"]
+LISTA_ORIGEM = ["QG", "RMCF", "OUTROS"]
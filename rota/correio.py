@@ -0,0 +1,124 @@
+"""Envio de e-mail (SMTP) com as credenciais do Streamlit Secrets."""
+
+import streamlit as st
+
+from rota import metricas
+
+
+# ==========================================================
+# EMAIL HELPERS (SMTP)
+# - Configure no Streamlit Secrets (TOML):
+#   EMAIL_HOST = "smtp.gmail.com"
+#   EMAIL_PORT = 587
+#   EMAIL_USER = "seu_email@gmail.com"
+#   EMAIL_PASSWORD = "senha_de_app"
+#   EMAIL_FROM = "seu_email@gmail.com"   # opcional
+#   EMAIL_TLS = true                    # opcional (padrão true)
+# ==========================================================
+def _email_cfg():
+    # st.secrets funciona no Streamlit Cloud
+    s = getattr(st, "secrets", {})
+    host = s.get("EMAIL_HOST")
+    port = s.get("EMAIL_PORT")
+    user = s.get("EMAIL_USER")
+    pwd  = s.get("EMAIL_PASSWORD")
+    if not host or not port or not user or not pwd:
+        raise ValueError("Faltou configurar EMAIL_HOST/EMAIL_PORT/EMAIL_USER/EMAIL_PASSWORD no Secrets.")
+    email_from = s.get("EMAIL_FROM") or user
+    tls = s.get("EMAIL_TLS", True)
+    try:
+        port = int(port)
+    except Exception:
+        raise ValueError("EMAIL_PORT precisa ser número (ex: 587).")
+    return {"host": host, "port": port, "user": user, "pwd": pwd, "from": email_from, "tls": bool(tls)}
+
+def email_configurado() -> bool:
+    try:
+        _email_cfg()
+        return True
+    except Exception:
+        return False
+
+def _mensagem(cfg, destinatario: str, assunto: str, corpo: str):
+    from email.message import EmailMessage
+
+    msg = EmailMessage()
+    msg["From"] = cfg["from"]
+    msg["To"] = destinatario
+    msg["Subject"] = assunto
+    msg.set_content(corpo)
+    return msg
+
+def _conectar(cfg):
+    # smtplib/email só carregam quando alguém realmente envia
+    import smtplib
+
+    server = smtplib.SMTP(cfg["host"], cfg["port"], timeout=30)
+    try:
+        if cfg["tls"]:
+            server.starttls()
+        server.login(cfg["user"], cfg["pwd"])
+    except Exception:
+        server.close()
+        raise
+    return server
+
+@metricas.medir("smtp.enviar_email")
+def enviar_email(destinatario: str, assunto: str, corpo: str):
+    cfg = _email_cfg()
+    with _conectar(cfg) as server:
+        server.send_message(_mensagem(cfg, destinatario, assunto, corpo))
+
+@metricas.medir("smtp.enviar_emails")
+def enviar_emails(mensagens: list) -> list:
+    """[(destinatario, assunto, corpo), ...] numa única conexão/login SMTP.
+
+    Devolve, na mesma ordem, None (enviada) ou o erro da mensagem recusada;
+    falha ao conectar/logar levanta a exceção (nenhuma foi enviada)."""
+    if not mensagens:
+        return []
+    cfg = _email_cfg()
+    erros = []
+    with _conectar(cfg) as server:
+        for destinatario, assunto, corpo in mensagens:
+            try:
+                server.send_message(_mensagem(cfg, destinatario, assunto, corpo))
+                erros.append(None)
+            except Exception as ex:
+                erros.append(str(ex) or type(ex).__name__)
+    return erros
+
+def enviar_dados_cadastrais_para_email(u: dict):
+    email_dest = (u or {}).get("email")
+    if not email_dest:
+        raise ValueError("Usuário sem email cadastrado.")
+
+    campos = [
+        ("Nome", u.get("nome") or ""),
+        ("Email", u.get("email") or ""),
+        ("Telefone", u.get("telefone") or ""),
+        ("Graduação", u.get("graduacao") or ""),
+        ("Lotação", u.get("lotacao") or ""),
+        ("Origem", u.get("origem") or ""),
+    ]
+    # Extras comuns (se existirem)
+    if u.get("created_at"):
+        campos.append(("Criado em", str(u.get("created_at"))))
+    if u.get("updated_at"):
+        campos.append(("Atualizado em", str(u.get("updated_at"))))
+
+    linhas = [
+        "Olá!",
+        "",
+        "Segue abaixo uma cópia dos seus dados cadastrais no sistema Rota Presença:",
+        "",
+    ]
+    for k, v in campos:
+        linhas.append(f"- {k}: {v}")
+    linhas += [
+        "",
+        "Se algum dado estiver incorreto, use o menu RECUPERAR para gerar uma senha temporária e ajustar o cadastro.",
+        "",
+        "Mensagem automática.",
+    ]
+    enviar_email(email_dest, "Seus dados cadastrais - Rota Presença", "\n".join(linhas))
@@ -0,0 +1,584 @@
+"""Camada de dados: cliente Supabase, retry/backoff e helpers por tabela.
+
+O cliente pode ser trocado com `definir_cliente` (ex.: o stand-in local de
+`benchmarks/fake_supabase.py`), sem tocar no resto do app.
+"""
+
+import os
+import random
+import time as time_module
+from datetime import datetime
+
+import streamlit as st
+
+from rota import cache, metricas
+from rota.constantes import (
+    TB_USUARIOS, TB_PRESENCA, TB_CONFIG, TB_CONFERENCIA, TB_EST_CICLO, TB_EST_USUARIO, TB_AUDITORIA, TB_AVISOS,
+    TB_TG_INSCRITOS, TB_TG_TRANSMISSOES, TB_SESSAO_REVOGACOES, ROTA_PADRAO, FUSO_BR,
+)
+from rota.modelos import Usuario
+
+
+# ==========================================================
+# CONFIGURAÇÃO
+# ==========================================================
+# Secrets esperados no Streamlit Cloud:
+# SUPABASE_URL = "https://xxxx.supabase.co"
+# SUPABASE_SERVICE_ROLE_KEY = "sb_secret_...."   (pode usar service_role, como você pediu)
+# Opcional (réplica de leitura):
+# SUPABASE_READ_URL = "https://xxxx-rr-sa-east-1-yyyy.supabase.co"
+# SUPABASE_READ_KEY = "..."   (se vazio, usa a mesma chave do primário)
+def _secret(nome: str, padrao=""):
+    # fora do Streamlit (benchmarks, scripts) pode não haver secrets.toml: cai para o ambiente
+    try:
+        v = st.secrets.get(nome)
+    except Exception:
+        v = None
+    if v is None:
+        v = os.environ.get(nome, padrao)
+    return v
+
+# ==========================================================
+# RETRY / BACKOFF (Supabase / PostgREST)
+# ==========================================================
+SB_MAX_TENTATIVAS = 6
+SB_BACKOFF_BASE = 0.6
+SB_BACKOFF_MAX = 6.0
+SB_JITTER = 0.35
+
+def sb_call(fn, *args, **kwargs):
+    max_tries = SB_MAX_TENTATIVAS
+    base = SB_BACKOFF_BASE
+    last_err = None
+
+    for attempt in range(max_tries):
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            last_err = e
+            msg = str(e)
+            if str(getattr(e, "code", "") or "").startswith("23"):
+                # violação de constraint (23xxx): repetir não muda o resultado
+                raise
+            is_rate = ("429" in msg) or ("Too Many" in msg) or ("rate" in msg.lower())
+            is_5xx = any(code in msg for code in ["500", "502", "503", "504"])
+            if is_rate or is_5xx:
+                metricas.contar("sb_call_retry", "429" if is_rate else "5xx")
+                sleep_s = (base * (2 ** attempt)) + random.uniform(0.0, SB_JITTER)
+                time_module.sleep(min(sleep_s, SB_BACKOFF_MAX))
+                continue
+            metricas.contar("sb_call_erro")
+            raise
+    metricas.contar("sb_call_esgotado")
+    raise last_err
+
+# ==========================================================
+# SUPABASE CLIENT (cache)
+# ==========================================================
+_cliente_injetado = None
+_leitura_injetada = None
+
+def definir_cliente(cliente, leitura=None):
+    """Usa `cliente` no lugar do Supabase real (None volta ao padrão).
+
+    `leitura`: cliente da réplica de leitura (None = tudo no `cliente`)."""
+    global _cliente_injetado, _leitura_injetada
+    _cliente_injetado = cliente
+    _leitura_injetada = leitura
+
+@st.cache_resource
+def _cliente_supabase():
+    from supabase import create_client  # import pesado: só quando o cliente real é criado
+    url = _secret("SUPABASE_URL", "")
+    key = _secret("SUPABASE_SERVICE_ROLE_KEY", "") or _secret("SUPABASE_KEY", "")  # fallback
+    if not url or not key:
+        raise RuntimeError("Secrets do Supabase não encontrados. Configure SUPABASE_URL e SUPABASE_SERVICE_ROLE_KEY no Streamlit Secrets.")
+    return create_client(url, key)
+
+def sb():
+    if _cliente_injetado is not None:
+        return _cliente_injetado
+    return _cliente_supabase()
+
+@st.cache_resource
+def _cliente_replica():
+    url = _secret("SUPABASE_READ_URL", "")
+    if not url:
+        return None
+    from supabase import create_client
+    key = _secret("SUPABASE_READ_KEY", "") or _secret("SUPABASE_SERVICE_ROLE_KEY", "") or _secret("SUPABASE_KEY", "")
+    return create_client(url, key)
+
+def sb_leitura():
+    """Cliente para leituras de polling: a réplica, se configurada; senão o primário.
+
+    Escritas e leituras logo após a própria escrita (login com a senha nova,
+    checagem de duplicidade) ficam no primário: use `sb()` / `primario=True`.
+    """
+    if _cliente_injetado is not None:
+        return _leitura_injetada if _leitura_injetada is not None else _cliente_injetado
+    return _cliente_replica() or _cliente_supabase()
+
+def _cliente(primario: bool):
+    return sb() if primario else sb_leitura()
+
+# ==========================================================
+# DB HELPERS
+# ==========================================================
+@metricas.medir("db.usuarios_select")
+def usuarios_select(where=None, columns="*", primario: bool = False):
+    q = _cliente(primario).table(TB_USUARIOS).select(columns)
+    if where:
+        for k, v in where.items():
+            q = q.eq(k, v)
+    res = sb_call(q.execute)
+    return res.data or []
+
+@metricas.medir("db.usuarios_contar")
+def usuarios_contar(where=None, primario: bool = False) -> int:
+    # count exato sem baixar linhas (HEAD + Content-Range)
+    q = _cliente(primario).table(TB_USUARIOS).select("id", count="exact", head=True)
+    if where:
+        for k, v in where.items():
+            q = q.eq(k, v)
+    res = sb_call(q.execute)
+    return int(res.count or 0)
+
+@metricas.medir("db.usuarios_lote")
+def usuarios_lote(apos_id=0, lote: int = 500, columns="id,email,telefone"):
+    # paginação por chave (id > último visto): custo constante por lote, sem OFFSET
+    q = sb().table(TB_USUARIOS).select(columns).gt("id", apos_id).order("id").limit(lote)
+    res = sb_call(q.execute)
+    return res.data or []
+
+@metricas.medir("db.usuarios_ids")
+def usuarios_ids(emails) -> dict:
+    """{email: id} dos e-mails cadastrados (uma consulta para o lote todo)."""
+    emails = sorted(set(emails))
+    out = {}
+    # in.(...) vai na URL: blocos de 200 e-mails ficam bem abaixo do limite do gateway
+    for i in range(0, len(emails), 200):
+        q = sb().table(TB_USUARIOS).select("id,email").in_("email", emails[i:i + 200])
+        res = sb_call(q.execute)
+        out.update({r["email"]: r["id"] for r in (res.data or [])})
+    return out
+
+@metricas.medir("db.usuarios_insert")
+def usuarios_insert(row: dict):
+    res = sb_call(sb().table(TB_USUARIOS).insert(row).execute)
+    return res.data
+
+@metricas.medir("db.usuarios_upsert_lote")
+def usuarios_upsert_lote(rows: list):
+    # importação (rota/transferencia.py): um upsert por lote, chave = e-mail (índice único de 0002)
+    if not rows:
+        return []
+    sb_call(sb().table(TB_USUARIOS).upsert(rows, on_conflict="email", returning="minimal").execute)
+    return rows
+
+@metricas.medir("db.usuarios_update")
+def usuarios_update(where: dict, patch: dict):
+    q = sb().table(TB_USUARIOS).update(patch)
+    for k, v in where.items():
+        q = q.eq(k, v)
+    res = sb_call(q.execute)
+    return res.data
+
+@metricas.medir("db.usuarios_delete")
+def usuarios_delete(where: dict):
+    q = sb().table(TB_USUARIOS).delete()
+    for k, v in where.items():
+        q = q.eq(k, v)
+    res = sb_call(q.execute)
+    return res.data
+
+@metricas.medir("db.usuarios_atualizar_perfil")
+def usuarios_atualizar_perfil(uid, email: str, perfil: dict):
+    """Checagem de telefone + update + fim da senha temporária numa chamada
+    (função `atualizar_perfil`, sql/migracoes/0006_atualizar_perfil.sql). Linhas atualizadas."""
+    params = {"p_id": uid, "p_email": email}
+    params.update({f"p_{k}": v for k, v in perfil.items()})
+    res = sb_call(sb().rpc("atualizar_perfil", params).execute)
+    return res.data or []
+
+# ==========================================================
+# UNICIDADE DE USUÁRIOS (sql/migracoes/0002_usuarios_unicos.sql)
+# ==========================================================
+UNICO_EMAIL = "usuarios_email_key"
+UNICO_TELEFONE = "usuarios_telefone_key"
+UNICO_PRESENCA = "presencas_rota_email_key"   # sql/migracoes/0013_presencas_unicas.sql
+
+def conflito_unico(ex) -> str:
+    """'email' / 'telefone' (usuarios) ou 'presenca' (mesma pessoa de novo na rota) se `ex`
+    é violação de unicidade (23505); senão ''."""
+    msg = f"{getattr(ex, 'code', '')} {getattr(ex, 'message', '')} {ex}"
+    if "23505" not in msg and "duplicate key" not in msg:
+        return ""
+    if UNICO_EMAIL in msg:
+        return "email"
+    if UNICO_TELEFONE in msg:
+        return "telefone"
+    if UNICO_PRESENCA in msg:
+        return "presenca"
+    return ""
+
+# ==========================================================
+# PRESENÇAS (por rota: índice (rota, data_hora) em sql/migracoes/0004_rotas.sql)
+# ==========================================================
+def _presencas_da_rota(cli, rota: str, columns):
+    return cli.table(TB_PRESENCA).select(columns).eq("rota", rota).order("data_hora", desc=False)
+
+@metricas.medir("db.presenca_select")
+def presenca_select(columns="*", primario: bool = False, rota: str = ROTA_PADRAO):
+    res = sb_call(_presencas_da_rota(_cliente(primario), rota, columns).execute)
+    return res.data or []
+
+@metricas.medir("db.presenca_select_versao")
+def presenca_select_versao(versao: int, columns="*", rota: str = ROTA_PADRAO):
+    """Lista de uma versão já conhecida (lida no primário), pela réplica se ela já chegou lá.
+
+    Guarda de atraso: a versão é lida na réplica antes da lista; como a réplica
+    aplica as escritas em ordem, lista lida depois de `versao_replica >= versao`
+    contém pelo menos essa versão. Réplica atrasada (ou com erro) -> primário.
+    """
+    cli = sb_leitura()
+    if cli is not sb():
+        try:
+            if presenca_versao(cli, rota) >= versao:
+                res = sb_call(_presencas_da_rota(cli, rota, columns).execute)
+                return res.data or []
+            metricas.contar("replica_atrasada", "presenca")
+        except Exception:
+            metricas.contar("replica_erro", "presenca")
+    return presenca_select(columns, primario=True, rota=rota)
+
+@metricas.medir("db.presenca_insert")
+def presenca_insert(row: dict):
+    res = sb_call(sb().table(TB_PRESENCA).insert(row).execute)
+    presenca_versao_bump(row.get("rota") or ROTA_PADRAO)
+    return res.data
+
+@metricas.medir("db.presenca_insert_lote")
+def presenca_insert_lote(rows: list):
+    # várias confirmações num único insert (e um único bump de versão por rota do lote)
+    if not rows:
+        return []
+    res = sb_call(sb().table(TB_PRESENCA).insert(rows).execute)
+    for rota in sorted({r.get("rota") or ROTA_PADRAO for r in rows}):
+        presenca_versao_bump(rota)
+    return res.data or []
+
+@metricas.medir("db.presenca_lote")
+def presenca_lote(apos_id=0, lote: int = 500, columns="*"):
+    # todas as rotas, por id (keyset), para exportação
+    q = sb().table(TB_PRESENCA).select(columns).gt("id", apos_id).order("id").limit(lote)
+    res = sb_call(q.execute)
+    return res.data or []
+
+@metricas.medir("db.presenca_delete")
+def presenca_delete(where: dict = None, rota: str = ROTA_PADRAO):
+    q = sb().table(TB_PRESENCA).delete().eq("rota", rota)
+    if where:
+        for k, v in where.items():
+            q = q.eq(k, v)
+    res = sb_call(q.execute)
+    presenca_versao_bump(rota)
+    return res.data
+
+# ==========================================================
+# VERSÃO DA LISTA DE PRESENÇA (config: presenca_versao[:<rota>])
+# - sobe a cada insert/delete; quem já tem a versão atual não precisa buscar a lista de novo
+# - incremento atômico no banco (sql/migracoes/0012_presenca_versao.sql): sempre maior que a
+#   anterior, com qualquer número de processos e qualquer relógio
+# - uma por rota: confirmar numa rota não invalida a lista das outras
+# ==========================================================
+CHAVE_VERSAO_PRESENCA = "presenca_versao"
+
+def chave_versao(rota: str = ROTA_PADRAO) -> str:
+    # a rota padrão mantém a chave de antes (deploys de uma rota não mudam nada)
+    return CHAVE_VERSAO_PRESENCA if rota == ROTA_PADRAO else f"{CHAVE_VERSAO_PRESENCA}:{rota}"
+
+@metricas.medir("db.presenca_versao")
+def presenca_versao(cliente=None, rota: str = ROTA_PADRAO) -> int:
+    # sempre do primário por padrão: é a referência da guarda de atraso da réplica
+    res = sb_call((cliente or sb()).table(TB_CONFIG).select("value").eq("key", chave_versao(rota)).limit(1).execute)
+    data = res.data or []
+    if not data:
+        return 0
+    return int(str(data[0].get("value", 0)))
+
+@metricas.medir("db.presenca_versao_bump")
+def presenca_versao_bump(rota: str = ROTA_PADRAO) -> int:
+    """Sobe a versão da lista da rota e devolve o valor gravado.
+
+    Erro sobe para quem escreveu: versão que não subiu deixaria os clientes
+    na lista velha (304, cache por versão) até a próxima escrita."""
+    params = {"p_chave": chave_versao(rota), "p_minimo": int(time_module.time() * 1000)}
+    try:
+        res = sb_call(sb().rpc("presenca_versao_bump", params).execute)
+    except Exception:
+        metricas.contar("presenca_versao_erro")
+        raise
+    return int(res.data)
+
+@metricas.medir("db.conferencia_select")
+def conferencia_select(ciclo: str, columns="email,marcado"):
+    res = sb_call(sb().table(TB_CONFERENCIA).select(columns).eq("ciclo", ciclo).execute)
+    return res.data or []
+
+@metricas.medir("db.conferencia_upsert")
+def conferencia_upsert(rows: list):
+    # grava várias marcações em um único round trip
+    if not rows:
+        return []
+    res = sb_call(sb().table(TB_CONFERENCIA).upsert(rows, on_conflict="ciclo,email").execute)
+    return res.data
+
+@metricas.medir("db.conferencia_delete_outros_ciclos")
+def conferencia_delete_outros_ciclos(ciclo: str, rota: str = ROTA_PADRAO):
+    # ciclo = "<rota>|DD/MM/YYYY HH:MM": só apaga ciclos antigos da mesma rota
+    res = sb_call(sb().table(TB_CONFERENCIA).delete().like("ciclo", f"{rota}|%").neq("ciclo", ciclo).execute)
+    return res.data
+
+# ==========================================================
+# ESTATÍSTICAS (sql/migracoes/0003_estatisticas.sql)
+# ==========================================================
+@metricas.medir("db.estatisticas_ciclo_insert")
+def estatisticas_ciclo_insert(row: dict):
+    # 23505 (ciclo já registrado por outra sessão) sobe para quem chamou
+    res = sb_call(sb().table(TB_EST_CICLO).insert(row).execute)
+    return res.data
+
+@metricas.medir("db.estatisticas_ciclo_select")
+def estatisticas_ciclo_select(limite: int = 400, columns="*", rota: str = None):
+    # ciclos mais recentes primeiro (2 por dia: 400 ~ seis meses)
+    q = sb_leitura().table(TB_EST_CICLO).select(columns)
+    if rota:
+        q = q.eq("rota", rota)
+    res = sb_call(q.order("ciclo", desc=True).limit(limite).execute)
+    return res.data or []
+
+@metricas.medir("db.estatisticas_usuario_select")
+def estatisticas_usuario_select(emails=None, limite: int = None, columns="*", primario: bool = False):
+    q = _cliente(primario).table(TB_EST_USUARIO).select(columns)
+    if emails is not None:
+        q = q.in_("email", list(emails))
+    q = q.order("confirmacoes", desc=True)
+    if limite:
+        q = q.limit(limite)
+    res = sb_call(q.execute)
+    return res.data or []
+
+@metricas.medir("db.estatisticas_usuario_upsert")
+def estatisticas_usuario_upsert(rows: list):
+    if not rows:
+        return []
+    res = sb_call(sb().table(TB_EST_USUARIO).upsert(rows, on_conflict="email").execute)
+    return res.data
+
+@metricas.medir("db.config_todas")
+def config_todas():
+    """Todas as linhas (key, value) do config, numa consulta (rota/configuracao.py)."""
+    res = sb_call(sb_leitura().table(TB_CONFIG).select("key,value").execute)
+    return res.data or []
+
+@metricas.medir("db.config_get")
+def config_get(key: str, padrao: str = None, primario: bool = False):
+    """Valor (texto) da chave do config, ou `padrao` se não existir."""
+    res = sb_call(_cliente(primario).table(TB_CONFIG).select("value").eq("key", key).limit(1).execute)
+    data = res.data or []
+    return data[0].get("value", padrao) if data else padrao
+
+@metricas.medir("db.config_upsert")
+def config_upsert(valores: dict):
+    """Grava {key: value} num único upsert (todas as chaves ou nenhuma)."""
+    rows = [{"key": k, "value": str(v)} for k, v in valores.items()]
+    sb_call(sb().table(TB_CONFIG).upsert(rows, on_conflict="key").execute)
+
+# ==========================================================
+# AUDITORIA (sql/migracoes/0008_auditoria.sql: só insert)
+# ==========================================================
+@metricas.medir("db.auditoria_insert")
+def auditoria_insert(rows: list):
+    # um insert de várias linhas por lote do buffer (rota/auditoria.py)
+    if not rows:
+        return []
+    sb_call(sb().table(TB_AUDITORIA).insert(rows, returning="minimal").execute)
+    return rows
+
+@metricas.medir("db.auditoria_select")
+def auditoria_select(antes_de: int = None, limite: int = 50, acao: str = None, ator: str = None):
+    """Eventos mais novos primeiro; `antes_de` = menor id da página anterior (keyset, sem OFFSET)."""
+    q = sb_leitura().table(TB_AUDITORIA).select("*")
+    if acao:
+        q = q.eq("acao", acao)
+    if ator:
+        q = q.eq("ator", ator)
+    if antes_de is not None:
+        q = q.lt("id", antes_de)
+    res = sb_call(q.order("id", desc=True).limit(limite).execute)
+    return res.data or []
+
+# ==========================================================
+# AVISOS (sql/migracoes/0009_avisos.sql: um por chave, entregues em lotes)
+# ==========================================================
+@metricas.medir("db.avisos_enfileirar")
+def avisos_enfileirar(rows: list):
+    # chave já existente (outra réplica detectou a mesma promoção): ignorada
+    if not rows:
+        return []
+    sb_call(sb().table(TB_AVISOS).upsert(rows, on_conflict="chave", ignore_duplicates=True, returning="minimal").execute)
+    return rows
+
+@metricas.medir("db.avisos_pegar")
+def avisos_pegar(lote: int, max_tentativas: int, prazo: int) -> list:
+    """Reserva até `lote` avisos pendentes (nenhum outro entregador pega os mesmos por `prazo` s)."""
+    res = sb_call(sb().rpc("avisos_pegar", {"p_lote": lote, "p_max": max_tentativas, "p_prazo": prazo}).execute)
+    return sorted(res.data or [], key=lambda a: a["id"])
+
+@metricas.medir("db.avisos_enviados")
+def avisos_enviados(ids: list):
+    if ids:
+        sb_call(sb().table(TB_AVISOS).update({"enviado_em": datetime.now(FUSO_BR).isoformat(), "erro": None}).in_("id", ids).execute)
+
+@metricas.medir("db.avisos_erro")
+def avisos_erro(aviso_id, erro: str):
+    # continua reservado até o prazo vencer: é o intervalo entre tentativas
+    sb_call(sb().table(TB_AVISOS).update({"erro": str(erro)[:500]}).eq("id", aviso_id).execute)
+
+# ==========================================================
+# TELEGRAM (sql/migracoes/0010_telegram.sql)
+# ==========================================================
+@metricas.medir("db.telegram_inscrever")
+def telegram_inscrever(rows: list):
+    # [{"rota", "chat_id"}]; já inscrito: nada muda
+    if rows:
+        sb_call(sb().table(TB_TG_INSCRITOS).upsert(rows, on_conflict="rota,chat_id", ignore_duplicates=True,
+                                                      returning="minimal").execute)
+
+@metricas.medir("db.telegram_desinscrever")
+def telegram_desinscrever(chat_id: int, rota: str = None):
+    # sem rota: sai de todas (/parar, bot bloqueado)
+    q = sb().table(TB_TG_INSCRITOS).delete().eq("chat_id", chat_id)
+    if rota:
+        q = q.eq("rota", rota)
+    sb_call(q.execute)
+
+@metricas.medir("db.telegram_inscritos")
+def telegram_inscritos(rota: str, apos_chat: int = None, limite: int = 500) -> list:
+    """chat_ids da rota depois de `apos_chat`, em ordem (keyset pela chave primária)."""
+    q = sb().table(TB_TG_INSCRITOS).select("chat_id").eq("rota", rota)
+    if apos_chat is not None:
+        q = q.gt("chat_id", apos_chat)
+    res = sb_call(q.order("chat_id").limit(limite).execute)
+    return [int(r["chat_id"]) for r in (res.data or [])]
+
+@metricas.medir("db.telegram_transmissao_criar")
+def telegram_transmissao_criar(row: dict):
+    # mesma chave (mesma mudança de estado) já criada por outra rodada/réplica: ignorada
+    sb_call(sb().table(TB_TG_TRANSMISSOES).upsert(row, on_conflict="chave", ignore_duplicates=True,
+                                                  returning="minimal").execute)
+
+@metricas.medir("db.telegram_transmissoes_pendentes")
+def telegram_transmissoes_pendentes() -> list:
+    q = sb().table(TB_TG_TRANSMISSOES).select("*").is_("concluida_em", "null").order("criada_em")
+    res = sb_call(q.execute)
+    return res.data or []
+
+@metricas.medir("db.telegram_transmissao_progresso")
+def telegram_transmissao_progresso(chave: str, patch: dict, concluida: bool = False):
+    patch = dict(patch)
+    if concluida:
+        patch["concluida_em"] = datetime.now(FUSO_BR).isoformat()
+    sb_call(sb().table(TB_TG_TRANSMISSOES).update(patch).eq("chave", chave).execute)
+
+# ==========================================================
+# SESSÕES (sql/migracoes/0011_sessao_revogacoes.sql: uma linha por usuário)
+# ==========================================================
+@metricas.medir("db.sessao_revogar")
+def sessao_revogar(uid: str, em_ms: int, validade_ms: int):
+    # upsert atômico da linha do usuário (fica a revogação mais nova); apaga as vencidas
+    sb_call(sb().rpc("sessao_revogar", {"p_usuario": str(uid), "p_em": em_ms, "p_validade": validade_ms}).execute)
+
+@metricas.medir("db.sessao_revogada_em")
+def sessao_revogada_em(uid: str) -> int:
+    """Instante (ms) da última revogação do usuário, 0 se nunca. Sempre do primário."""
+    q = sb().table(TB_SESSAO_REVOGACOES).select("revogado_em").eq("usuario", str(uid)).limit(1)
+    data = sb_call(q.execute).data or []
+    return int(data[0]["revogado_em"]) if data else 0
+
+# ==========================================================
+# MANUTENÇÃO (sql/migracoes/0007_manutencao.sql: um lote por chamada)
+# ==========================================================
+@metricas.medir("db.manutencao_senhas_temp")
+def manutencao_senhas_temp(lote: int, aplicar: bool) -> int:
+    res = sb_call(sb().rpc("manutencao_senhas_temp", {"p_lote": lote, "p_aplicar": aplicar}).execute)
+    return int(res.data or 0)
+
+@metricas.medir("db.manutencao_pendentes")
+def manutencao_pendentes(dias: int, lote: int, aplicar: bool) -> int:
+    res = sb_call(sb().rpc("manutencao_pendentes", {"p_dias": dias, "p_lote": lote, "p_aplicar": aplicar}).execute)
+    return int(res.data or 0)
+
+@metricas.medir("db.manutencao_presencas_orfas")
+def manutencao_presencas_orfas(lote: int, aplicar: bool) -> dict:
+    """{rota: linhas} apagadas (ou, sem `aplicar`, a apagar)."""
+    res = sb_call(sb().rpc("manutencao_presencas_orfas", {"p_lote": lote, "p_aplicar": aplicar}).execute)
+    return {r["rota"]: int(r["apagadas"]) for r in (res.data or [])}
+
+# ==========================================================
+# LEITURAS (cache compartilhável entre réplicas: rota/cache.py)
+# ==========================================================
+@metricas.cache_medido(cache.compartilhado("total_usuarios", ttl=30))
+def buscar_total_usuarios():
+    # só o número: a tela pública nunca baixa a lista de usuários
+    try:
+        return usuarios_contar()
+    except Exception:
+        return 0
+
+@metricas.cache_medido(st.cache_resource(ttl=3))
+def buscar_usuarios_admin():
+    # cache_resource: a mesma tupla de registros imutáveis para todas as sessões
+    # (cache_data desserializaria uma cópia nova a cada chamada)
+    try:
+        return tuple(Usuario.de_linha(u) for u in usuarios_select())
+    except Exception:
+        return ()
+
+# por rota (primeiro argumento): cada rota tem as próprias chaves, geração e .clear(rota)
+@metricas.cache_medido(cache.por_rota("presenca_atualizada", ttl=6, padrao=ROTA_PADRAO))
+def buscar_presenca_atualizada(rota: str = ROTA_PADRAO):
+    try:
+        return presenca_select(rota=rota)
+    except Exception:
+        return []
+
+@metricas.cache_medido(cache.por_rota("presenca_versao", ttl=3, padrao=ROTA_PADRAO))
+def buscar_presenca_versao(rota: str = ROTA_PADRAO):
+    # -1 = não deu para ler a versão (cai para buscar_presenca_atualizada)
+    try:
+        return presenca_versao(rota=rota)
+    except Exception:
+        return -1
+
+@metricas.cache_medido(cache.por_rota("presenca_versionada", ttl=600, max_entries=8, padrao=ROTA_PADRAO))
+def buscar_presenca_versionada(rota: str, versao: int):
+    # uma busca por versão, compartilhada entre todas as sessões
+    # (sem try: erro não pode ficar em cache como lista vazia por 10 min)
+    return presenca_select_versao(versao, rota=rota)
+
+@metricas.cache_medido(cache.compartilhado("estatisticas", ttl=300))
+def buscar_estatisticas(rota: str = None):
+    # (ciclos, usuarios): só os agregados; muda uma vez por ciclo
+    try:
+        return estatisticas_ciclo_select(rota=rota), estatisticas_usuario_select(limite=200)
+    except Exception:
+        return [], []
+
+@metricas.cache_medido(cache.por_rota("conferencia", ttl=6, padrao=ROTA_PADRAO))
+def buscar_conferencia_atualizada(rota: str, ciclo: str):
+    try:
+        return conferencia_select(ciclo)
+    except Exception:
+        return []
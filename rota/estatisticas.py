@@ -0,0 +1,137 @@
+"""Histórico agregado por ciclo (gravado na virada, antes de a lista ser apagada).
+
+`registrar_ciclo(rows)` resume a lista que está terminando numa linha de
+`estatisticas_ciclo` (total, excedentes, contagem por origem/graduação e
+histograma do horário das confirmações) e soma os contadores de cada pessoa
+em `estatisticas_usuario`. O painel do ADM lê só esses agregados
+(`resumo_painel`), então fica rápido qualquer que seja o tamanho do histórico.
+"""
+
+from collections import Counter
+
+import pandas as pd
+
+from rota import metricas
+from rota.ciclo import marco_do_ciclo, parse_dt
+from rota.constantes import FUSO_BR
+from rota.db import estatisticas_ciclo_insert, estatisticas_usuario_select, estatisticas_usuario_upsert
+from rota.modelos import ROTA_UNICA
+from rota.ordenacao import ordenar_presencas
+
+DIAS_SEMANA = ["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"]
+
+# largura das faixas do histograma de horário das confirmações
+FAIXA_MIN = 10
+
+
+# ==========================================================
+# RESUMO DO CICLO (na virada)
+# ==========================================================
+def _faixa(dt) -> str:
+    return f"{dt.hour:02d}:{dt.minute - dt.minute % FAIXA_MIN:02d}"
+
+def resumir_ciclo(presencas_rows, rota=None):
+    """(linha do ciclo, {email: excedente?}) da lista que está terminando; (None, {}) se vazia."""
+    rota = rota or ROTA_UNICA
+    datas = [d.astimezone(FUSO_BR) for d in (parse_dt(r.get("data_hora")) for r in presencas_rows) if d is not None]
+    if not datas:
+        return None, {}
+    marco = marco_do_ciclo(max(datas), rota)
+
+    df_o, _ = ordenar_presencas(presencas_rows, rota.vagas)
+    excedente = {}
+    for _, r in df_o.iterrows():
+        email = str(r.get("EMAIL", "") or "").strip().lower()
+        if email:
+            excedente[email] = str(r.get("Nº", "")).startswith("Exc-")
+
+    linha = {
+        "rota": rota.id,
+        "ciclo": marco.strftime("%Y-%m-%d %H:%M"),
+        "dia_semana": marco.weekday(),
+        "total": len(presencas_rows),
+        "excedentes": sum(1 for v in excedente.values() if v),
+        "por_origem": dict(Counter(str(r.get("origem") or "QG") for r in presencas_rows)),
+        "por_graduacao": dict(Counter(str(r.get("graduacao") or "") for r in presencas_rows)),
+        "horarios": dict(sorted(Counter(_faixa(d) for d in datas).items())),
+    }
+    return linha, excedente
+
+def registrar_ciclo(presencas_rows, rota=None) -> bool:
+    """Grava o resumo do ciclo e soma os contadores por pessoa. False se nada foi gravado
+    (lista vazia ou ciclo já registrado por outra sessão). Erros sobem para quem chamou."""
+    linha, excedente = resumir_ciclo(presencas_rows, rota)
+    if linha is None:
+        return False
+    try:
+        estatisticas_ciclo_insert(linha)
+    except Exception as ex:
+        if str(getattr(ex, "code", "") or "") == "23505" or "duplicate key" in str(ex):
+            # outra sessão virou o mesmo ciclo primeiro: os contadores já foram somados
+            metricas.contar("estatisticas_ciclo_repetido")
+            return False
+        raise
+
+    por_email = {}
+    for r in presencas_rows:
+        email = str(r.get("email", "") or "").strip().lower()
+        if email:
+            por_email[email] = r
+    atuais = {u["email"]: u for u in estatisticas_usuario_select(emails=por_email, primario=True)}
+    novos = []
+    for email, r in por_email.items():
+        u = atuais.get(email, {})
+        novos.append({
+            "email": email,
+            "nome": r.get("nome", ""),
+            "graduacao": r.get("graduacao", ""),
+            "confirmacoes": int(u.get("confirmacoes") or 0) + 1,
+            "excedente": int(u.get("excedente") or 0) + (1 if excedente.get(email) else 0),
+            "ultimo_ciclo": linha["ciclo"],
+        })
+    estatisticas_usuario_upsert(novos)
+    metricas.contar("estatisticas_ciclo_registrado")
+    return True
+
+
+# ==========================================================
+# PAINEL (só agregados)
+# ==========================================================
+def resumo_painel(ciclos, usuarios) -> dict:
+    """DataFrames do painel a partir das linhas de `estatisticas_ciclo` / `estatisticas_usuario`."""
+    if not ciclos:
+        return {}
+    dfc = pd.DataFrame(ciclos)
+    dfc["dia"] = dfc["dia_semana"].map(lambda d: DIAS_SEMANA[int(d) % 7])
+
+    por_dia = (dfc.groupby("dia_semana")
+               .agg(ciclos=("ciclo", "count"), media_total=("total", "mean"),
+                    media_excedentes=("excedentes", "mean"), max_total=("total", "max"))
+               .reset_index())
+    por_dia.insert(0, "dia", por_dia.pop("dia_semana").map(lambda d: DIAS_SEMANA[int(d) % 7]))
+
+    def somar(serie):
+        c = Counter()
+        for v in serie:
+            c.update(v or {})
+        return c
+
+    horarios = {
+        DIAS_SEMANA[int(d) % 7]: pd.Series(dict(sorted(somar(g["horarios"]).items())), name="confirmações")
+        for d, g in dfc.groupby("dia_semana")
+    }
+    origem = somar(dfc["por_origem"])
+    grad = somar(dfc["por_graduacao"])
+
+    dfu = pd.DataFrame(usuarios or [], columns=["graduacao", "nome", "email", "confirmacoes", "excedente", "ultimo_ciclo"])
+    if not dfu.empty:
+        dfu["% excedente"] = (100.0 * dfu["excedente"] / dfu["confirmacoes"].clip(lower=1)).round(1)
+
+    return {
+        "ciclos": dfc[["ciclo", "dia", "total", "excedentes"]],
+        "por_dia": por_dia.round(1),
+        "horarios": horarios,
+        "origem": pd.DataFrame(origem.most_common(), columns=["origem", "confirmações"]),
+        "graduacao": pd.DataFrame(grad.most_common(), columns=["graduação", "confirmações"]),
+        "usuarios": dfu,
+    }
@@ -0,0 +1,171 @@
+"""Rotinas de manutenção do banco (linha de comando ou thread do app).
+
+    python -m rota.manutencao normalizar              # dry-run: só relata
+    python -m rota.manutencao normalizar --aplicar    # grava em lotes
+    python -m rota.manutencao limpar                  # dry-run: quanto cada limpeza pegaria
+    python -m rota.manutencao limpar --aplicar [--tarefa pendentes] [--dias 30] [--lote 1000]
+
+`limpar` (sql/migracoes/0007_manutencao.sql): senhas temporárias usadas ou
+vencidas, cadastros PENDENTE antigos e presenças de usuários apagados. Cada
+lote é um comando no banco; repete até vir menos que o lote.
+
+No app, ROTA_MANUTENCAO_INTERVALO=<segundos> (secrets/ambiente) roda `limpar
+--aplicar` numa thread a cada intervalo (ver `iniciar`). Com várias réplicas
+do app, ligue em uma só (ou use o cron com a linha de comando).
+
+Usa os mesmos secrets do app (SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY),
+lidos de .streamlit/secrets.toml ou do ambiente.
+"""
+
+import argparse
+import threading
+import time as time_module
+
+from rota import metricas
+from rota.db import (
+    usuarios_lote, usuarios_update,
+    manutencao_senhas_temp, manutencao_pendentes, manutencao_presencas_orfas, presenca_versao_bump,
+    buscar_total_usuarios, buscar_usuarios_admin,
+)
+from rota.validacao import tel_only_digits
+
+LOTE = 1000
+PENDENTE_DIAS = 30
+TAREFAS = ("senhas-temp", "pendentes", "presencas-orfas")
+
+
+# ==========================================================
+# NORMALIZAÇÃO DE E-MAIL / TELEFONE (pré-requisito de sql/migracoes/0002_usuarios_unicos.sql)
+# ==========================================================
+def normalizar_usuarios(aplicar: bool = False, lote: int = 500, log=print) -> dict:
+    """Deixa email em minúsculas e telefone só com dígitos, lote a lote (keyset por id).
+
+    Linhas cujo valor normalizado já pertence a outro cadastro não são gravadas:
+    entram em `conflitos` para serem resolvidas antes de criar os índices únicos.
+    """
+    vistos = {"email": {}, "telefone": {}}
+    resumo = {"lidos": 0, "alterados": 0, "conflitos": []}
+    ultimo = 0
+    while True:
+        rows = usuarios_lote(ultimo, lote)
+        if not rows:
+            break
+        ultimo = rows[-1]["id"]
+        for u in rows:
+            resumo["lidos"] += 1
+            novo = {
+                "email": str(u.get("email", "") or "").strip().lower(),
+                "telefone": tel_only_digits(u.get("telefone", "")),
+            }
+            conflito = False
+            for campo, valor in novo.items():
+                dono = vistos[campo].setdefault(valor, u["id"]) if valor else u["id"]
+                if dono != u["id"]:
+                    resumo["conflitos"].append((campo, valor, dono, u["id"]))
+                    conflito = True
+            patch = {k: v for k, v in novo.items() if v != (u.get(k) or "")}
+            if not patch or conflito:
+                continue
+            resumo["alterados"] += 1
+            if aplicar:
+                usuarios_update({"id": u["id"]}, patch)
+        log(f"... {resumo['lidos']} lidos, {resumo['alterados']} a alterar, {len(resumo['conflitos'])} conflitos")
+    return resumo
+
+
+# ==========================================================
+# LIMPEZA EM LOTES (sql/migracoes/0007_manutencao.sql)
+# ==========================================================
+def _em_lotes(nome: str, chamada, aplicar: bool, lote: int, pausa: float, log) -> int:
+    """Dry-run: uma chamada que só conta. Aplicando: lote a lote até vir menos que `lote`."""
+    if not aplicar:
+        total = chamada(False)
+        log(f"[{nome}] {total} a alterar")
+        return total
+    total = 0
+    while True:
+        n = chamada(True)
+        total += n
+        metricas.contar("manutencao", nome, n)
+        log(f"[{nome}] ... {total} alterados")
+        if n < lote:
+            return total
+        if pausa:
+            # deixa o banco respirar entre lotes (a thread do app divide o banco com as telas)
+            time_module.sleep(pausa)
+
+def limpar(tarefas=TAREFAS, aplicar: bool = False, dias: int = PENDENTE_DIAS, lote: int = LOTE,
+           pausa: float = 0.0, log=print) -> dict:
+    """Roda as limpezas pedidas e devolve {tarefa: linhas}; "presencas-orfas:<rota>" detalha por rota."""
+    resumo = {}
+    if "senhas-temp" in tarefas:
+        resumo["senhas-temp"] = _em_lotes(
+            "senhas-temp", lambda ap: manutencao_senhas_temp(lote, ap), aplicar, lote, pausa, log)
+    if "pendentes" in tarefas:
+        resumo["pendentes"] = _em_lotes(
+            "pendentes", lambda ap: manutencao_pendentes(dias, lote, ap), aplicar, lote, pausa, log)
+        if aplicar and resumo["pendentes"]:
+            buscar_total_usuarios.clear()
+            buscar_usuarios_admin.clear()
+    if "presencas-orfas" in tarefas:
+        rotas = {}
+
+        def orfas(ap):
+            por_rota = manutencao_presencas_orfas(lote, ap)
+            for rota, n in por_rota.items():
+                rotas[rota] = rotas.get(rota, 0) + n
+                if ap and n:
+                    # as telas percebem a lista nova pela versão da rota
+                    presenca_versao_bump(rota)
+            return sum(por_rota.values())
+        resumo["presencas-orfas"] = _em_lotes("presencas-orfas", orfas, aplicar, lote, pausa, log)
+        resumo.update({f"presencas-orfas:{rota}": n for rota, n in sorted(rotas.items())})
+    return resumo
+
+def iniciar(intervalo: float, dias: int = PENDENTE_DIAS, lote: int = LOTE, pausa: float = 0.5):
+    """Thread daemon que roda `limpar(aplicar=True)` a cada `intervalo` s (a primeira
+    depois do primeiro intervalo). Devolve o Event que a encerra."""
+    parar = threading.Event()
+
+    def laco():
+        while not parar.wait(intervalo):
+            try:
+                limpar(aplicar=True, dias=dias, lote=lote, pausa=pausa, log=lambda _msg: None)
+            except Exception:
+                # banco fora do ar: tenta de novo no próximo intervalo
+                metricas.contar("manutencao_erro")
+
+    threading.Thread(target=laco, name="rota-manutencao", daemon=True).start()
+    return parar
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("normalizar", help="email minúsculo e telefone só dígitos em usuarios")
+    p.add_argument("--aplicar", action="store_true", help="grava (sem isso, só relata)")
+    p.add_argument("--lote", type=int, default=500)
+    p = sub.add_parser("limpar", help="senhas temporárias, pendentes antigos e presenças órfãs")
+    p.add_argument("--aplicar", action="store_true", help="altera (sem isso, só conta)")
+    p.add_argument("--tarefa", action="append", choices=TAREFAS, help="só esta limpeza (pode repetir)")
+    p.add_argument("--dias", type=int, default=PENDENTE_DIAS, help="idade mínima do cadastro PENDENTE")
+    p.add_argument("--lote", type=int, default=LOTE)
+    p.add_argument("--pausa", type=float, default=0.0, help="segundos entre lotes")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "normalizar":
+        r = normalizar_usuarios(aplicar=args.aplicar, lote=args.lote)
+        print(f"\n{'gravados' if args.aplicar else 'a gravar'}: {r['alterados']} de {r['lidos']}")
+        for campo, valor, dono, outro in r["conflitos"]:
+            print(f"  conflito {campo}={valor!r}: ids {dono} e {outro}")
+        return r
+    if args.cmd == "limpar":
+        r = limpar(tarefas=args.tarefa or TAREFAS, aplicar=args.aplicar, dias=args.dias, lote=args.lote, pausa=args.pausa)
+        print()
+        for tarefa, n in r.items():
+            print(f"{tarefa:<28} {n} {'alterados' if args.aplicar else 'a alterar'}")
+        return r
+
+
+if __name__ == "__main__":
+    main()
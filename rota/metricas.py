@@ -0,0 +1,219 @@
+"""Métricas leves para os caminhos quentes do app (tempo e contadores).
+
+Desligado por padrão. Ative com a variável de ambiente ROTA_METRICAS=1.
+Desligado, `medir` devolve a própria função e `cronometro` um context manager
+nulo compartilhado, então o custo fica em uma checagem de booleano.
+
+Opcional: ROTA_METRICAS_PORTA=9108 sobe um endpoint HTTP /metrics no formato
+texto do Prometheus (ver `iniciar_servidor`).
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from functools import wraps
+
+ATIVO = os.environ.get("ROTA_METRICAS", "").strip().lower() in ("1", "true", "sim", "on")
+PORTA = os.environ.get("ROTA_METRICAS_PORTA", "").strip()
+
+# amostras mantidas por operação (janela deslizante para p50/p95)
+MAX_AMOSTRAS = 2048
+
+_lock = threading.Lock()
+_tempos = {}       # nome -> {"n": int, "soma": float, "amostras": deque}
+_contadores = {}   # (nome, rotulo) -> int
+_NULO = nullcontext()
+
+
+def registrar_tempo(nome: str, segundos: float):
+    with _lock:
+        t = _tempos.get(nome)
+        if t is None:
+            t = _tempos[nome] = {"n": 0, "soma": 0.0, "amostras": deque(maxlen=MAX_AMOSTRAS)}
+        t["n"] += 1
+        t["soma"] += segundos
+        t["amostras"].append(segundos)
+
+
+def contar(nome: str, rotulo: str = "", n: int = 1):
+    if not ATIVO:
+        return
+    with _lock:
+        chave = (nome, rotulo)
+        _contadores[chave] = _contadores.get(chave, 0) + n
+
+
+class _Cronometro:
+    __slots__ = ("nome", "t0")
+
+    def __init__(self, nome: str):
+        self.nome = nome
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        registrar_tempo(self.nome, time.perf_counter() - self.t0)
+        return False
+
+
+def cronometro(nome: str):
+    """`with cronometro("render.tabela_html"): ...`"""
+    return _Cronometro(nome) if ATIVO else _NULO
+
+
+def medir(nome=None):
+    """Decorator de tempo. Uso: `@medir()`, `@medir("db.x")` ou `@medir`."""
+    def deco(fn):
+        if not ATIVO:
+            return fn
+        rotulo = nome if isinstance(nome, str) else fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                registrar_tempo(rotulo, time.perf_counter() - t0)
+        return wrapper
+
+    if callable(nome):
+        return deco(nome)
+    return deco
+
+
+def cache_medido(cache_deco, nome: str = None):
+    """Envolve um `st.cache_data(...)`/`st.cache_resource` contando chamadas e misses.
+
+    O corpo da função só roda em miss; hits = chamadas - misses.
+    Uso: `@cache_medido(st.cache_data(ttl=6))`.
+    """
+    def deco(fn):
+        if not ATIVO:
+            return cache_deco(fn)
+        rotulo = nome or fn.__name__
+
+        @wraps(fn)
+        def corpo(*args, **kwargs):
+            contar("cache_miss", rotulo)
+            with _Cronometro(f"cache.{rotulo}"):
+                return fn(*args, **kwargs)
+
+        em_cache = cache_deco(corpo)
+
+        @wraps(fn)
+        def chamada(*args, **kwargs):
+            contar("cache_chamada", rotulo)
+            return em_cache(*args, **kwargs)
+
+        chamada.clear = em_cache.clear
+        return chamada
+    return deco
+
+
+def _percentil(ordenados, p: float) -> float:
+    if not ordenados:
+        return 0.0
+    k = min(len(ordenados) - 1, max(0, int(round(p * (len(ordenados) - 1)))))
+    return ordenados[k]
+
+
+def resumo_tempos() -> list:
+    """Lista de dicts por operação: n, média, p50 e p95 (ms)."""
+    with _lock:
+        copia = {k: (v["n"], v["soma"], sorted(v["amostras"])) for k, v in _tempos.items()}
+    linhas = []
+    for nome, (n, soma, ordenados) in sorted(copia.items()):
+        linhas.append({
+            "operacao": nome,
+            "n": n,
+            "media_ms": round(1000 * soma / n, 2) if n else 0.0,
+            "p50_ms": round(1000 * _percentil(ordenados, 0.50), 2),
+            "p95_ms": round(1000 * _percentil(ordenados, 0.95), 2),
+        })
+    return linhas
+
+
+def resumo_caches() -> list:
+    with _lock:
+        cont = dict(_contadores)
+    nomes = sorted({r for (n, r) in cont if n in ("cache_chamada", "cache_miss")})
+    linhas = []
+    for r in nomes:
+        chamadas = cont.get(("cache_chamada", r), 0)
+        misses = cont.get(("cache_miss", r), 0)
+        hits = max(0, chamadas - misses)
+        linhas.append({
+            "cache": r,
+            "chamadas": chamadas,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / chamadas, 3) if chamadas else 0.0,
+        })
+    return linhas
+
+
+def contadores() -> dict:
+    with _lock:
+        return dict(_contadores)
+
+
+def zerar():
+    with _lock:
+        _tempos.clear()
+        _contadores.clear()
+
+
+def _esc(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def texto_prometheus() -> str:
+    """Exporta no formato texto do Prometheus (summary + counters)."""
+    out = [
+        "# HELP rota_duracao_segundos Duracao das operacoes instrumentadas.",
+        "# TYPE rota_duracao_segundos summary",
+    ]
+    with _lock:
+        copia = {k: (v["n"], v["soma"], sorted(v["amostras"])) for k, v in _tempos.items()}
+        cont = dict(_contadores)
+    for nome, (n, soma, ordenados) in sorted(copia.items()):
+        op = _esc(nome)
+        for q in (0.5, 0.95):
+            out.append(f'rota_duracao_segundos{{op="{op}",quantile="{q}"}} {_percentil(ordenados, q):.6f}')
+        out.append(f'rota_duracao_segundos_sum{{op="{op}"}} {soma:.6f}')
+        out.append(f'rota_duracao_segundos_count{{op="{op}"}} {n}')
+    out.append("# HELP rota_eventos_total Contadores (retries, cache, erros).")
+    out.append("# TYPE rota_eventos_total counter")
+    for (nome, rotulo), v in sorted(cont.items()):
+        out.append(f'rota_eventos_total{{nome="{_esc(nome)}",rotulo="{_esc(rotulo)}"}} {v}')
+    return "\n".join(out) + "\n"
+
+
+def iniciar_servidor(porta: int):
+    """Sobe /metrics em uma thread daemon (stdlib, sem dependências)."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_response(404)
+                self.end_headers()
+                return
+            corpo = texto_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    srv = ThreadingHTTPServer(("0.0.0.0", int(porta)), _Handler)
+    threading.Thread(target=srv.serve_forever, name="rota-metricas", daemon=True).start()
+    return srv
@@ -0,0 +1,224 @@
+"""Migrações versionadas do banco (sql/migracoes/NNNN_nome.sql), em ordem.
+
+    python -m rota.migracoes status
+    python -m rota.migracoes aplicar [--ate 0004] [--dry-run]
+    python -m rota.migracoes marcar 0004     # já aplicadas à mão: só registra até 0004
+
+Conecta direto no Postgres (não pelo PostgREST): `ROTA_DATABASE_URL` nos
+secrets/ambiente ou `--dsn` (Supabase: Project Settings -> Database ->
+Connection string). Precisa de `pip install -r requirements-migracoes.txt`.
+
+Cada arquivo aplicado fica em `schema_migracoes` (versão, nome, sha256). Um
+arquivo roda inteiro numa transação, a não ser que a primeira linha seja
+`-- migracao: sem transacao` (ex.: `create index concurrently`): aí cada
+comando roda sozinho, em autocommit, e o registro só é gravado no fim. Um
+erro no meio desse arquivo deixa parte aplicada e nada registrado; a próxima
+tentativa roda tudo de novo, então cada comando dele precisa poder repetir
+(constraint em `do $$ ... pg_constraint`, índice INVALID apagado antes do
+`create ... concurrently if not exists`).
+
+Arquivo já aplicado não se edita (o `status` acusa "ALTERADA"): mudança de
+esquema vai sempre num número novo, maior que todos os existentes. `aplicar`
+recusa pendente com número menor que a última aplicada (arquivo inserido no
+meio do histórico); se o banco já tem aquelas mudanças, registre com `marcar`.
+"""
+
+import argparse
+import hashlib
+import os
+import re
+
+from rota.db import _secret
+
+PASTA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sql", "migracoes")
+SEM_TRANSACAO = "-- migracao: sem transacao"
+ARQUIVO = re.compile(r"^(\d{4})_([a-z0-9_]+)\.sql$")
+
+TABELA = """
+create table if not exists schema_migracoes (
+  versao       text primary key,
+  nome         text not null,
+  sha256       text not null,
+  aplicada_em  timestamptz not null default now()
+)
+"""
+
+
+class Migracao:
+    __slots__ = ("versao", "nome", "caminho", "sql", "sha256", "transacao")
+
+    def __init__(self, caminho: str):
+        m = ARQUIVO.match(os.path.basename(caminho))
+        self.versao, self.nome = m.group(1), m.group(2)
+        self.caminho = caminho
+        with open(caminho, encoding="utf-8") as f:
+            self.sql = f.read()
+        self.sha256 = hashlib.sha256(self.sql.encode("utf-8")).hexdigest()
+        self.transacao = not self.sql.lstrip().startswith(SEM_TRANSACAO)
+
+
+def listar(pasta: str = PASTA) -> list:
+    """Migrações da pasta, pela versão. ValueError se duas tiverem o mesmo número."""
+    migs = [Migracao(os.path.join(pasta, n)) for n in sorted(os.listdir(pasta)) if ARQUIVO.match(n)]
+    versoes = [m.versao for m in migs]
+    repetidas = sorted({v for v in versoes if versoes.count(v) > 1})
+    if repetidas:
+        raise ValueError(f"Versões repetidas em {pasta}: {', '.join(repetidas)}")
+    return migs
+
+
+# ==========================================================
+# DIVISÃO EM COMANDOS (arquivos sem transação)
+# ==========================================================
+def comandos(sql: str) -> list:
+    """Divide o script nos `;` de fim de comando, respeitando comentários,
+    strings ('...') e corpos $tag$...$tag$. Comandos vazios saem."""
+    saida, atual, i, n = [], [], 0, len(sql)
+    while i < n:
+        c = sql[i]
+        if sql.startswith("--", i):
+            fim = sql.find("\n", i)
+            fim = n if fim < 0 else fim
+            atual.append(sql[i:fim])
+            i = fim
+        elif sql.startswith("/*", i):
+            fim = sql.find("*/", i + 2)
+            fim = n if fim < 0 else fim + 2
+            atual.append(sql[i:fim])
+            i = fim
+        elif c == "'":
+            j = i + 1
+            while j < n:
+                if sql[j] == "'" and sql.startswith("''", j):
+                    j += 2
+                    continue
+                if sql[j] == "'":
+                    break
+                j += 1
+            atual.append(sql[i:j + 1])
+            i = j + 1
+        elif c == "$" and re.match(r"\$[A-Za-z_]*\$", sql[i:]):
+            tag = re.match(r"\$[A-Za-z_]*\$", sql[i:]).group(0)
+            fim = sql.find(tag, i + len(tag))
+            fim = n if fim < 0 else fim + len(tag)
+            atual.append(sql[i:fim])
+            i = fim
+        elif c == ";":
+            saida.append("".join(atual))
+            atual = []
+            i += 1
+        else:
+            atual.append(c)
+            i += 1
+    saida.append("".join(atual))
+    return [s.strip() for s in saida if _tem_codigo(s)]
+
+def _tem_codigo(s: str) -> bool:
+    sem_comentario = re.sub(r"--[^\n]*", "", re.sub(r"/\*.*?\*/", "", s, flags=re.S))
+    return bool(sem_comentario.strip())
+
+
+# ==========================================================
+# EXECUÇÃO
+# ==========================================================
+def conectar(dsn: str = ""):
+    try:
+        import psycopg
+    except ImportError:
+        raise SystemExit("Instale o driver: pip install -r requirements-migracoes.txt")
+    dsn = dsn or str(_secret("ROTA_DATABASE_URL", "") or "")
+    if not dsn:
+        raise SystemExit("Informe --dsn ou ROTA_DATABASE_URL (connection string do Postgres).")
+    return psycopg.connect(dsn, autocommit=True)
+
+def aplicadas(conn) -> dict:
+    """{versão: sha256} já registradas (cria a tabela de controle se faltar)."""
+    conn.execute(TABELA)
+    return {v: h for v, h in conn.execute("select versao, sha256 from schema_migracoes").fetchall()}
+
+def _registrar(conn, m: Migracao):
+    conn.execute(
+        "insert into schema_migracoes (versao, nome, sha256) values (%s, %s, %s)",
+        (m.versao, m.nome, m.sha256),
+    )
+
+def aplicar(conn, migs: list = None, ate: str = None, dry_run: bool = False, log=print) -> list:
+    """Aplica as pendentes (até `ate`, inclusive) e devolve as versões aplicadas.
+    Para na primeira que falhar; as anteriores continuam registradas. ValueError
+    (nada roda) se alguma pendente vier antes da última aplicada."""
+    feitas = aplicadas(conn)
+    pendentes = [m for m in (migs if migs is not None else listar()) if m.versao not in feitas and (ate is None or m.versao <= ate)]
+    ultima = max(feitas, default="")
+    fora = [m.versao for m in pendentes if m.versao < ultima]
+    if fora:
+        raise ValueError(f"Pendentes anteriores à última aplicada ({ultima}): {', '.join(fora)}. "
+                         "Mudança nova vai num número novo; se o banco já a tem, use `marcar`.")
+    for m in pendentes:
+        log(f"{'[dry-run] ' if dry_run else ''}{m.versao} {m.nome} ({'transação' if m.transacao else 'sem transação'})")
+        if dry_run:
+            continue
+        if m.transacao:
+            with conn.transaction():
+                conn.execute(m.sql)
+                _registrar(conn, m)
+        else:
+            for cmd in comandos(m.sql):
+                conn.execute(cmd)
+            _registrar(conn, m)
+    return [m.versao for m in pendentes]
+
+def marcar(conn, ate: str, migs: list = None, log=print) -> list:
+    """Registra como aplicadas (sem rodar) as pendentes até `ate`: banco que já rodou os .sql à mão."""
+    feitas = aplicadas(conn)
+    marcadas = []
+    for m in (migs if migs is not None else listar()):
+        if m.versao <= ate and m.versao not in feitas:
+            _registrar(conn, m)
+            marcadas.append(m.versao)
+            log(f"marcada {m.versao} {m.nome}")
+    return marcadas
+
+def status(conn, migs: list = None) -> list:
+    """(versão, nome, situação) de cada migração: aplicada / pendente (ou fora de ordem) /
+    alterada depois de aplicada."""
+    feitas = aplicadas(conn)
+    linhas = []
+    for m in (migs if migs is not None else listar()):
+        if m.versao not in feitas:
+            situacao = "pendente" if m.versao > max(feitas, default="") else "pendente FORA DE ORDEM"
+        elif feitas[m.versao] != m.sha256:
+            situacao = "ALTERADA depois de aplicada"
+        else:
+            situacao = "aplicada"
+        linhas.append((m.versao, m.nome, situacao))
+    return linhas
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--dsn", default="", help="connection string (padrão: ROTA_DATABASE_URL)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("status", help="aplicadas e pendentes")
+    p = sub.add_parser("aplicar", help="aplica as pendentes, em ordem")
+    p.add_argument("--ate", default=None, help="última versão a aplicar (ex.: 0004)")
+    p.add_argument("--dry-run", action="store_true", help="só lista o que seria aplicado")
+    p = sub.add_parser("marcar", help="registra como aplicadas sem rodar (até a versão)")
+    p.add_argument("ate")
+    args = ap.parse_args(argv)
+
+    with conectar(args.dsn) as conn:
+        if args.cmd == "status":
+            for versao, nome, situacao in status(conn):
+                print(f"{versao} {nome:<24} {situacao}")
+        elif args.cmd == "aplicar":
+            try:
+                feitas = aplicar(conn, ate=args.ate, dry_run=args.dry_run)
+            except ValueError as ex:
+                raise SystemExit(str(ex))
+            print(f"\n{len(feitas)} migração(ões) {'pendente(s)' if args.dry_run else 'aplicada(s)'}.")
+        elif args.cmd == "marcar":
+            marcar(conn, args.ate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Registros imutáveis compartilhados entre sessões.
+
+Um `Usuario` é montado uma vez por refresh do cache e o mesmo objeto serve a
+todas as sessões (lista do ADM, `usuario_logado`), sem a cópia em dict que
+`user_to_ui_dict` fazia a cada rerun. `__slots__` tira o `__dict__` por
+instância e os textos repetidos (graduação, lotação, origem, status) são
+internados.
+
+O código antigo lê as chaves da UI (`u.get("Nome")`, `u["TELEFONE"]`) ou as
+colunas do banco (`u.get("nome")`); `get` / `[]` aceitam as duas formas.
+
+`Rota` descreve uma rota/ônibus (nome, vagas e horários de saída), lida do
+`config` por `rota/rotas.py`.
+"""
+
+import json
+import re
+import sys
+from dataclasses import dataclass, replace
+
+from rota.constantes import (
+    ROTA_PADRAO, ROTA_PADRAO_NOME, VAGAS_PADRAO, SAIDAS_PADRAO, FECHA_ANTES, REABRE_APOS, MARCO_APOS,
+)
+
+
+def _txt(v) -> str:
+    return "" if v is None else str(v)
+
+
+@dataclass(frozen=True)
+class Usuario:
+    __slots__ = (
+        "id", "nome", "graduacao", "lotacao", "senha", "origem", "email",
+        "telefone", "status", "temp_senha", "temp_expira", "temp_usada",
+    )
+    id: object
+    nome: str
+    graduacao: str
+    lotacao: str
+    senha: str
+    origem: str
+    email: str
+    telefone: str
+    status: str
+    temp_senha: str
+    temp_expira: object
+    temp_usada: object
+
+    @classmethod
+    def de_linha(cls, u):
+        """Linha crua do banco (ou dict no formato antigo da UI) -> Usuario."""
+        if isinstance(u, cls):
+            return u
+
+        def pega(*chaves):
+            for k in chaves:
+                v = u.get(k)
+                if v:
+                    return v
+            return ""
+
+        return cls(
+            id=u.get("id"),
+            nome=_txt(pega("nome", "Nome")),
+            graduacao=sys.intern(_txt(pega("graduacao", "Graduação"))),
+            lotacao=sys.intern(_txt(pega("lotacao", "Lotação"))),
+            senha=_txt(pega("senha", "Senha")),
+            origem=sys.intern(_txt(pega("origem", "QG_RMCF_OUTROS", "ORIGEM"))),
+            email=_txt(pega("email", "Email")),
+            telefone=_txt(pega("telefone", "TELEFONE")),
+            status=sys.intern(_txt(pega("status", "STATUS")) or "PENDENTE"),
+            temp_senha=_txt(pega("temp_senha", "TEMP_SENHA")),
+            temp_expira=pega("temp_expira", "TEMP_EXPIRA"),
+            temp_usada=u.get("temp_usada") if u.get("temp_usada") is not None else u.get("TEMP_USADA", ""),
+        )
+
+    def com(self, **mudancas):
+        """Cópia com campos alterados (o registro em si nunca muda)."""
+        return replace(self, **mudancas)
+
+    # frozen + __slots__ não tem pickle automático (session_state serializável, cópias)
+    def __getstate__(self):
+        return tuple(getattr(self, a) for a in self.__slots__)
+
+    def __setstate__(self, estado):
+        for a, v in zip(self.__slots__, estado):
+            object.__setattr__(self, a, v)
+
+    # ---- compat com as chaves antigas (dict da UI / colunas do banco) ----
+    def get(self, chave, padrao=None):
+        attr = _CHAVES.get(chave)
+        return getattr(self, attr) if attr else padrao
+
+    def __getitem__(self, chave):
+        attr = _CHAVES.get(chave)
+        if attr is None:
+            raise KeyError(chave)
+        return getattr(self, attr)
+
+    def __contains__(self, chave):
+        return chave in _CHAVES
+
+
+_CHAVES = {c: c for c in Usuario.__slots__}
+_CHAVES.update({
+    "Nome": "nome",
+    "Graduação": "graduacao",
+    "Lotação": "lotacao",
+    "Senha": "senha",
+    "QG_RMCF_OUTROS": "origem",
+    "Origem": "origem",
+    "ORIGEM": "origem",
+    "Email": "email",
+    "TELEFONE": "telefone",
+    "Telefone": "telefone",
+    "STATUS": "status",
+    "TEMP_SENHA": "temp_senha",
+    "TEMP_EXPIRA": "temp_expira",
+    "TEMP_USADA": "temp_usada",
+})
+
+
+# ==========================================================
+# ROTA
+# ==========================================================
+ID_ROTA = re.compile(r"^[a-z0-9][a-z0-9-]{0,39}$")
+HORA = re.compile(r"^([01][0-9]|2[0-3]):[0-5][0-9]$")
+
+
+@dataclass(frozen=True)
+class Rota:
+    """Uma rota/ônibus: `saidas` = (embarque da manhã, embarque da noite), "HH:MM"."""
+
+    id: str = ROTA_PADRAO
+    nome: str = ROTA_PADRAO_NOME
+    vagas: int = VAGAS_PADRAO
+    saidas: tuple = SAIDAS_PADRAO
+
+    @classmethod
+    def de_config(cls, rota_id: str, valor: str):
+        """Valor do `config` ("rota:<id>" -> JSON) -> Rota. ValueError se inválido."""
+        d = json.loads(valor or "{}")
+        r = cls(
+            id=str(rota_id),
+            nome=str(d.get("nome") or rota_id).strip(),
+            vagas=int(d.get("vagas", VAGAS_PADRAO)),
+            saidas=tuple(d.get("saidas") or SAIDAS_PADRAO),
+        )
+        r.validar()
+        return r
+
+    def validar(self):
+        if not ID_ROTA.match(self.id):
+            raise ValueError("Id da rota: letras minúsculas, números e '-'.")
+        if self.vagas <= 0:
+            raise ValueError("Vagas deve ser maior que zero.")
+        if len(self.saidas) != 2 or not all(HORA.match(str(h)) for h in self.saidas) or self.saidas[0] >= self.saidas[1]:
+            raise ValueError("Saídas: dois horários HH:MM (manhã antes da noite).")
+        # fechamento, reabertura e virada de cada saída têm de cair no mesmo dia (rota/ciclo.py)
+        minutos = [int(h[:2]) * 60 + int(h[3:]) for h in self.saidas]
+        if minutos[0] - FECHA_ANTES < 0 or minutos[1] + max(REABRE_APOS, MARCO_APOS) >= 24 * 60:
+            cedo = (FECHA_ANTES // 60, FECHA_ANTES % 60)
+            tarde = 24 * 60 - max(REABRE_APOS, MARCO_APOS) - 1
+            raise ValueError(f"Saídas entre {cedo[0]:02d}:{cedo[1]:02d} e {tarde // 60:02d}:{tarde % 60:02d} "
+                             "(a lista fecha e reabre no mesmo dia).")
+
+    def para_config(self) -> str:
+        return json.dumps({"nome": self.nome, "vagas": self.vagas, "saidas": list(self.saidas)}, ensure_ascii=False)
+
+
+ROTA_UNICA = Rota()
@@ -0,0 +1,90 @@
+"""Ordenação da lista de presença (prioridade por origem/graduação e horário)."""
+
+import pandas as pd
+
+from rota import metricas
+from rota.ciclo import parse_dt
+from rota.constantes import FUSO_BR, VAGAS_PADRAO
+
+
+# ==========================================================
+# LINHAS DA "PLANILHA" (presenças do banco -> colunas da UI)
+# ==========================================================
+COLUNAS_PRESENCA = ["DATA_HORA", "QG_RMCF_OUTROS", "GRADUAÇÃO", "NOME", "LOTAÇÃO", "EMAIL"]
+
+def montar_linhas_presenca(presencas_raw):
+    # monta "planilha" para reaproveitar a mesma UI (cabeçalho + linhas)
+    dados_p_show = [list(COLUNAS_PRESENCA)]
+    for r in presencas_raw:
+        dt = parse_dt(r.get("data_hora"))
+        if dt is None:
+            # fallback: usa string
+            dt_str = str(r.get("data_hora", ""))
+        else:
+            dt_str = dt.astimezone(FUSO_BR).strftime("%d/%m/%Y %H:%M:%S")
+        dados_p_show.append([
+            dt_str,
+            str(r.get("origem", "") or "QG"),
+            str(r.get("graduacao", "") or ""),
+            str(r.get("nome", "") or ""),
+            str(r.get("lotacao", "") or ""),
+            str(r.get("email", "") or "").lower()
+        ])
+    return dados_p_show
+
+def ordenar_presencas(presencas_raw, vagas: int = VAGAS_PADRAO):
+    """(df_o, df_v) a partir das linhas do banco; DataFrames vazios se ninguém confirmou."""
+    dados = montar_linhas_presenca(presencas_raw)
+    if len(dados) <= 1:
+        return pd.DataFrame(), pd.DataFrame()
+    return aplicar_ordenacao(pd.DataFrame(dados[1:], columns=dados[0]), vagas)
+
+# ==========================================================
+# ORDENAÇÃO (igual ao Sheets)
+# ==========================================================
+@metricas.medir("ordenacao.aplicar_ordenacao")
+def aplicar_ordenacao(df, vagas: int = VAGAS_PADRAO):
+    if "EMAIL" not in df.columns:
+        df["EMAIL"] = "N/A"
+
+    if "QG_RMCF_OUTROS" not in df.columns and "ORIGEM" in df.columns:
+        df["QG_RMCF_OUTROS"] = df["ORIGEM"]
+    if "QG_RMCF_OUTROS" not in df.columns:
+        df["QG_RMCF_OUTROS"] = ""
+
+    p_orig = {"QG": 1, "RMCF": 2, "OUTROS": 3}
+    p_grad_normal = {
+        "TCEL": 1, "MAJ": 2, "CAP": 3, "1º TEN": 4, "2º TEN": 5, "SUBTEN": 6,
+        "1º SGT": 7, "2º SGT": 8, "3º SGT": 9, "CB": 10, "SD": 11
+    }
+
+    def grupo_fc(grad):
+        g = str(grad or "").strip().upper()
+        if g == "FC COM":
+            return 1
+        if g == "FC TER":
+            return 2
+        return 0
+
+    df["grupo_fc"] = df["GRADUAÇÃO"].apply(grupo_fc)
+    df["p_o"] = df["QG_RMCF_OUTROS"].map(p_orig).fillna(99)
+
+    def p_grad(row):
+        if int(row.get("grupo_fc", 0)) == 0:
+            return p_grad_normal.get(str(row.get("GRADUAÇÃO", "")).strip().upper(), 999)
+        return 0
+
+    df["p_g"] = df.apply(p_grad, axis=1)
+    df["dt"] = pd.to_datetime(df["DATA_HORA"], dayfirst=True, errors="coerce")
+
+    df = df.sort_values(by=["grupo_fc", "p_o", "p_g", "dt"]).reset_index(drop=True)
+    df.insert(0, "Nº", [str(i + 1) if i < vagas else f"Exc-{i - vagas + 1:02d}" for i in range(len(df))])
+
+    # object: as linhas excedentes recebem HTML em colunas que podem ser numéricas
+    df_v = df.astype(object)
+    for i, r in df_v.iterrows():
+        if "Exc-" in str(r["Nº"]):
+            for c in df_v.columns:
+                df_v.at[i, c] = f"<span style='color:#d32f2f; font-weight:bold;'>{r[c]}</span>"
+
+    return df.drop(columns=["grupo_fc", "p_o", "p_g", "dt"]), df_v.drop(columns=["grupo_fc", "p_o", "p_g", "dt"])
@@ -0,0 +1,28 @@
+"""Rotas/ônibus do deploy, configuradas no `config` ("rota:<id>" -> JSON).
+
+    {"nome": "ROTA NOVA IGUAÇU", "vagas": 38, "saidas": ["06:30", "18:30"]}
+
+Sem nenhuma chave "rota:*" o app roda com a rota única de sempre
+(`modelos.ROTA_UNICA`). Presenças, versão da lista, conferência e caches
+são separados por rota (ver sql/migracoes/0004_rotas.sql e `cache.por_rota`). As rotas vêm
+da configuração carregada de uma vez (rota/configuracao.py).
+"""
+
+from rota.configuracao import PREFIXO_ROTA, configuracao, salvar
+from rota.modelos import Rota
+
+
+def buscar_rotas() -> tuple:
+    """Rotas configuradas (tupla de `Rota`: a padrão primeiro, depois pelo id); só a rota
+    padrão se não houver nenhuma. A primeira é a usada quando ninguém escolhe.
+
+    Erro do banco sobe (e não fica em cache): cair para a rota padrão mandaria
+    quem está em outra rota para a lista errada."""
+    return configuracao().rotas
+
+def rota_por_id(rota_id: str):
+    """A `Rota` com esse id (None se não existir)."""
+    return next((r for r in buscar_rotas() if r.id == rota_id), None)
+
+def salvar_rota(rota: Rota):
+    salvar({PREFIXO_ROTA + rota.id: rota})
@@ -0,0 +1,128 @@
+"""Token de sessão assinado (HMAC-SHA256): reconexão sem novo login.
+
+O `session_state` some a cada queda do websocket (celular, webview do
+Telegram). No login com senha real o app grava no link `?s=<token>`; na
+reconexão a sessão é remontada a partir do token, conferido localmente (sem
+consultar o cadastro):
+
+    v1.<payload base64url>.<assinatura base64url>
+
+O payload leva o cadastro mostrado na tela (sem senha), a emissão e a
+validade (`TTL`). Passada metade da validade o app emite um token novo.
+
+Segredo: `ROTA_SESSAO_SEGREDO` (secrets/ambiente); sem ele, derivado da chave
+do Supabase. Sem nenhum dos dois os tokens ficam desligados (só login).
+
+Revogação: a tabela `sessao_revogacoes` (sql/migracoes/0011_sessao_revogacoes.sql)
+guarda, por usuário, o instante da última revogação. Token emitido antes
+desse instante não vale mais (é a "versão" do token por usuário). Trocar a
+senha/cadastro, inativar ou excluir o usuário chama `revogar`, um upsert
+atômico da linha do usuário (revogações simultâneas não se perdem). Restaurar
+uma sessão lê essa linha do primário: revogado, vale na hora em todas as
+réplicas, ao custo de uma leitura por chave primária por reconexão.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+from rota import metricas
+from rota.db import _secret, sessao_revogada_em, sessao_revogar
+from rota.modelos import Usuario
+
+VERSAO = "v1"
+TTL = 7 * 24 * 3600
+
+
+def _segredo() -> bytes:
+    s = str(_secret("ROTA_SESSAO_SEGREDO", "") or "")
+    if s:
+        return s.encode()
+    key = str(_secret("SUPABASE_SERVICE_ROLE_KEY", "") or _secret("SUPABASE_KEY", "") or "")
+    if key:
+        return hashlib.sha256(b"rota-sessao:" + key.encode()).digest()
+    return b""
+
+def _b64(b: bytes) -> str:
+    return base64.urlsafe_b64encode(b).rstrip(b"=").decode()
+
+def _unb64(s: str) -> bytes:
+    return base64.urlsafe_b64decode(s + "=" * (-len(s) % 4))
+
+def _assinar(corpo: str, segredo: bytes) -> str:
+    return _b64(hmac.new(segredo, corpo.encode(), hashlib.sha256).digest())
+
+def _agora_ms() -> int:
+    return int(time.time() * 1000)
+
+
+# ==========================================================
+# EMITIR / CONFERIR
+# ==========================================================
+def emitir(u, agora_ms: int = None) -> str:
+    """Token para o usuário (registro `Usuario` ou linha do banco); "" se desligado."""
+    segredo = _segredo()
+    if not segredo:
+        return ""
+    u = Usuario.de_linha(u)
+    agora_ms = _agora_ms() if agora_ms is None else agora_ms
+    payload = {
+        "u": u.id, "e": u.email, "n": u.nome, "g": u.graduacao, "l": u.lotacao,
+        "o": u.origem, "t": u.telefone, "s": u.status,
+        "i": agora_ms, "x": agora_ms + TTL * 1000,
+    }
+    corpo = VERSAO + "." + _b64(json.dumps(payload, separators=(",", ":")).encode())
+    metricas.contar("sessao_emitida")
+    return corpo + "." + _assinar(corpo, segredo)
+
+def conferir(token: str, agora_ms: int = None):
+    """Payload do token se a assinatura e a validade conferem (sem banco); senão None."""
+    segredo = _segredo()
+    partes = str(token or "").split(".")
+    if not segredo or len(partes) != 3 or partes[0] != VERSAO:
+        return None
+    corpo = partes[0] + "." + partes[1]
+    if not hmac.compare_digest(_assinar(corpo, segredo), partes[2]):
+        return None
+    try:
+        payload = json.loads(_unb64(partes[1]))
+    except ValueError:
+        return None
+    agora_ms = _agora_ms() if agora_ms is None else agora_ms
+    if not isinstance(payload, dict) or int(payload.get("x") or 0) <= agora_ms:
+        return None
+    return payload
+
+def restaurar(token: str):
+    """(Usuario, precisa_renovar) a partir do token, ou (None, False) se inválido,
+    expirado, revogado ou de usuário não ativo. Erro ao ler as revogações sobe."""
+    payload = conferir(token)
+    if payload is None or str(payload.get("s", "")).upper() != "ATIVO":
+        metricas.contar("sessao_invalida")
+        return None, False
+    if int(payload.get("i") or 0) < sessao_revogada_em(payload.get("u")):
+        metricas.contar("sessao_revogada")
+        return None, False
+    u = Usuario(
+        id=payload.get("u"), nome=payload.get("n", ""), graduacao=payload.get("g", ""),
+        lotacao=payload.get("l", ""), senha="", origem=payload.get("o", ""),
+        email=payload.get("e", ""), telefone=payload.get("t", ""), status=payload.get("s", ""),
+        temp_senha="", temp_expira="", temp_usada=True,
+    )
+    metricas.contar("sessao_restaurada")
+    renovar = int(payload["x"]) - _agora_ms() < TTL * 1000 // 2
+    return u, renovar
+
+
+# ==========================================================
+# REVOGAÇÃO
+# ==========================================================
+def revogar(uid, agora_ms: int = None):
+    """Invalida os tokens já emitidos para `uid` (um novo login volta a valer)."""
+    if uid is None or uid == "":
+        return
+    agora_ms = _agora_ms() if agora_ms is None else agora_ms
+    sessao_revogar(uid, agora_ms, TTL * 1000)
+    metricas.contar("sessao_revogacao")
@@ -0,0 +1,352 @@
+"""Avisos de "lista aberta" / "lista fechada" pelo bot do Telegram.
+
+    python -m rota.telegram rodar [--intervalo 15]    # laço (cron / outra máquina)
+    python -m rota.telegram rodada                    # uma rodada e sai
+
+Sem isso, quem não quer perder a reabertura (07:00 / 19:00, domingo 19:00)
+fica com o app aberto recarregando. Cada rodada do transmissor:
+
+1. lê as mensagens novas do bot (getUpdates; offset em config:
+   telegram_offset): "/avisos [rota]" inscreve o chat, "/parar" tira;
+2. para cada rota, se `status_lista` mudou nos últimos JANELA minutos, cria a
+   transmissão da mudança (chave <rota>|aberta|fechada|<ciclo>: reinício ou
+   outra réplica não criam outra);
+3. manda as transmissões pendentes aos inscritos, em ordem de chat_id.
+
+Envio: balde de tokens (`TAXA` mensagens/s + RAJADA, abaixo das ~30/s do Telegram);
+429 esvazia o balde pelo `retry_after` e repete a mesma mensagem; 5xx/rede
+repete com backoff exponencial + jitter; 403 (bot bloqueado) e "chat not
+found" tiram o chat dos inscritos. O progresso (`ultimo_chat`) é gravado a
+cada SALVAR_CADA mensagens e ao parar: depois de um reinício a transmissão
+continua de onde parou (uma queda abrupta repete no máximo SALVAR_CADA).
+Transmissão cuja mudança já passou (outra mudança depois) é encerrada sem
+enviar o resto.
+
+Secrets/ambiente: TELEGRAM_BOT_TOKEN; TELEGRAM_API_URL (padrão
+https://api.telegram.org; benchmarks/fake_telegram.py nos testes);
+ROTA_TELEGRAM_INTERVALO=<segundos> liga a thread no app (ver `iniciar`).
+Com várias réplicas do app, ligue em uma só.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time as time_module
+import urllib.error
+import urllib.request
+from datetime import timedelta
+
+from rota import metricas
+from rota.ciclo import br_now, obter_ciclo_atual, status_lista
+from rota.db import (
+    _secret, config_get, config_upsert,
+    telegram_inscrever, telegram_desinscrever, telegram_inscritos,
+    telegram_transmissao_criar, telegram_transmissoes_pendentes, telegram_transmissao_progresso,
+)
+from rota.rotas import buscar_rotas
+
+API_URL = "https://api.telegram.org"
+CHAVE_OFFSET = "telegram_offset"
+TAXA = 25.0
+# em qualquer janela de 1 s saem no máximo TAXA + RAJADA mensagens (< 30)
+RAJADA = 3
+MAX_TENTATIVAS = 5
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+SALVAR_CADA = 20
+PAGINA = 500
+# mudança de estado mais antiga que isso não é anunciada (ex.: deploy no meio do período)
+JANELA = 10
+
+
+# ==========================================================
+# BOT API (HTTP, sem dependência extra)
+# ==========================================================
+class ErroTelegram(Exception):
+    """Resposta `ok: false` da Bot API (ou falha de rede: codigo 0)."""
+
+    def __init__(self, codigo: int, descricao: str, retry_after: float = 0):
+        super().__init__(f"{codigo} {descricao}")
+        self.codigo = codigo
+        self.descricao = descricao
+        self.retry_after = retry_after
+
+
+class BotAPI:
+    def __init__(self, token: str, url: str = API_URL, timeout: float = 10.0):
+        self.base = f"{url.rstrip('/')}/bot{token}"
+        self.timeout = timeout
+
+    def chamar(self, metodo: str, **params):
+        req = urllib.request.Request(
+            f"{self.base}/{metodo}", data=json.dumps(params).encode("utf-8"),
+            headers={"Content-Type": "application/json"}, method="POST")
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                corpo = json.loads(resp.read())
+        except urllib.error.HTTPError as ex:
+            try:
+                corpo = json.loads(ex.read())
+            except Exception:
+                raise ErroTelegram(ex.code, str(ex.reason))
+        except (urllib.error.URLError, OSError, ValueError) as ex:
+            raise ErroTelegram(0, str(ex))
+        if not corpo.get("ok"):
+            params_erro = corpo.get("parameters") or {}
+            raise ErroTelegram(int(corpo.get("error_code") or 0), str(corpo.get("description") or ""),
+                               float(params_erro.get("retry_after") or 0))
+        return corpo.get("result")
+
+
+class BaldeTokens:
+    """`taxa` tokens/s, acumulando no máximo `capacidade`; `pegar()` espera o próximo.
+
+    Numa janela de 1 s passam até `taxa + capacidade`: a capacidade é a folga
+    para rajada, não o limite por segundo."""
+
+    def __init__(self, taxa: float = TAXA, capacidade: float = RAJADA):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self._tokens = self.capacidade
+        self._em = time_module.monotonic()
+        self._lock = threading.Lock()
+
+    def _encher(self, agora: float):
+        self._tokens = min(self.capacidade, self._tokens + (agora - self._em) * self.taxa)
+        self._em = agora
+
+    def pegar(self):
+        while True:
+            with self._lock:
+                agora = time_module.monotonic()
+                if agora >= self._em:
+                    self._encher(agora)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    espera = (1 - self._tokens) / self.taxa
+                else:
+                    # pausado pelo 429 até `_em`
+                    espera = self._em - agora
+            time_module.sleep(espera)
+
+    def pausar(self, segundos: float):
+        """429 do Telegram: nada sai antes de `segundos` (e o balde recomeça vazio)."""
+        with self._lock:
+            self._tokens = 0
+            self._em = max(self._em, time_module.monotonic() + segundos)
+
+
+# ==========================================================
+# ENVIO
+# ==========================================================
+OK, REMOVIDO, FALHOU = "ok", "removido", "falhou"
+
+
+def _chat_inexistente(ex: ErroTelegram) -> bool:
+    d = ex.descricao.lower()
+    return ex.codigo == 403 or (ex.codigo == 400 and ("chat not found" in d or "user is deactivated" in d))
+
+
+class Transmissor:
+    """Uma rodada por vez: comandos do bot, mudanças de estado e transmissões pendentes."""
+
+    def __init__(self, bot: BotAPI, taxa: float = TAXA, salvar_cada: int = SALVAR_CADA, pagina: int = PAGINA,
+                 janela: int = JANELA):
+        self.bot = bot
+        self.balde = BaldeTokens(taxa)
+        self.salvar_cada = salvar_cada
+        self.pagina = pagina
+        self.janela = janela
+        self.parar = threading.Event()
+
+    def enviar(self, chat_id: int, texto: str) -> str:
+        for tentativa in range(MAX_TENTATIVAS):
+            self.balde.pegar()
+            try:
+                self.bot.chamar("sendMessage", chat_id=chat_id, text=texto)
+                metricas.contar("telegram_enviada")
+                return OK
+            except ErroTelegram as ex:
+                if ex.codigo == 429:
+                    metricas.contar("telegram_retry", "429")
+                    self.balde.pausar(ex.retry_after or 1.0)
+                    continue
+                if _chat_inexistente(ex):
+                    metricas.contar("telegram_removido")
+                    telegram_desinscrever(chat_id)
+                    return REMOVIDO
+                if ex.codigo == 0 or ex.codigo >= 500:
+                    metricas.contar("telegram_retry", "5xx")
+                    espera = BACKOFF_BASE * (2 ** tentativa) + random.uniform(0.0, BACKOFF_BASE)
+                    if self.parar.wait(min(espera, BACKOFF_MAX)):
+                        break
+                    continue
+                break
+        metricas.contar("telegram_falha")
+        return FALHOU
+
+    # ---- inscrições (/avisos, /parar) ----
+    def atualizar_inscritos(self) -> int:
+        """Processa as mensagens novas do bot; devolve quantas leu."""
+        offset = int(config_get(CHAVE_OFFSET, "0", primario=True) or 0)
+        try:
+            updates = self.bot.chamar("getUpdates", offset=offset, timeout=0, allowed_updates=["message"])
+        except ErroTelegram as ex:
+            # 409: o bot tem webhook; inscrições só chegam por ele
+            metricas.contar("telegram_updates_erro", str(ex.codigo))
+            return 0
+        if not updates:
+            return 0
+        rotas = buscar_rotas()
+        for u in updates:
+            msg = u.get("message") or {}
+            chat = (msg.get("chat") or {}).get("id")
+            partes = str(msg.get("text") or "").split()
+            if chat is None or not partes:
+                continue
+            comando = partes[0].split("@")[0].lower()
+            arg = partes[1].lower() if len(partes) > 1 else ""
+            if comando == "/start" and arg == "avisos":
+                # link t.me/<bot>?start=avisos
+                comando, arg = "/avisos", ""
+            if comando == "/avisos":
+                rota = next((r for r in rotas if r.id == arg), None) if arg else rotas[0]
+                if rota is None:
+                    self.enviar(chat, "Rota desconhecida. Rotas: " + ", ".join(r.id for r in rotas))
+                    continue
+                telegram_inscrever([{"rota": rota.id, "chat_id": chat}])
+                self.enviar(chat, f"✅ Você vai receber os avisos de abertura e fechamento da lista ({rota.nome}).\n"
+                                  "Para parar: /parar")
+            elif comando == "/parar":
+                telegram_desinscrever(chat)
+                self.enviar(chat, "Pronto, você não recebe mais os avisos. Para voltar: /avisos")
+        # gravado depois de processar: uma queda no meio relê (inscrever de novo não muda nada)
+        config_upsert({CHAVE_OFFSET: max(int(u["update_id"]) for u in updates) + 1})
+        return len(updates)
+
+    # ---- mudanças de estado ----
+    @staticmethod
+    def _evento(rota, agora) -> tuple:
+        aberto, _ = status_lista(agora, rota)
+        ciclo_h, ciclo_d = obter_ciclo_atual(rota, agora)
+        estado = "aberta" if aberto else "fechada"
+        return f"{rota.id}|{estado}|{ciclo_d} {ciclo_h}", aberto, ciclo_h, ciclo_d
+
+    def detectar(self, agora=None) -> list:
+        """Cria as transmissões das rotas cujo estado mudou nos últimos `janela` minutos."""
+        agora = agora or br_now()
+        criadas = []
+        for rota in buscar_rotas():
+            chave, aberto, ciclo_h, ciclo_d = self._evento(rota, agora)
+            if status_lista(agora - timedelta(minutes=self.janela), rota)[0] == aberto:
+                continue
+            if aberto:
+                texto = f"🟢 Lista aberta - {rota.nome}\nJá dá para confirmar presença para a saída de {ciclo_d} às {ciclo_h}."
+            else:
+                texto = f"🔴 Lista fechada - {rota.nome}\nSaída de {ciclo_d} às {ciclo_h}."
+            telegram_transmissao_criar({"chave": chave, "rota": rota.id, "texto": texto,
+                                        "criada_em": agora.isoformat(), "enviadas": 0, "falhas": 0})
+            criadas.append(chave)
+        return criadas
+
+    # ---- transmissões ----
+    def transmitir(self, t: dict) -> dict:
+        """Manda `t` aos inscritos da rota a partir de `ultimo_chat`; grava o progresso."""
+        chave, rota_id = t["chave"], t["rota"]
+        ultimo = t.get("ultimo_chat")
+        cont = {"enviadas": int(t.get("enviadas") or 0), "falhas": int(t.get("falhas") or 0)}
+        desde_salvo, concluida = 0, False
+        try:
+            while not self.parar.is_set():
+                chats = telegram_inscritos(rota_id, ultimo, self.pagina)
+                if not chats:
+                    concluida = True
+                    break
+                for chat in chats:
+                    if self.parar.is_set():
+                        break
+                    r = self.enviar(chat, t["texto"])
+                    if r == OK:
+                        cont["enviadas"] += 1
+                    elif r == FALHOU:
+                        cont["falhas"] += 1
+                    ultimo = chat
+                    desde_salvo += 1
+                    if desde_salvo >= self.salvar_cada:
+                        telegram_transmissao_progresso(chave, dict(cont, ultimo_chat=ultimo))
+                        desde_salvo = 0
+        finally:
+            # parada pedida, Ctrl+C ou erro: grava até o último chat atendido
+            telegram_transmissao_progresso(chave, dict(cont, ultimo_chat=ultimo), concluida=concluida)
+        return cont
+
+    def rodada(self, agora=None) -> dict:
+        agora = agora or br_now()
+        resumo = {"updates": self.atualizar_inscritos(), "criadas": self.detectar(agora), "transmitidas": {}}
+        atuais = {r.id: self._evento(r, agora)[0] for r in buscar_rotas()}
+        for t in telegram_transmissoes_pendentes():
+            if self.parar.is_set():
+                break
+            if atuais.get(t["rota"]) != t["chave"]:
+                # a lista já mudou de novo (ou a rota saiu): o aviso não vale mais
+                metricas.contar("telegram_transmissao_vencida")
+                telegram_transmissao_progresso(t["chave"], {}, concluida=True)
+                continue
+            resumo["transmitidas"][t["chave"]] = self.transmitir(t)
+        return resumo
+
+
+def transmissor_padrao(taxa: float = TAXA):
+    token = _secret("TELEGRAM_BOT_TOKEN", "")
+    if not token:
+        raise ValueError("Faltou configurar TELEGRAM_BOT_TOKEN no Secrets.")
+    return Transmissor(BotAPI(token, _secret("TELEGRAM_API_URL", "") or API_URL), taxa=taxa)
+
+
+def iniciar(intervalo: float, transmissor: Transmissor = None):
+    """Thread daemon que roda uma rodada a cada `intervalo` s. Devolve o Event que a encerra
+    (a transmissão em andamento grava o progresso e para)."""
+    tx = transmissor or transmissor_padrao()
+
+    def laco():
+        while not tx.parar.wait(intervalo):
+            try:
+                tx.rodada()
+            except Exception:
+                # banco ou Telegram fora do ar: tenta de novo no próximo intervalo
+                metricas.contar("telegram_erro")
+
+    threading.Thread(target=laco, name="rota-telegram", daemon=True).start()
+    return tx.parar
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("rodar", help="uma rodada a cada --intervalo segundos, até Ctrl+C")
+    p.add_argument("--intervalo", type=float, default=15.0)
+    p.add_argument("--taxa", type=float, default=TAXA, help="mensagens por segundo")
+    p = sub.add_parser("rodada", help="uma rodada e sai")
+    p.add_argument("--taxa", type=float, default=TAXA, help="mensagens por segundo")
+    args = ap.parse_args(argv)
+
+    tx = transmissor_padrao(args.taxa)
+    if args.cmd == "rodada":
+        r = tx.rodada()
+        print(json.dumps(r, ensure_ascii=False, indent=1))
+        return r
+    try:
+        while True:
+            r = tx.rodada()
+            if r["updates"] or r["criadas"] or r["transmitidas"]:
+                print(json.dumps(r, ensure_ascii=False))
+            time_module.sleep(args.intervalo)
+    except KeyboardInterrupt:
+        # o progresso da transmissão em andamento já foi gravado (finally de `transmitir`)
+        tx.parar.set()
+
+
+if __name__ == "__main__":
+    main()
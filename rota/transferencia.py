@@ -0,0 +1,354 @@
+"""Importação e exportação em massa de `usuarios` e `presencas` (CSV ou JSONL).
+
+    python -m rota.transferencia importar usuarios cadastro.csv [--lote 1000] [--dry-run]
+    python -m rota.transferencia importar presencas lista.jsonl
+    python -m rota.transferencia exportar usuarios backup.jsonl [--sem-senha]
+    python -m rota.transferencia exportar presencas lista.csv
+
+Importar lê o arquivo em fluxo e grava um lote de `--lote` linhas por request:
+- usuarios: upsert pelo e-mail (índice único de sql/migracoes/0002); e-mail em
+  minúsculas, telefone só com dígitos. O `id` do arquivo é ignorado e coluna
+  ausente não é tocada num cadastro que já existe. Valem também os cabeçalhos
+  da planilha antiga (Nome, Graduação, Email, TELEFONE, STATUS...).
+- presencas: insert; `usuario_id` sai do e-mail no banco de destino, não do arquivo.
+
+Linha inválida (e-mail, telefone, status, data) ou recusada pelo banco
+(telefone de outro e-mail) não para a carga: vai para
+`<arquivo>.rejeitados.jsonl` com o motivo.
+
+Checkpoint: depois de cada lote gravado, `<arquivo>.ckpt` guarda até que
+registro o arquivo já foi. O mesmo comando, depois de uma falha, continua dali
+(--do-inicio ignora); ao terminar, o checkpoint é apagado.
+
+Exportar pagina por id (keyset) e escreve lote a lote, com memória constante.
+O arquivo de usuarios leva as senhas, a não ser com --sem-senha.
+
+Usa os mesmos secrets do app (SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY).
+"""
+
+import argparse
+import csv
+import json
+import os
+
+from rota import auditoria
+from rota.ciclo import parse_dt
+from rota.constantes import ROTA_PADRAO
+from rota.db import (
+    usuarios_upsert_lote, usuarios_ids, usuarios_lote, presenca_insert_lote, presenca_lote,
+    conflito_unico, buscar_total_usuarios, buscar_usuarios_admin,
+)
+from rota.validacao import tel_only_digits, tel_is_valid_11, norm_str, email_basic_ok
+
+LOTE = 1000
+TABELAS = ("usuarios", "presencas")
+STATUS = ("PENDENTE", "ATIVO", "INATIVO")
+
+# colunas gravadas/exportadas de cada tabela (a ordem é a do CSV exportado)
+COLUNAS = {
+    "usuarios": ("id", "nome", "graduacao", "lotacao", "senha", "origem", "email", "telefone", "status",
+                 "temp_senha", "temp_expira", "temp_usada", "created_at"),
+    "presencas": ("id", "rota", "usuario_id", "nome", "graduacao", "lotacao", "origem", "data_hora",
+                  "email", "telefone", "created_at"),
+}
+SENHAS = ("senha", "temp_senha", "temp_expira", "temp_usada")
+# cabeçalhos da planilha (rota/modelos.py, rota/ordenacao.py), comparados em minúsculas
+APELIDOS = {"graduação": "graduacao", "lotação": "lotacao", "qg_rmcf_outros": "origem"}
+
+
+def _formato(caminho: str, formato: str = None) -> str:
+    if formato:
+        return formato
+    return "csv" if caminho.lower().endswith(".csv") else "jsonl"
+
+
+# ==========================================================
+# LEITURA EM FLUXO + NORMALIZAÇÃO
+# ==========================================================
+def ler(caminho: str, formato: str = None):
+    """(nº do registro, dict ou None, erro) um por vez, sem carregar o arquivo."""
+    with open(caminho, encoding="utf-8-sig", newline="") as f:
+        if _formato(caminho, formato) == "csv":
+            for i, row in enumerate(csv.DictReader(f), 1):
+                yield i, row, ""
+            return
+        for i, linha in enumerate(f, 1):
+            if not linha.strip():
+                continue
+            try:
+                row = json.loads(linha)
+            except ValueError as ex:
+                yield i, None, f"JSON inválido: {ex}"
+                continue
+            yield i, row, "" if isinstance(row, dict) else "esperado um objeto JSON"
+
+def _colunas(bruto: dict, tabela: str) -> dict:
+    validas = COLUNAS[tabela]
+    out = {}
+    for k, v in bruto.items():
+        col = str(k or "").strip().lower()
+        col = APELIDOS.get(col, col)
+        # vazio (célula do CSV, null do JSON) = coluna ausente
+        if col in validas and v is not None and str(v).strip() != "":
+            out[col] = v
+    return out
+
+def _booleano(v) -> bool:
+    if isinstance(v, bool):
+        return v
+    s = str(v).strip().upper()
+    if s in ("TRUE", "T", "1", "SIM", "S"):
+        return True
+    if s in ("FALSE", "F", "0", "NAO", "NÃO", "N"):
+        return False
+    raise ValueError(f"booleano inválido: {v!r}")
+
+def normalizar_usuario(bruto: dict) -> dict:
+    """Linha do arquivo -> linha de `usuarios`. ValueError com o motivo se inválida."""
+    row = _colunas(bruto, "usuarios")
+    row.pop("id", None)
+    row.pop("created_at", None)
+    row["email"] = str(row.get("email", "")).strip().lower()
+    if not email_basic_ok(row["email"]):
+        raise ValueError("e-mail vazio ou inválido")
+    row["telefone"] = tel_only_digits(row.get("telefone", ""))
+    if not tel_is_valid_11(row["telefone"]):
+        raise ValueError("telefone sem DDD + 9 dígitos")
+    if "status" in row:
+        row["status"] = str(row["status"]).strip().upper()
+        if row["status"] not in STATUS:
+            raise ValueError(f"status inválido: {row['status']}")
+    for col in ("nome", "graduacao", "lotacao", "origem", "senha", "temp_senha"):
+        if col in row:
+            row[col] = norm_str(row[col])
+    if "temp_usada" in row:
+        row["temp_usada"] = _booleano(row["temp_usada"])
+    if "temp_expira" in row:
+        dt = parse_dt(row["temp_expira"])
+        if dt is None:
+            raise ValueError("temp_expira inválida")
+        row["temp_expira"] = dt.isoformat()
+    return row
+
+def normalizar_presenca(bruto: dict) -> dict:
+    """Linha do arquivo -> linha de `presencas` (sem usuario_id). ValueError se inválida."""
+    row = _colunas(bruto, "presencas")
+    for col in ("id", "usuario_id", "created_at"):
+        row.pop(col, None)
+    row["email"] = str(row.get("email", "")).strip().lower()
+    if not email_basic_ok(row["email"]):
+        raise ValueError("e-mail vazio ou inválido")
+    dt = parse_dt(row.get("data_hora"))
+    if dt is None:
+        raise ValueError("data_hora vazia ou inválida")
+    row["data_hora"] = dt.isoformat()
+    row["rota"] = norm_str(row.get("rota")) or ROTA_PADRAO
+    row["telefone"] = tel_only_digits(row.get("telefone", "")) or None
+    for col in ("nome", "graduacao", "lotacao", "origem"):
+        row[col] = norm_str(row.get(col))
+    return row
+
+
+# ==========================================================
+# GRAVAÇÃO POR LOTE (devolve as linhas recusadas, com o motivo)
+# ==========================================================
+def _gravar_usuarios(rows: list) -> list:
+    # um upsert por conjunto de colunas (quase sempre um só): coluna ausente não vira null
+    grupos = {}
+    for r in rows:
+        grupos.setdefault(tuple(sorted(r)), []).append(r)
+    recusadas = []
+    for grupo in grupos.values():
+        try:
+            usuarios_upsert_lote(grupo)
+        except Exception as ex:
+            if not conflito_unico(ex):
+                raise
+            # telefone de outro e-mail no lote: cada linha sozinha, para saber qual
+            for r in grupo:
+                try:
+                    usuarios_upsert_lote([r])
+                except Exception as ex1:
+                    campo = conflito_unico(ex1)
+                    if not campo:
+                        raise
+                    recusadas.append((r, f"{campo} já cadastrado em outro usuário"))
+    return recusadas
+
+def _gravar_presencas(rows: list) -> list:
+    ids = usuarios_ids(r["email"] for r in rows)
+    validas, recusadas = [], []
+    for r in rows:
+        if r["email"] in ids:
+            validas.append(dict(r, usuario_id=ids[r["email"]]))
+        else:
+            # sem usuário a presença seria órfã (e a limpeza de rota/manutencao.py a apagaria)
+            recusadas.append((r, "e-mail sem cadastro em usuarios"))
+    presenca_insert_lote(validas)
+    return recusadas
+
+GRAVAR = {"usuarios": _gravar_usuarios, "presencas": _gravar_presencas}
+NORMALIZAR = {"usuarios": normalizar_usuario, "presencas": normalizar_presenca}
+
+
+# ==========================================================
+# CHECKPOINT
+# ==========================================================
+def _ler_checkpoint(caminho_ckpt: str, arquivo: str, tabela: str) -> dict:
+    try:
+        with open(caminho_ckpt, encoding="utf-8") as f:
+            ck = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # outro arquivo (ou o mesmo, alterado) no mesmo caminho: começa do zero
+    if ck.get("arquivo") != os.path.abspath(arquivo) or ck.get("tabela") != tabela \
+            or ck.get("tamanho") != os.path.getsize(arquivo):
+        return {}
+    return ck
+
+def _gravar_checkpoint(caminho_ckpt: str, ck: dict):
+    tmp = caminho_ckpt + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(ck, f)
+    os.replace(tmp, caminho_ckpt)
+
+
+# ==========================================================
+# IMPORTAR
+# ==========================================================
+def importar(tabela: str, arquivo: str, formato: str = None, lote: int = LOTE, checkpoint: str = None,
+             do_inicio: bool = False, dry_run: bool = False, log=print) -> dict:
+    """Carrega `arquivo` em `tabela` lote a lote. Resumo: lidos / gravados / rejeitados /
+    duplicados (mesmo e-mail mais de uma vez no lote: vale o último) / retomado_de."""
+    normalizar, gravar = NORMALIZAR[tabela], GRAVAR[tabela]
+    caminho_ckpt = checkpoint or arquivo + ".ckpt"
+    ck = {} if (do_inicio or dry_run) else _ler_checkpoint(caminho_ckpt, arquivo, tabela)
+    resumo = {"lidos": 0, "gravados": ck.get("gravados", 0), "rejeitados": ck.get("rejeitados", 0),
+              "duplicados": ck.get("duplicados", 0), "retomado_de": ck.get("registro", 0)}
+    if resumo["retomado_de"]:
+        log(f"retomando depois do registro {resumo['retomado_de']} ({caminho_ckpt})")
+    ck = {"arquivo": os.path.abspath(arquivo), "tabela": tabela, "tamanho": os.path.getsize(arquivo)}
+
+    caminho_rej = arquivo + ".rejeitados.jsonl"
+    if not dry_run and not resumo["retomado_de"] and os.path.exists(caminho_rej):
+        os.remove(caminho_rej)  # de uma carga anterior, já terminada
+
+    pendentes, rejeitados, ultimo = {}, [], resumo["retomado_de"]
+
+    def descarregar():
+        registro = {id(r): i for i, r in pendentes.values()}
+        rows = [r for _, r in pendentes.values()]
+        recusadas = [] if dry_run or not rows else gravar(rows)
+        rejeitados.extend({"registro": registro[id(r)], "motivo": m, "linha": r} for r, m in recusadas)
+        resumo["gravados"] += len(rows) - len(recusadas)
+        if rejeitados and not dry_run:
+            with open(caminho_rej, "a", encoding="utf-8") as f:
+                for r in rejeitados:
+                    f.write(json.dumps(r, ensure_ascii=False, default=str) + "\n")
+        resumo["rejeitados"] += len(rejeitados)
+        pendentes.clear()
+        rejeitados.clear()
+        if not dry_run:
+            _gravar_checkpoint(caminho_ckpt, dict(ck, registro=ultimo, gravados=resumo["gravados"],
+                                                  rejeitados=resumo["rejeitados"], duplicados=resumo["duplicados"]))
+        log(f"... registro {ultimo}: {resumo['gravados']} {'válidos' if dry_run else 'gravados'}, "
+            f"{resumo['rejeitados']} rejeitados")
+
+    for i, bruto, erro in ler(arquivo, formato):
+        if i <= resumo["retomado_de"]:
+            continue
+        resumo["lidos"] += 1
+        ultimo = i
+        try:
+            if erro:
+                raise ValueError(erro)
+            row = normalizar(bruto)
+        except ValueError as ex:
+            rejeitados.append({"registro": i, "motivo": str(ex), "linha": bruto})
+            continue
+        # usuarios: um upsert não pode tocar a mesma linha duas vezes; presenças repetem e-mail entre rotas
+        chave = row["email"] if tabela == "usuarios" else i
+        if chave in pendentes:
+            resumo["duplicados"] += 1
+            del pendentes[chave]
+        pendentes[chave] = (i, row)
+        if len(pendentes) >= lote:
+            descarregar()
+    descarregar()
+
+    if not dry_run:
+        os.remove(caminho_ckpt)
+        if tabela == "usuarios":
+            buscar_total_usuarios.clear()
+            buscar_usuarios_admin.clear()
+        auditoria.registrar("importacao", auditoria.ATOR_ADM, alvo=os.path.basename(arquivo), tabela=tabela,
+                            gravados=resumo["gravados"], rejeitados=resumo["rejeitados"])
+    return resumo
+
+
+# ==========================================================
+# EXPORTAR
+# ==========================================================
+LER_LOTE = {"usuarios": lambda apos, n: usuarios_lote(apos, n, columns="*"), "presencas": presenca_lote}
+
+def exportar(tabela: str, arquivo: str, formato: str = None, lote: int = LOTE, sem_senha: bool = False,
+             log=print) -> int:
+    """Escreve a tabela inteira em `arquivo`, pelo id, um lote por vez. Devolve quantas linhas."""
+    colunas = [c for c in COLUNAS[tabela] if not (sem_senha and c in SENHAS)]
+    csv_ = _formato(arquivo, formato) == "csv"
+    parcial = arquivo + ".parcial"
+    n, ultimo = 0, 0
+    with open(parcial, "w", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=colunas, extrasaction="ignore") if csv_ else None
+        if w:
+            w.writeheader()
+        while True:
+            rows = LER_LOTE[tabela](ultimo, lote)
+            if not rows:
+                break
+            ultimo = rows[-1]["id"]
+            for r in rows:
+                r = {c: r.get(c) for c in colunas}
+                if w:
+                    w.writerow(r)
+                else:
+                    f.write(json.dumps(r, ensure_ascii=False, default=str) + "\n")
+            n += len(rows)
+            log(f"... {n} linhas")
+    # arquivo final só completo: uma exportação interrompida não sobrescreve o backup anterior
+    os.replace(parcial, arquivo)
+    return n
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("importar", help="CSV/JSONL -> tabela, em lotes, com checkpoint")
+    p.add_argument("tabela", choices=TABELAS)
+    p.add_argument("arquivo")
+    p.add_argument("--formato", choices=("csv", "jsonl"), help="padrão: pela extensão (.csv, senão jsonl)")
+    p.add_argument("--lote", type=int, default=LOTE)
+    p.add_argument("--checkpoint", help="padrão: <arquivo>.ckpt")
+    p.add_argument("--do-inicio", action="store_true", help="ignora o checkpoint")
+    p.add_argument("--dry-run", action="store_true", help="só valida e conta, sem gravar")
+    p = sub.add_parser("exportar", help="tabela -> CSV/JSONL, em lotes")
+    p.add_argument("tabela", choices=TABELAS)
+    p.add_argument("arquivo")
+    p.add_argument("--formato", choices=("csv", "jsonl"))
+    p.add_argument("--lote", type=int, default=LOTE)
+    p.add_argument("--sem-senha", action="store_true", help="sem senha / senha temporária")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "importar":
+        r = importar(args.tabela, args.arquivo, args.formato, args.lote, args.checkpoint, args.do_inicio, args.dry_run)
+        print(f"\n{r['lidos']} lidos, {r['gravados']} {'válidos' if args.dry_run else 'gravados'}, "
+              f"{r['rejeitados']} rejeitados ({args.arquivo}.rejeitados.jsonl), {r['duplicados']} duplicados")
+        return r
+    if args.cmd == "exportar":
+        n = exportar(args.tabela, args.arquivo, args.formato, args.lote, args.sem_senha)
+        print(f"\n{n} linhas em {args.arquivo}")
+        return n
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Telas do app; cada módulo é importado só quando a tela é exibida."""
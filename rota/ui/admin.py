@@ -0,0 +1,229 @@
+"""Painel administrativo (usuários, limite e diagnóstico)."""
+
+import json
+
+import streamlit as st
+
+from rota import auditoria, metricas, sessao
+from rota.auditoria import ATOR_ADM
+from rota.ciclo import fmt_dt, parse_dt
+from rota.db import (
+    usuarios_update, usuarios_delete, auditoria_select,
+    buscar_total_usuarios, buscar_usuarios_admin, buscar_estatisticas,
+)
+from rota.configuracao import configuracao, salvar
+from rota.estatisticas import resumo_painel
+from rota.modelos import Rota
+from rota.rotas import buscar_rotas, salvar_rota
+from rota.usuarios import ativar_todos
+
+AUDITORIA_PAGINA = 50
+
+
+def _rotas():
+    # config "rota:<id>" (rota/rotas.py); presenças e caches já são separados por rota
+    rotas = buscar_rotas()
+    st.dataframe(
+        [{"id": r.id, "nome": r.nome, "vagas": r.vagas, "saídas": " / ".join(r.saidas)} for r in rotas],
+        use_container_width=True, hide_index=True,
+    )
+    ids = [r.id for r in rotas]
+    escolha = st.selectbox("Editar rota:", ids + ["➕ nova rota"], key="adm_rota_sel")
+    base = rotas[ids.index(escolha)] if escolha in ids else Rota(id="", nome="", saidas=rotas[0].saidas)
+    with st.form("form_rota"):
+        rid = st.text_input("Id (letras minúsculas, números e '-'):", value=base.id, disabled=bool(base.id))
+        nome = st.text_input("Nome:", value=base.nome)
+        vagas = st.number_input("Vagas:", min_value=1, value=int(base.vagas))
+        c1, c2 = st.columns(2)
+        s1 = c1.text_input("Saída manhã (HH:MM):", value=base.saidas[0])
+        s2 = c2.text_input("Saída noite (HH:MM):", value=base.saidas[1])
+        ok = st.form_submit_button("💾 SALVAR ROTA", use_container_width=True)
+    if ok:
+        try:
+            nova = Rota(id=(base.id or rid).strip().lower(), nome=nome.strip().upper(), vagas=int(vagas),
+                        saidas=(s1.strip(), s2.strip()))
+            salvar_rota(nova)
+            auditoria.registrar("rota_salva", ATOR_ADM, alvo=nova.id, nome=nova.nome, vagas=nova.vagas,
+                                saidas=list(nova.saidas), nova=not base.id)
+            st.success("Rota salva!")
+            st.rerun()
+        except ValueError as ex:
+            st.error(str(ex))
+
+def _estatisticas():
+    # só os agregados gravados na virada de cada ciclo (sql/migracoes/0003_estatisticas.sql)
+    rotas = buscar_rotas()
+    rota_id = None
+    if len(rotas) > 1:
+        rota_id = st.selectbox("Rota:", [r.id for r in rotas], format_func=lambda i: next(r.nome for r in rotas if r.id == i), key="adm_est_rota")
+    p = resumo_painel(*buscar_estatisticas(rota_id))
+    if not p:
+        st.info("Sem ciclos registrados ainda: o resumo é gravado na virada de cada ciclo.")
+        return
+    ciclos = p["ciclos"]
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Ciclos", len(ciclos))
+    c2.metric("Média por ciclo", f"{ciclos['total'].mean():.1f}")
+    c3.metric("Excedentes por ciclo", f"{ciclos['excedentes'].mean():.1f}")
+
+    st.caption("Por dia da semana (dia em que a lista abriu).")
+    st.dataframe(p["por_dia"], use_container_width=True, hide_index=True)
+
+    dias = list(p["horarios"])
+    dia = st.selectbox("Horário das confirmações (faixas de 10 min):", dias, key="adm_est_dia")
+    if dia:
+        st.bar_chart(p["horarios"][dia])
+
+    cA, cB = st.columns(2)
+    cA.dataframe(p["origem"], use_container_width=True, hide_index=True)
+    cB.dataframe(p["graduacao"], use_container_width=True, hide_index=True)
+
+    st.caption("Quem mais confirma (e quantas vezes ficou como excedente).")
+    st.dataframe(p["usuarios"], use_container_width=True, hide_index=True)
+    st.caption("Últimos ciclos.")
+    st.dataframe(ciclos.head(30), use_container_width=True, hide_index=True)
+
+def _auditoria():
+    # keyset: a pilha guarda o menor id de cada página já vista (voltar = desempilhar)
+    c1, c2 = st.columns(2)
+    acao = c1.selectbox("Ação:", ["(todas)"] + list(auditoria.ACOES), key="adm_aud_acao")
+    ator = c2.text_input("Quem (e-mail ou ADM):", key="adm_aud_ator").strip()
+    filtro = (acao, ator)
+    if st.session_state.get("_aud_filtro") != filtro:
+        st.session_state._aud_filtro = filtro
+        st.session_state._aud_paginas = []
+    paginas = st.session_state._aud_paginas
+    try:
+        rows = auditoria_select(antes_de=paginas[-1] if paginas else None, limite=AUDITORIA_PAGINA,
+                                acao=None if acao == "(todas)" else acao, ator=ator or None)
+    except Exception as ex:
+        st.info(f"Auditoria indisponível (sql/migracoes/0008_auditoria.sql aplicada?): {ex}")
+        return
+    if not rows:
+        st.info("Nenhum evento.")
+    else:
+        st.dataframe([{
+            "quando": fmt_dt(parse_dt(r.get("em"))) if parse_dt(r.get("em")) else r.get("em"),
+            "quem": r.get("ator"),
+            "ação": r.get("acao"),
+            "alvo": r.get("alvo") or "",
+            "rota": r.get("rota") or "",
+            "detalhes": json.dumps(r.get("detalhes"), ensure_ascii=False) if r.get("detalhes") else "",
+        } for r in rows], use_container_width=True, hide_index=True)
+    cA, cB = st.columns(2)
+    if cA.button("◀ Mais recentes", disabled=not paginas, use_container_width=True):
+        paginas.pop()
+        st.rerun()
+    if cB.button("Mais antigos ▶", disabled=len(rows) < AUDITORIA_PAGINA, use_container_width=True):
+        paginas.append(rows[-1]["id"])
+        st.rerun()
+    buf = auditoria.buffer_auditoria()
+    st.caption(f"Os eventos chegam ao banco em até {buf.intervalo:g} s ({buf.pendentes()} aguardando neste processo).")
+
+
+def render():
+    limite_max = configuracao().limite_usuarios
+
+    st.header("🛡️ PAINEL ADMINISTRATIVO 🛡️")
+
+    sair_btn = st.button("⬅️ SAIR DO PAINEL")
+    if sair_btn:
+        st.session_state.is_admin = False
+        st.session_state._adm_first_load = False
+        st.rerun()
+
+    if st.session_state._adm_first_load:
+        buscar_usuarios_admin.clear()
+        st.session_state._adm_first_load = False
+
+    records_u = buscar_usuarios_admin()
+
+    cA, cB = st.columns([1, 1])
+    with cA:
+        att_btn = st.button("🔄 Atualizar Usuários", use_container_width=True)
+        if att_btn:
+            buscar_usuarios_admin.clear()
+            st.rerun()
+    with cB:
+        st.caption("ADM lê mais fresco (TTL=3s).")
+
+    st.subheader("⚙️ Configurações Globais")
+    novo_limite = st.number_input("Limite máximo de usuários:", value=int(limite_max))
+    salvar_lim = st.button("💾 SALVAR NOVO LIMITE")
+    if salvar_lim:
+        try:
+            salvar({"limite_usuarios": int(novo_limite)})
+            auditoria.registrar("limite_usuarios", ATOR_ADM, de=int(limite_max), para=int(novo_limite))
+            st.success("Limite atualizado!")
+            st.rerun()
+        except ValueError as ex:
+            st.error(str(ex))
+
+    with st.expander("🚌 Rotas"):
+        _rotas()
+
+    with st.expander("📊 Estatísticas dos ciclos"):
+        _estatisticas()
+
+    with st.expander("🧾 Auditoria"):
+        _auditoria()
+
+    with st.expander("📈 Diagnóstico (métricas)"):
+        if not metricas.ATIVO:
+            st.info("Métricas desligadas. Defina ROTA_METRICAS=1 no ambiente para coletar.")
+        else:
+            st.caption("Latências por operação (janela das últimas amostras).")
+            st.dataframe(metricas.resumo_tempos(), use_container_width=True, hide_index=True)
+            st.caption("Caches (buscar_*): hits = chamadas - misses.")
+            st.dataframe(metricas.resumo_caches(), use_container_width=True, hide_index=True)
+            cont = {f"{n}{'[' + r + ']' if r else ''}": v for (n, r), v in metricas.contadores().items() if not n.startswith("cache_")}
+            if cont:
+                st.json(cont)
+            cD, cE = st.columns(2)
+            with cD:
+                st.download_button("⬇️ Prometheus (.txt)", metricas.texto_prometheus(), "metrics.txt", use_container_width=True)
+            with cE:
+                if st.button("🧹 Zerar métricas", use_container_width=True):
+                    metricas.zerar()
+                    st.rerun()
+
+    st.divider()
+    st.subheader("👥 Gestão de Usuários")
+    busca = st.text_input("🔍 Pesquisar por Nome ou E-mail:").strip().lower()
+
+    ativar_all = st.button("✅ ATIVAR TODOS E DESLOGAR", use_container_width=True)
+    if ativar_all and records_u:
+        ativar_todos(records_u)
+        auditoria.registrar("ativar_todos", ATOR_ADM, usuarios=len(records_u))
+        buscar_usuarios_admin.clear()
+        st.session_state.clear()
+        st.rerun()
+
+    for i, user in enumerate(records_u):
+        nome = user.get("Nome", "")
+        email = user.get("Email", "")
+        if busca == "" or busca in str(nome).lower() or busca in str(email).lower():
+            status = str(user.get("STATUS", "")).upper()
+            with st.expander(f"{user.get('Graduação')} {nome} - {status}"):
+                c1, c2, c3 = st.columns([2, 1, 1])
+                c1.write(f"📧 {email} | 📱 {user.get('TELEFONE')}")
+                is_ativo = (status == "ATIVO")
+
+                new_val = c2.checkbox("Liberar", value=is_ativo, key=f"adm_chk_{i}")
+                if new_val != is_ativo:
+                    usuarios_update({"id": user["id"]}, {"status": "ATIVO" if new_val else "INATIVO"})
+                    auditoria.registrar("usuario_liberado" if new_val else "usuario_bloqueado", ATOR_ADM,
+                                        alvo=email, id=user["id"], antes=status)
+                    if not new_val:
+                        sessao.revogar(user["id"])
+                    buscar_usuarios_admin.clear()
+                    st.rerun()
+
+                del_btn = c3.button("🗑️", key=f"del_{i}")
+                if del_btn:
+                    usuarios_delete({"id": user["id"]})
+                    auditoria.registrar("usuario_apagado", ATOR_ADM, alvo=email, id=user["id"], nome=nome, status=status)
+                    sessao.revogar(user["id"])
+                    buscar_usuarios_admin.clear()
+                    buscar_total_usuarios.clear()
+                    st.rerun()
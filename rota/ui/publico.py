@@ -0,0 +1,292 @@
+"""Tela sem login: abas Login, Cadastro, Instruções, Recuperar e ADM."""
+
+import streamlit as st
+
+from rota import auditoria, sessao
+from rota.configuracao import configuracao
+from rota.constantes import LISTA_GRAD, LISTA_ORIGEM
+from rota.validacao import tel_only_digits, tel_format_br, tel_is_valid_11, norm_str, email_basic_ok
+from rota.db import (
+    usuarios_update,
+    buscar_total_usuarios, buscar_usuarios_admin,
+)
+from rota.usuarios import (
+    user_to_ui_dict, map_user_row, senha_confere,
+    buscar_user_by_email_tel, buscar_user_by_email_senha, cadastrar_usuario, atualizar_perfil,
+)
+
+
+def render():
+    total_usuarios = buscar_total_usuarios()
+    limite_max = configuracao().limite_usuarios
+
+    t1, t2, t3, t4, t5 = st.tabs(["Login", "Cadastro", "Instruções", "Recuperar", "ADM"])
+
+    # -------------------------
+    # LOGIN
+    # -------------------------
+    with t1:
+        with st.form("form_login"):
+            l_e = st.text_input("E-mail:")
+            raw_tel_login = st.text_input("Telefone:", value=st.session_state._tel_login_fmt)
+            fmt_tel_login = tel_format_br(raw_tel_login)
+            st.session_state._tel_login_fmt = fmt_tel_login
+            l_s = st.text_input("Senha:", type="password")
+
+            entrou = st.form_submit_button("▶️ ENTRAR ◀️", use_container_width=True)
+            if entrou:
+                if not tel_is_valid_11(fmt_tel_login):
+                    st.error("Telefone inválido. Use DDD + 9 dígitos (ex: (21) 98765.4321).")
+                else:
+                    tel_login_digits = tel_only_digits(fmt_tel_login)
+                    email_login = l_e.strip().lower()
+
+                    # busca usuário no DB
+                    u_raw = buscar_user_by_email_tel(email_login, tel_login_digits)
+                    u_a = user_to_ui_dict(u_raw) if u_raw else None
+
+                    if u_a and senha_confere(u_a, l_s)[1]:
+                        status_user = str(u_a.get("STATUS", "")).strip().upper()
+                        if status_user == "ATIVO":
+                            kind, ok = senha_confere(u_a, l_s)
+                            st.session_state.usuario_logado = u_a
+                            st.session_state._login_kind = kind
+
+                            if kind == "TEMP":
+                                # marca como usada e força troca de senha + edição de cadastro (exceto e-mail)
+                                try:
+                                    usuarios_update({"id": u_raw["id"]}, {"temp_usada": True})
+                                    buscar_usuarios_admin.clear()
+                                except Exception:
+                                    pass
+                                st.session_state._force_password_change = True
+                                st.session_state._force_profile_edit = True
+                            else:
+                                # reconexão volta logada sem repetir o login (rota/sessao.py)
+                                token = sessao.emitir(u_a)
+                                if token:
+                                    st.query_params["s"] = token
+
+                            st.rerun()
+                        else:
+                            st.error("Acesso negado. Aguardando aprovação do Administrador.")
+                    else:
+                        st.error("Dados incorretos.")
+
+    # -------------------------
+    # CADASTRO
+    # -------------------------
+    with t2:
+        if total_usuarios >= limite_max:
+            st.warning(f"⚠️ Limite de {limite_max} usuários atingido.")
+        else:
+            with st.form("form_novo_cadastro"):
+                n_n = st.text_input("Nome de Escala:")
+                n_e = st.text_input("E-mail:")
+
+                raw_tel_cad = st.text_input("Telefone:", value=st.session_state._tel_cad_fmt)
+                fmt_tel_cad = tel_format_br(raw_tel_cad)
+                st.session_state._tel_cad_fmt = fmt_tel_cad
+
+                n_g = st.selectbox("Graduação:", LISTA_GRAD)
+                n_l = st.text_input("Lotação:")
+                n_o = st.selectbox("Origem:", LISTA_ORIGEM)
+                n_p = st.text_input("Senha:", type="password")
+
+                cadastrou = st.form_submit_button("✍️ SALVAR CADASTRO 👈", use_container_width=True)
+                if cadastrou:
+                    missing = []
+                    if not norm_str(n_n): missing.append("Nome de Escala")
+                    if not norm_str(n_e): missing.append("E-mail")
+                    if norm_str(n_e) and not email_basic_ok(n_e): missing.append("E-mail (formato inválido)")
+                    if not tel_is_valid_11(fmt_tel_cad): missing.append("Telefone (inválido)")
+                    if not norm_str(n_g): missing.append("Graduação")
+                    if not norm_str(n_l): missing.append("Lotação")
+                    if not norm_str(n_o): missing.append("Origem")
+                    if not norm_str(n_p): missing.append("Senha")
+
+                    if missing:
+                        st.error("Preencha corretamente todos os campos: " + ", ".join(missing) + ".")
+                    else:
+                        novo_email = norm_str(n_e).lower()
+                        novo_tel_digits = tel_only_digits(fmt_tel_cad)
+
+                        erro_cad = cadastrar_usuario({
+                            "nome": norm_str(n_n),
+                            "graduacao": norm_str(n_g),
+                            "lotacao": norm_str(n_l),
+                            "senha": norm_str(n_p),
+                            "origem": norm_str(n_o),
+                            "email": novo_email,
+                            "telefone": novo_tel_digits,
+                            "status": "PENDENTE",
+                            "temp_senha": "",
+                            "temp_expira": None,
+                            "temp_usada": True
+                        })
+                        if erro_cad:
+                            st.error(erro_cad)
+                        else:
+                            buscar_total_usuarios.clear()
+                            buscar_usuarios_admin.clear()
+                            st.success("Cadastro realizado! Aguardando aprovação do Administrador.")
+                            st.rerun()
+
+    # -------------------------
+    # INSTRUÇÕES
+    # -------------------------
+    with t3:
+        st.markdown("### 📖 Guia de Uso")
+        st.success("📲 **COMO INSTALAR (TELA INICIAL)**")
+        st.markdown("**No Chrome (Android):** Toque nos 3 pontos (⋮) e em 'Instalar Aplicativo'.")
+        st.markdown("**No Safari (iPhone):** Toque em Compartilhar (⬆️) e em 'Adicionar à Tela de Início'.")
+        st.markdown("**No Telegram:** Procure o bot `@RotaNovaIguacuBot` e toque no botão 'Abrir App Rota' no menu.")
+        st.divider()
+        st.info("**CADASTRO E LOGIN:** Use seu e-mail como identificador único.")
+        st.markdown("""
+        **1. Regras de Horário:**
+        * **Manhã:** Inscrições abertas até às 05:00h. Reabre às 07:00h.
+        * **Tarde:** Inscrições abertas até às 17:00h. Reabre às 19:00h.
+        * **Finais de Semana:** Abrem domingo às 19:00h.
+
+        **2. Observação:**
+        * Nos períodos em que a lista ficar suspensa para conferência (05:00h às 07:00h / 17:00h às 19:00h), os três PPMM que estiverem no topo da lista terão acesso à lista de check up (botão no topo da lista) para tirar a falta de quem estará entrando no ônibus. O mais antigo assume e na ausência dele o seu sucessor assume.
+        * Após o horário de 06:50h e de 18:50h, a lista será automaticamente zerada para que o novo ciclo da lista possa ocorrer. Sendo assim, caso queira manter um histórico de viagem, antes desses horários, faça o download do pdf e/ou do resumo do W.Zap.
+        """)
+
+    # -------------------------
+    # RECUPERAR (gera senha temp 1 acesso)
+    # -------------------------
+    with t4:
+        st.markdown("### 🔐 Recuperar acesso")
+        st.caption("Confirme **E-mail + Senha**.")
+
+        e_r = st.text_input("E-mail cadastrado:")
+        s_r = st.text_input("Senha do usuário:", type="password")
+
+        c1, c2 = st.columns(2)
+        with c1:
+            btn_email = st.button("📧 Enviar dados para o Email cadastrado 📧", use_container_width=True)
+        with c2:
+            btn_edit = st.button("✏️ EDITAR CADASTRO ✏️", use_container_width=True)
+
+        def _validar_email_senha():
+            if not str(e_r or "").strip():
+                st.error("Informe o e-mail cadastrado.")
+                return None, None, None
+            if not str(s_r or "").strip():
+                st.error("Informe a senha do usuário.")
+                return None, None, None
+            uid, u_raw = buscar_user_by_email_senha(e_r, s_r)
+            if not uid or not u_raw:
+                st.error("Dados não encontrados (verifique e-mail e senha).")
+                return None, None, None
+            u_ui = map_user_row(u_raw)
+            return uid, u_raw, u_ui
+
+        # 1) MANTER botão e funcionalidade de envio por e-mail (agora validando por e-mail + senha)
+        if btn_email:
+            uid, u_raw, u_ui = _validar_email_senha()
+            if uid and u_ui:
+                try:
+                    from rota.correio import enviar_dados_cadastrais_para_email
+                    enviar_dados_cadastrais_para_email(u_raw)
+                    st.success("✅ Dados enviados para o e-mail cadastrado.")
+                except Exception as ex:
+                    st.error(f"Falha ao enviar e-mail: {ex}")
+
+        # 2) EDITAR CADASTRO (substitui o 'Gerar senha temporária')
+        if btn_edit:
+            uid, u_raw, u_ui = _validar_email_senha()
+            if uid and u_ui:
+                st.session_state._edit_cadastro = True
+                st.session_state._edit_user_id = uid
+                st.session_state._edit_user_ui = u_ui
+
+        if st.session_state.get("_edit_cadastro", False):
+            u_ui = st.session_state.get("_edit_user_ui") or {}
+            st.divider()
+            st.subheader("✏️ Editar cadastro (o e-mail não pode ser alterado)")
+
+            # Opções fixas (ordem solicitada)
+            grad_opcoes = ["TCEL", "MAJ", "CAP", "1º TEN", "2º TEN", "SUBTEN", "1º SGT", "2º SGT", "3º SGT", "CB", "SD", "FC COM", "FC TER"]
+            origem_opcoes = ["QG", "RMCF", "OUTROS"]
+
+            with st.form("form_editar_cadastro"):
+                nome_novo = st.text_input("Nome de Escala:", value=str(u_ui.get("Nome", "") or ""))
+                tel_novo_raw = st.text_input("Telefone:", value=tel_format_br(u_ui.get("TELEFONE", "") or ""))
+                tel_novo_fmt = tel_format_br(tel_novo_raw)
+
+                grad_atual = str(u_ui.get("Graduação", "") or "")
+                if grad_atual not in grad_opcoes:
+                    grad_atual = grad_opcoes[0]
+                grad_nova = st.selectbox("Graduação:", grad_opcoes, index=grad_opcoes.index(grad_atual))
+
+                lot_nova = st.text_input("Lotação:", value=str(u_ui.get("Lotação", "") or ""))
+
+                orig_atual = str(u_ui.get("QG_RMCF_OUTROS", "") or "")
+                if orig_atual not in origem_opcoes:
+                    orig_atual = origem_opcoes[0]
+                orig_nova = st.selectbox("Origem:", origem_opcoes, index=origem_opcoes.index(orig_atual))
+
+                st.caption("Se não quiser trocar a senha, deixe em branco.")
+                senha1 = st.text_input("Nova senha:", type="password")
+                senha2 = st.text_input("Confirmar nova senha:", type="password")
+
+                salvar = st.form_submit_button("💾 SALVAR ALTERAÇÕES", use_container_width=True)
+
+            if salvar:
+                if not str(nome_novo or "").strip():
+                    st.error("Informe o Nome de Escala.")
+                elif not tel_is_valid_11(tel_novo_fmt):
+                    st.error("Telefone inválido. Use DDD + 9 dígitos (ex: (21) 98765.4321).")
+                elif not str(lot_nova or "").strip():
+                    st.error("Informe a Lotação.")
+                elif (senha1 or senha2) and (senha1 != senha2):
+                    st.error("As senhas não conferem.")
+                else:
+                    try:
+                        uid = st.session_state.get("_edit_user_id")
+                        if not uid:
+                            st.error("Não foi possível identificar o usuário para edição.")
+                        else:
+                            # checagem de telefone + update + fim da senha temporária: uma chamada (RPC)
+                            _, erro = atualizar_perfil(uid, u_ui.get("Email", ""), {
+                                "nome": str(nome_novo).strip(),
+                                "telefone": tel_novo_fmt,
+                                "graduacao": str(grad_nova).strip(),
+                                "lotacao": str(lot_nova).strip(),
+                                "origem": str(orig_nova).strip(),
+                                # em branco: mantém a senha atual
+                                "senha": str(senha1) if str(senha1 or "").strip() else None,
+                            })
+                            if erro:
+                                st.error(erro)
+                            else:
+                                # tokens de sessão antigos levam o cadastro/senha de antes
+                                sessao.revogar(uid)
+                                buscar_usuarios_admin.clear()
+                                auditoria.registrar("perfil_editado", str(u_ui.get("Email", "")).strip().lower(),
+                                                    via="recuperar", senha=bool(str(senha1 or "").strip()))
+
+                                st.success("✅ Cadastro atualizado.")
+                                st.session_state._edit_cadastro = False
+                                st.session_state._edit_user_id = None
+                                st.session_state._edit_user_ui = None
+                                st.rerun()
+                    except Exception as ex:
+                        st.error(f"Falha ao atualizar cadastro: {ex}")
+
+
+    with t5:
+        with st.form("form_admin"):
+            ad_u = st.text_input("Usuário ADM:")
+            ad_s = st.text_input("Senha ADM:", type="password")
+            entrou_adm = st.form_submit_button("☠️ ACESSAR PAINEL ☠️")
+            if entrou_adm:
+                if ad_u == "Administrador" and ad_s == "Administrador@123":
+                    st.session_state.is_admin = True
+                    st.session_state._adm_first_load = True
+                    st.rerun()
+                else:
+                    st.error("ADM inválido.")
@@ -0,0 +1,337 @@
+"""Tela do usuário logado: presença, conferência, lista, PDF e WhatsApp."""
+
+import urllib.parse
+
+import pandas as pd
+import streamlit as st
+
+from rota import auditoria, avisos, cache, metricas, sessao
+from rota.constantes import LISTA_GRAD, LISTA_ORIGEM
+from rota.validacao import tel_format_br, tel_is_valid_11, norm_str
+from rota.db import (
+    presenca_delete, buscar_usuarios_admin,
+    buscar_presenca_atualizada, buscar_presenca_versao, buscar_presenca_versionada,
+    buscar_conferencia_atualizada, conflito_unico,
+)
+from rota.ciclo import br_now, ciclo_conferencia, ciclo_expirado, limpar_ciclo, status_lista
+from rota.conferencia import fila_conferencia
+from rota.confirmacao import lote_confirmacoes
+from rota.ordenacao import montar_linhas_presenca, aplicar_ordenacao
+from rota.usuarios import atualizar_perfil, linha_presenca, user_to_ui_dict
+
+# auto-refresh da posição e da tabela (s); a versão da lista fica 3 s no cache
+INTERVALO_LISTA = 10
+
+
+# ==========================================================
+# PRESENÇA: limpeza por ciclo (equivalente ao resize do Sheets)
+# ==========================================================
+def verificar_status_e_limpar_db(presencas_rows, rota):
+    agora = br_now()
+
+    # se a última presença for anterior ao marco, zera tabela
+    try:
+        if ciclo_expirado(presencas_rows, agora, rota):
+            limpar_ciclo(rota)
+            st.session_state["_force_refresh_presenca"] = True
+            st.rerun()
+    except Exception:
+        pass
+
+    return status_lista(agora, rota)
+
+def _marcar_conferencia(ciclo: str, email: str, key: str, por: str):
+    fila_conferencia().marcar(ciclo, email, bool(st.session_state.get(key)), por)
+
+
+def _montar_lista(rota, versao: int, presencas_raw) -> dict:
+    # monta "planilha" para reaproveitar a mesma UI
+    with metricas.cronometro("render.montar_linhas"):
+        dados_p_show = montar_linhas_presenca(presencas_raw)
+
+    df_o, df_v = pd.DataFrame(), pd.DataFrame()
+    html, txt_w = "", ""
+    if len(dados_p_show) > 1:
+        df_o, df_v = aplicar_ordenacao(pd.DataFrame(dados_p_show[1:], columns=dados_p_show[0]), rota.vagas)
+        with metricas.cronometro("render.tabela_html"):
+            html = f"<div class='tabela-responsiva'>{df_v.drop(columns=['EMAIL']).to_html(index=False, justify='center', border=0, escape=False)}</div>"
+        with metricas.cronometro("render.whatsapp"):
+            txt_w = "*🚌 LISTA DE PRESENÇA*\n\n"
+            for _, r in df_o.iterrows():
+                txt_w += f"{r['Nº']}. {r['GRADUAÇÃO']} {r['NOME']}\n"
+    # quem saiu do excedente desde a última versão recebe aviso (rota/avisos.py)
+    avisos.observar(rota, versao, df_o)
+
+    return {
+        "rota": rota.id,
+        "versao": versao,
+        "presencas": presencas_raw,
+        "n": len(dados_p_show) - 1,
+        "df_o": df_o,
+        "html": html,
+        "txt_w": txt_w,
+    }
+
+@metricas.cache_medido(cache.por_rota("lista_ordenada", ttl=600, max_entries=8))
+def _lista_ordenada(rota_id: str, versao: int, rota) -> dict:
+    # ordenação + HTML + WhatsApp de uma versão: calculados uma vez para todas as
+    # sessões (e réplicas, com backend compartilhado); somente leitura.
+    # `rota` entra na chave: mudar vagas/nome da rota refaz a lista
+    return _montar_lista(rota, versao, buscar_presenca_versionada(rota_id, versao))
+
+def _lista_por_versao(rota) -> dict:
+    """Presenças, ordenação, HTML da tabela e texto do WhatsApp, reaproveitados na sessão
+    enquanto a versão da lista da rota (config: presenca_versao[:<rota>]) não mudar."""
+    versao = buscar_presenca_versao(rota.id)
+    lista = st.session_state.get("_lista_cache")
+    if versao >= 0 and lista and lista["versao"] == versao and lista["rota"] == rota.id:
+        metricas.contar("lista_nao_modificada")
+        return lista
+
+    lista = None
+    if versao >= 0:
+        try:
+            lista = _lista_ordenada(rota.id, versao, rota)
+        except Exception:
+            lista = None
+    if lista is None:
+        return _montar_lista(rota, -1, buscar_presenca_atualizada(rota.id))
+
+    st.session_state._lista_cache = lista
+    return lista
+
+def _atualizar_lista(rota):
+    buscar_presenca_versao.clear(rota.id)
+    buscar_presenca_atualizada.clear(rota.id)
+    buscar_conferencia_atualizada.clear(rota.id)
+
+
+def render(ciclo_h: str, ciclo_d: str, rota):
+    u = st.session_state.usuario_logado
+
+    # ------------------------------------------------------
+    # Se entrou com senha temporária: forçar trocar senha + editar cadastro (exceto e-mail)
+    # ------------------------------------------------------
+    if st.session_state.get("_force_password_change", False) or st.session_state.get("_force_profile_edit", False):
+        st.warning("🔐 Você entrou com uma **senha temporária**. Confirme seus dados e defina uma **nova senha** para concluir o acesso.")
+
+        st.markdown("### ✅ Atualizar Cadastro (e-mail não pode mudar)")
+        with st.form("form_update_profile_temp"):
+            st.text_input("E-mail (fixo):", value=str(u.get("Email","")), disabled=True)
+            nome_n = st.text_input("Nome de Escala:", value=str(u.get("Nome","")))
+            grad_n = st.selectbox("Graduação:", LISTA_GRAD, index=max(0, LISTA_GRAD.index(str(u.get("Graduação","")))) if str(u.get("Graduação","")) in LISTA_GRAD else 0)
+            lot_n = st.text_input("Lotação:", value=str(u.get("Lotação","")))
+            orig_n = st.selectbox("Origem:", LISTA_ORIGEM, index=max(0, LISTA_ORIGEM.index(str(u.get("QG_RMCF_OUTROS","")))) if str(u.get("QG_RMCF_OUTROS","")) in LISTA_ORIGEM else 0)
+
+            raw_tel = st.text_input("Telefone (DDD + 9 dígitos):", value=tel_format_br(u.get("TELEFONE","")))
+            fmt_tel = tel_format_br(raw_tel)
+
+            nova1 = st.text_input("Nova senha:", type="password")
+            nova2 = st.text_input("Confirmar nova senha:", type="password")
+
+            ok_btn = st.form_submit_button("💾 SALVAR E ENTRAR", use_container_width=True)
+
+        if ok_btn:
+            if not norm_str(nome_n):
+                st.error("Informe o Nome de Escala.")
+            elif not norm_str(lot_n):
+                st.error("Informe a Lotação.")
+            elif not tel_is_valid_11(fmt_tel):
+                st.error("Telefone inválido. Use DDD + 9 dígitos (ex: (21) 98765.4321).")
+            elif not norm_str(nova1):
+                st.error("Informe a nova senha.")
+            elif nova1 != nova2:
+                st.error("As senhas não conferem.")
+            else:
+                try:
+                    # checagem de telefone + update + fim da senha temporária: uma chamada (RPC)
+                    row, erro = atualizar_perfil(u.get("id"), u.get("Email", ""), {
+                        "nome": norm_str(nome_n),
+                        "graduacao": norm_str(grad_n),
+                        "lotacao": norm_str(lot_n),
+                        "origem": norm_str(orig_n),
+                        "telefone": fmt_tel,
+                        "senha": str(nova1),
+                    })
+                    if erro:
+                        st.error(erro)
+                    else:
+                        buscar_usuarios_admin.clear()
+                        sessao.revogar(row["id"])
+                        auditoria.registrar("perfil_editado", row.get("email"), via="senha_temporaria", senha=True)
+
+                        # sessão passa a ser o registro gravado
+                        st.session_state.usuario_logado = user_to_ui_dict(row)
+
+                        st.session_state._force_password_change = False
+                        st.session_state._force_profile_edit = False
+                        st.session_state._login_kind = "REAL"
+                        token = sessao.emitir(st.session_state.usuario_logado)
+                        if token:
+                            st.query_params["s"] = token
+                        st.success("✅ Cadastro e senha atualizados. Acesso liberado.")
+                        st.rerun()
+                except Exception as ex:
+                    st.error(f"Falha ao atualizar: {ex}")
+
+        st.stop()
+
+    # Sidebar
+    st.sidebar.markdown("### 👤 Usuário Conectado 🙍‍♂️")
+    st.sidebar.info(f"**{u.get('Graduação')} {u.get('Nome')}**")
+    sair_user = st.sidebar.button("⬅️ Sair", use_container_width=True)
+    if sair_user:
+        st.query_params.pop("s", None)
+        for key in list(st.session_state.keys()):
+            del st.session_state[key]
+        st.rerun()
+
+    st.sidebar.markdown("---")
+    st.sidebar.caption("Desenvolvido por: MAJ ANDRÉ AGUIAR - CAES®️")
+
+    # Presença
+    if st.session_state._force_refresh_presenca:
+        _atualizar_lista(rota)
+        st.session_state._lista_cache = None
+        st.session_state._force_refresh_presenca = False
+
+    # cada parte é um fragmento: um clique reexecuta só a parte dele, não o script inteiro
+    _presenca(u, rota)
+    _conferencia(u, rota, ciclo_h, ciclo_d)
+    _tabela(rota)
+    _exportar(rota)
+
+
+# ==========================================================
+# FRAGMENTOS DA TELA DO USUÁRIO
+# ==========================================================
+def _posicao(df_o, u):
+    """(já está na lista?, posição 1..n) do usuário logado."""
+    if df_o.empty:
+        return False, 999
+    email_logado = str(u.get("Email")).strip().lower()
+    achou = df_o.index[df_o["EMAIL"].str.lower() == email_logado].tolist()
+    return (True, achou[0] + 1) if achou else (False, 999)
+
+@st.fragment(run_every=INTERVALO_LISTA)
+def _presenca(u, rota):
+    # status e botões; a posição acompanha a lista sozinha (mesmo intervalo da tabela)
+    lista = _lista_por_versao(rota)
+    aberto, _ = verificar_status_e_limpar_db(lista["presencas"], rota)
+    ja, pos = _posicao(lista["df_o"], u)
+
+    if ja:
+        st.success(f"✅ Presença registrada: {pos}º")
+        exc_btn = st.button("❌ EXCLUIR MINHA PRESENÇA ⚠️", use_container_width=True)
+        if exc_btn:
+            email_logado = str(u.get("Email")).strip().lower()
+            presenca_delete({"email": email_logado}, rota=rota.id)
+            auditoria.registrar("presenca_excluida", email_logado, rota=rota.id, posicao=pos)
+            _atualizar_lista(rota)
+            # muda posição, conferência e tabela: tela inteira
+            st.rerun()
+
+    elif aberto:
+        salvar_btn = st.button("🚀 CONFIRMAR MINHA PRESENÇA ✅", use_container_width=True)
+        if salvar_btn:
+            try:
+                lote_confirmacoes().inserir(linha_presenca(u, rota=rota.id))
+                auditoria.registrar("presenca_confirmada", str(u.get("Email")).strip().lower(), rota=rota.id)
+            except Exception as ex:
+                # clique duplo: a outra confirmação já entrou; só mostra a lista nova
+                if conflito_unico(ex) != "presenca":
+                    raise
+            _atualizar_lista(rota)
+            st.rerun()
+    else:
+        st.info("⌛ Lista fechada para novas inscrições.")
+        up_btn_fechado = st.button("🔄 ATUALIZAR", use_container_width=True)
+        if up_btn_fechado:
+            buscar_presenca_versao.clear(rota.id)
+            st.rerun()
+
+@st.fragment
+def _conferencia(u, rota, ciclo_h, ciclo_d):
+    # botão e checkboxes reexecutam só este fragmento (a fila grava em segundo plano)
+    lista = _lista_por_versao(rota)
+    _, janela_conf = status_lista(rota=rota)
+    ja, pos = _posicao(lista["df_o"], u)
+    if not (ja and pos <= 3 and janela_conf):
+        return
+
+    st.divider()
+    st.subheader("📋 LISTA DE EMBARQUE 📋")
+    painel_btn = st.button("✍️ CONFERÊNCIA ✍️", use_container_width=True)
+    if painel_btn:
+        st.session_state.conf_ativa = not st.session_state.conf_ativa
+
+    if st.session_state.conf_ativa and lista["n"] > 0:
+        # estado compartilhado: o que já está no banco + cliques ainda na fila
+        ciclo_conf = ciclo_conferencia(rota, ciclo_h, ciclo_d)
+        marcados = {str(r.get("email", "")).lower(): bool(r.get("marcado")) for r in buscar_conferencia_atualizada(rota.id, ciclo_conf)}
+        marcados.update(fila_conferencia().pendentes(ciclo_conf))
+        email_logado = str(u.get("Email")).strip().lower()
+        for i, row in lista["df_o"].iterrows():
+            email_p = str(row.get("EMAIL", "")).strip().lower()
+            key = f"chk_p_{email_p}"
+            st.session_state[key] = marcados.get(email_p, False)
+            label = f"{row.get('Nº','')} - {row.get('NOME','')}".strip()
+            _ = st.checkbox(
+                label if label else " ",
+                key=key,
+                on_change=_marcar_conferencia,
+                args=(ciclo_conf, email_p, key, email_logado),
+            )
+
+def _reler_versao(rota_id: str):
+    buscar_presenca_versao.clear(rota_id)
+    buscar_conferencia_atualizada.clear(rota_id)
+
+@st.fragment(run_every=INTERVALO_LISTA)
+def _tabela(rota):
+    # a cada intervalo só a versão é relida (cache de 3 s); mesma versão -> mesma lista
+    # da sessão, sem busca nem ordenação
+    lista = _lista_por_versao(rota)
+    if lista["n"] <= 0:
+        return
+    insc = len(lista["df_o"])
+    rest = rota.vagas - insc
+    st.subheader(f"Inscritos: {insc} | Vagas: {rota.vagas} | {'Sobra' if rest >= 0 else 'Exc'}: {abs(rest)}")
+
+    c_up1, c_up2 = st.columns([1, 1])
+    with c_up1:
+        # callback roda antes do fragmento: esta mesma execução já relê a versão
+        st.button("🔄 ATUALIZAR", use_container_width=True, on_click=_reler_versao, args=(rota.id,))
+    with c_up2:
+        st.caption(f"Atualiza sozinha a cada {INTERVALO_LISTA} s.")
+
+    st.write(lista["html"], unsafe_allow_html=True)
+
+@st.fragment
+def _exportar(rota):
+    # fora do auto-refresh: o botão de download não some enquanto a tabela atualiza
+    lista = _lista_por_versao(rota)
+    if lista["n"] <= 0:
+        return
+    df_o = lista["df_o"]
+    c1, c2 = st.columns(2)
+    with c1:
+        # PDF sob demanda: fpdf só é carregado quando alguém pede o relatório
+        if st.button("📄 GERAR PDF (Relatório)", use_container_width=True):
+            from rota.pdf import gerar_pdf_apresentado
+            resumo = {"inscritos": len(df_o), "vagas": rota.vagas, "rota": rota.nome}
+            pdf_bytes = gerar_pdf_apresentado(df_o, resumo)
+            _ = st.download_button(
+                "⬇️ BAIXAR PDF",
+                pdf_bytes,
+                f"lista_rota_{rota.id.replace('-', '_')}.pdf",
+                use_container_width=True
+            )
+
+    with c2:
+        st.markdown(
+            f'<a href="https://wa.me/?text={urllib.parse.quote(lista["txt_w"])}" target="_blank">'
+            f"<button style='width:100%; height:38px; background-color:#25D366; color:white; border:none; "
+            f"border-radius:4px; font-weight:bold;'>🟢 WHATSAPP</button></a>",
+            unsafe_allow_html=True
+        )
@@ -0,0 +1,153 @@
+"""Usuários: mapeamento para a UI, checagem de senha e buscas por credencial."""
+
+import random
+from datetime import datetime
+
+from rota.ciclo import br_now, parse_dt
+from rota.constantes import FUSO_BR, ROTA_PADRAO
+from rota.modelos import Usuario
+from rota.db import (
+    usuarios_select, usuarios_update, usuarios_contar, usuarios_insert, usuarios_atualizar_perfil, conflito_unico,
+)
+from rota.validacao import tel_only_digits
+
+
+# ==========================================================
+# SENHA TEMPORÁRIA (1 acesso)
+# ==========================================================
+def gerar_senha_temp(tam: int = 10) -> str:
+    alfabeto = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+    return "".join(random.choice(alfabeto) for _ in range(tam))
+
+# ==========================================================
+# MAPEAMENTO / BUSCAS
+# ==========================================================
+def user_to_ui_dict(u: dict) -> Usuario:
+    # padroniza chaves (compat com código do Sheets): devolve o registro imutável,
+    # que aceita u.get("Nome") / u["TELEFONE"] como o dict antigo
+    return Usuario.de_linha(u)
+
+# Alias por compatibilidade (código antigo usava esse nome)
+map_user_row = user_to_ui_dict
+
+
+def senha_temp_valida(u_dict):
+    temp = str(u_dict.get("TEMP_SENHA", "") or "").strip()
+    usada = u_dict.get("TEMP_USADA", None)
+    exp = u_dict.get("TEMP_EXPIRA", "")
+
+    # temp_usada pode vir bool, str, None
+    if isinstance(usada, bool):
+        usada_ok = (usada is False)
+    else:
+        usada_ok = (str(usada or "").strip().upper() in ["NAO", "NÃO", "FALSE", "0", ""])
+    if not temp or not usada_ok:
+        return False
+
+    exp_dt = None
+    if isinstance(exp, str) and exp.strip():
+        exp_dt = parse_dt(exp)
+    elif isinstance(exp, datetime):
+        # se vier timestamptz do postgres já convertido
+        exp_dt = FUSO_BR.localize(exp) if exp.tzinfo is None else exp.astimezone(FUSO_BR)
+
+    if exp_dt is None:
+        return False
+    return br_now() <= exp_dt
+
+def senha_confere(u_dict, senha_digitada: str):
+    senha_digitada = str(senha_digitada or "").strip()
+    if str(u_dict.get("Senha", "")).strip() == senha_digitada:
+        return ("REAL", True)
+    if senha_temp_valida(u_dict) and str(u_dict.get("TEMP_SENHA", "")).strip() == senha_digitada:
+        return ("TEMP", True)
+    return ("", False)
+
+def buscar_user_by_email_tel(email: str, tel_digits: str):
+    email = str(email or "").strip().lower()
+    tel_digits = tel_only_digits(tel_digits)
+    # email/telefone ficam gravados normalizados (constraints de sql/migracoes/0002_usuarios_unicos.sql)
+    # primário: login logo depois de trocar senha/cadastro precisa ver a própria escrita
+    data = usuarios_select({"email": email, "telefone": tel_digits}, primario=True)
+    return data[0] if data else None
+
+def buscar_user_by_email_senha(email: str, senha: str):
+    """Busca usuário por Email + Senha REAL (não temporária)."""
+    email = str(email or "").strip().lower()
+    senha = str(senha or "").strip()
+    if not email or not senha:
+        return None, None
+    try:
+        rows = usuarios_select({"email": email, "senha": senha}, primario=True)
+        if rows:
+            u = rows[0]
+            return u.get("id"), u
+    except Exception:
+        pass
+    return None, None
+
+def linha_presenca(u: dict, data_hora: str = None, rota: str = ROTA_PADRAO) -> dict:
+    """Linha para a tabela de presenças a partir do usuário (dict da UI ou linha crua do banco)."""
+    return {
+        "rota": rota,
+        "usuario_id": u.get("id"),
+        "nome": u.get("Nome") or u.get("nome") or "",
+        "graduacao": u.get("Graduação") or u.get("graduacao") or "",
+        "lotacao": u.get("Lotação") or u.get("lotacao") or "",
+        "origem": u.get("QG_RMCF_OUTROS") or u.get("Origem") or u.get("origem") or "",
+        "data_hora": data_hora or br_now().isoformat(),
+        "email": str(u.get("Email") or u.get("email") or "").strip().lower(),
+        "telefone": (u.get("TELEFONE") or u.get("Telefone") or u.get("telefone") or None),
+    }
+
+def cadastro_duplicado(email: str, tel_digits: str):
+    """(email_existe, tel_existe) com dois counts no banco (sem baixar usuários)."""
+    email = str(email or "").strip().lower()
+    tel_digits = tel_only_digits(tel_digits)
+    email_existe = usuarios_contar({"email": email}, primario=True) > 0
+    tel_existe = usuarios_contar({"telefone": tel_digits}, primario=True) > 0
+    return email_existe, tel_existe
+
+def ativar_todos(usuarios_raw):
+    for u in usuarios_raw:
+        usuarios_update({"id": u["id"]}, {"status": "ATIVO"})
+
+def cadastrar_usuario(row: dict) -> str:
+    """Insere o cadastro em um único round trip; '' se ok, senão a mensagem de duplicidade.
+
+    Quem garante a unicidade são os índices do banco. Só quando o insert é
+    recusado consultamos quais campos já existem, para a mensagem ficar exata.
+    """
+    row = dict(row)
+    row["email"] = str(row.get("email", "") or "").strip().lower()
+    row["telefone"] = tel_only_digits(row.get("telefone", ""))
+    try:
+        usuarios_insert(row)
+        return ""
+    except Exception as ex:
+        campo = conflito_unico(ex)
+        if not campo:
+            raise
+    email_existe, tel_existe = cadastro_duplicado(row["email"], row["telefone"])
+    if email_existe and tel_existe:
+        return "E-mail e Telefone já cadastrados."
+    if email_existe or (campo == "email" and not tel_existe):
+        return "E-mail já cadastrado."
+    return "Telefone já cadastrado."
+
+def atualizar_perfil(uid, email: str, perfil: dict):
+    """Grava nome/graduação/lotação/origem/telefone (e a senha, se vier) e encerra a
+    senha temporária num único round trip. (linha atualizada, '') se ok; senão
+    (None, mensagem). `perfil` sem "senha" (ou vazia) mantém a senha atual."""
+    perfil = dict(perfil)
+    perfil["telefone"] = tel_only_digits(perfil.get("telefone", ""))
+    perfil.setdefault("senha", None)
+    try:
+        rows = usuarios_atualizar_perfil(uid, str(email or "").strip().lower(), perfil)
+    except Exception as ex:
+        if conflito_unico(ex) == "telefone":
+            return None, "Telefone já cadastrado por outro usuário."
+        raise
+    if not rows:
+        return None, "Não encontrei seu usuário no banco para atualizar."
+    return rows[0], ""
@@ -0,0 +1,41 @@
+"""Normalização e validação de campos de formulário (telefone, e-mail, texto)."""
+
+import re
+
+
+# ==========================================================
+# TELEFONE
+# ==========================================================
+def tel_only_digits(s: str) -> str:
+    return re.sub(r"\D+", "", str(s or ""))
+
+def tel_format_br(digits: str) -> str:
+    d = tel_only_digits(digits)
+    if len(d) >= 2:
+        ddd = d[:2]
+        rest = d[2:]
+    else:
+        return d
+
+    if len(rest) >= 9:
+        p1 = rest[:5]
+        p2 = rest[5:9]
+        return f"({ddd}) {p1}.{p2}"
+    elif len(rest) > 5:
+        p1 = rest[:5]
+        p2 = rest[5:]
+        return f"({ddd}) {p1}.{p2}"
+    else:
+        return f"({ddd}) {rest}"
+
+def tel_is_valid_11(s: str) -> bool:
+    return len(tel_only_digits(s)) == 11
+
+# ==========================================================
+# TEXTO / E-MAIL
+# ==========================================================
+def norm_str(x):
+    return str(x or "").strip()
+
+def email_basic_ok(e: str) -> bool:
+    return bool(re.match(r"^[^@\s]+@[^@\s]+\.[^@\s]+$", str(e or "").strip()))
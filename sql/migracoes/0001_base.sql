@@ -0,0 +1,55 @@
+-- ==========================================================
+-- ESQUEMA BASE (usuarios, presencas, config, conferencia)
+-- ==========================================================
+-- As tabelas como o app sempre usou (rota/db.py). Num projeto Supabase que já
+-- existe, tudo aqui é "if not exists" e não muda nada; num banco novo (ou no
+-- Postgres local de benchmarks/bench_explain.py) cria o ponto de partida das
+-- migrações seguintes.
+--
+-- Aplicar com: python -m rota.migracoes aplicar   (ver rota/migracoes.py)
+
+create table if not exists usuarios (
+  id           bigint generated by default as identity primary key,
+  nome         text,
+  graduacao    text,
+  lotacao      text,
+  senha        text,
+  origem       text,
+  email        text not null,
+  telefone     text not null,
+  status       text not null default 'PENDENTE',   -- PENDENTE / ATIVO / INATIVO
+  temp_senha   text,
+  temp_expira  timestamptz,
+  temp_usada   boolean default true,
+  created_at   timestamptz not null default now()
+);
+
+-- lista do ciclo atual (apagada na virada; o histórico fica em estatisticas_*)
+create table if not exists presencas (
+  id           bigint generated by default as identity primary key,
+  usuario_id   bigint,
+  nome         text,
+  graduacao    text,
+  lotacao      text,
+  origem       text,
+  data_hora    timestamptz not null,
+  email        text not null,
+  telefone     text,
+  created_at   timestamptz not null default now()
+);
+
+-- chave/valor: limite de usuários, versão da lista, rotas (rota/configuracao.py)
+create table if not exists config (
+  key    text primary key,
+  value  text
+);
+
+-- marcações da lista de embarque (rota/conferencia.py); upsert em (ciclo, email)
+create table if not exists conferencia (
+  ciclo          text not null,
+  email          text not null,
+  marcado        boolean not null default false,
+  marcado_por    text,
+  atualizado_em  timestamptz,
+  primary key (ciclo, email)
+);
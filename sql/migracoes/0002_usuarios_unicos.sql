@@ -0,0 +1,69 @@
+-- migracao: sem transacao
+-- ==========================================================
+-- UNICIDADE DE E-MAIL / TELEFONE EM usuarios
+-- ==========================================================
+-- Ordem:
+--   1) python -m rota.manutencao normalizar            (dry-run: lista o que muda e os conflitos)
+--   2) resolver os conflitos listados (mesmo e-mail/telefone em cadastros diferentes)
+--   3) python -m rota.manutencao normalizar --aplicar  (grava em lotes)
+--   4) python -m rota.migracoes aplicar             (ou este arquivo no SQL Editor do Supabase)
+--
+-- As constraints CHECK garantem que email fica gravado em minúsculas/sem espaços
+-- e telefone só com dígitos; assim os índices únicos nas colunas equivalem a
+-- unicidade em lower(email) e nos dígitos do telefone, e servem também aos
+-- filtros por igualdade do login (email = ... and telefone = ...).
+-- Os nomes dos índices são os que rota/db.py (UNICO_EMAIL / UNICO_TELEFONE)
+-- reconhece para mapear o erro 23505 na mensagem certa.
+
+-- conflitos que impediriam os índices (deve voltar vazio)
+select 'email' as campo, lower(btrim(email)) as valor, array_agg(id order by id) as ids
+  from usuarios group by 1, 2 having count(*) > 1
+union all
+select 'telefone', regexp_replace(telefone, '\D', '', 'g'), array_agg(id order by id)
+  from usuarios group by 1, 2 having count(*) > 1;
+
+-- Sem transação, um erro no meio deixa o arquivo sem registro em schema_migracoes:
+-- cada comando abaixo pode rodar de novo (o arquivo inteiro é reaplicado).
+
+-- NOT VALID + VALIDATE: não bloqueia escritas durante a checagem das linhas existentes
+-- (validar uma constraint já válida não faz nada)
+do $$
+begin
+  if not exists (select 1 from pg_constraint
+                  where conrelid = 'usuarios'::regclass and conname = 'usuarios_email_normalizado') then
+    alter table usuarios
+      add constraint usuarios_email_normalizado
+      check (email = lower(btrim(email))) not valid;
+  end if;
+end;
+$$;
+alter table usuarios validate constraint usuarios_email_normalizado;
+
+do $$
+begin
+  if not exists (select 1 from pg_constraint
+                  where conrelid = 'usuarios'::regclass and conname = 'usuarios_telefone_digitos') then
+    alter table usuarios
+      add constraint usuarios_telefone_digitos
+      check (telefone ~ '^[0-9]*$') not valid;
+  end if;
+end;
+$$;
+alter table usuarios validate constraint usuarios_telefone_digitos;
+
+-- "concurrently" que falha (ex.: duplicata que sobrou) deixa o índice INVALID, e o
+-- "if not exists" da próxima tentativa o aceitaria como pronto: sai antes
+do $$
+begin
+  if exists (select 1 from pg_index where indexrelid = to_regclass('usuarios_email_key') and not indisvalid) then
+    drop index usuarios_email_key;
+  end if;
+  if exists (select 1 from pg_index where indexrelid = to_regclass('usuarios_telefone_key') and not indisvalid) then
+    drop index usuarios_telefone_key;
+  end if;
+end;
+$$;
+
+-- "concurrently" não roda dentro de transação: execute cada linha separadamente
+create unique index concurrently if not exists usuarios_email_key on usuarios (email);
+create unique index concurrently if not exists usuarios_telefone_key on usuarios (telefone);
@@ -0,0 +1,36 @@
+-- ==========================================================
+-- ESTATÍSTICAS POR CICLO (rota/estatisticas.py)
+-- ==========================================================
+-- A lista de presença é apagada a cada virada de ciclo. Antes de apagar, o app
+-- grava um resumo compacto do ciclo que terminou (uma linha por ciclo) e soma
+-- os contadores de cada pessoa (uma linha por e-mail). O painel do ADM lê só
+-- estas duas tabelas, então o custo dos relatórios não cresce com o histórico
+-- de presenças (que nem é guardado).
+--
+-- A chave primária de estatisticas_ciclo torna o registro idempotente: se duas
+-- sessões virarem o mesmo ciclo ao mesmo tempo, só a que inserir a linha do
+-- ciclo soma os contadores por pessoa (a outra recebe 23505 e desiste).
+
+create table if not exists estatisticas_ciclo (
+  ciclo          text primary key,          -- marco do ciclo: 'YYYY-MM-DD HH:MM' (06:50 / 18:50)
+  dia_semana     smallint not null,         -- 0 = segunda ... 6 = domingo (dia do marco)
+  total          integer not null,
+  excedentes     integer not null,
+  por_origem     jsonb not null default '{}'::jsonb,   -- {"QG": 20, "RMCF": 9, ...}
+  por_graduacao  jsonb not null default '{}'::jsonb,   -- {"CB": 7, "SD": 12, ...}
+  horarios       jsonb not null default '{}'::jsonb,   -- confirmações por faixa de 10 min: {"19:00": 31, ...}
+  registrado_em  timestamptz not null default now()
+);
+
+create table if not exists estatisticas_usuario (
+  email          text primary key,
+  nome           text,
+  graduacao      text,
+  confirmacoes   integer not null default 0,
+  excedente      integer not null default 0,  -- ciclos em que ficou como "Exc-"
+  ultimo_ciclo   text
+);
+
+-- painel: ciclos mais recentes e quem mais confirma
+create index if not exists estatisticas_usuario_confirmacoes_idx
+  on estatisticas_usuario (confirmacoes desc);
@@ -0,0 +1,33 @@
+-- migracao: sem transacao
+-- ==========================================================
+-- VÁRIAS ROTAS / ÔNIBUS NO MESMO DEPLOY (rota/rotas.py)
+-- ==========================================================
+-- Cada rota fica no config como "rota:<id>" -> JSON:
+--   insert into config (key, value) values
+--     ('rota:nova-iguacu', '{"nome": "ROTA NOVA IGUAÇU", "vagas": 38, "saidas": ["06:30", "18:30"]}')
+--   on conflict (key) do update set value = excluded.value;
+-- (ou pelo painel do ADM: "🚌 Rotas"). Sem nenhuma, o app usa só a rota padrão 'nova-iguacu'.
+-- Alteração feita direto no SQL aparece em até 5 min (rota/configuracao.py); para valer na
+-- hora, grave junto uma versão nova:
+--   insert into config (key, value) values ('config_versao', (extract(epoch from now()) * 1000)::bigint::text)
+--   on conflict (key) do update set value = excluded.value;
+--
+-- As linhas de presença existentes ficam na rota padrão (default da coluna).
+-- A versão da lista é uma por rota: 'presenca_versao' (padrão) e
+-- 'presenca_versao:<id>' (demais), então escrever numa rota não invalida as outras.
+
+alter table presencas add column if not exists rota text not null default 'nova-iguacu';
+
+-- toda leitura da lista filtra por rota e ordena por data_hora; checagem de
+-- duplicidade / cancelamento filtram por (rota, email)
+create index concurrently if not exists presencas_rota_data_hora_idx on presencas (rota, data_hora);
+create index concurrently if not exists presencas_rota_email_idx on presencas (rota, email);
+
+-- conferência: a chave do ciclo passa a ser '<rota>|DD/MM/YYYY HH:MM'; marcações no
+-- formato antigo (sem rota) são só do ciclo corrente e podem ser descartadas
+delete from conferencia where ciclo not like '%|%';
+
+-- estatísticas por rota (para quem já rodou 0003_estatisticas.sql sem a coluna)
+alter table estatisticas_ciclo add column if not exists rota text not null default 'nova-iguacu';
+alter table estatisticas_ciclo drop constraint if exists estatisticas_ciclo_pkey;
+alter table estatisticas_ciclo add primary key (rota, ciclo);
@@ -0,0 +1,26 @@
+-- migracao: sem transacao
+-- ==========================================================
+-- ÍNDICES DOS CAMINHOS DE ACESSO (benchmarks/bench_explain.py)
+-- ==========================================================
+-- O que cada consulta de rota/db.py usa (todos conferidos com EXPLAIN ANALYZE):
+--
+--   usuarios  email = / email = and telefone = / email = and senha =
+--                               -> usuarios_email_key (único: no máximo 1 linha; o resto vira filtro)
+--             telefone =        -> usuarios_telefone_key
+--             id > ... order by id limit n (manutenção) / update|delete por id -> pkey
+--   presencas rota = order by data_hora         -> presencas_rota_data_hora_idx
+--             delete rota = and email =         -> presencas_rota_email_idx
+--             delete rota = (virada do ciclo)   -> presencas_rota_data_hora_idx
+--   config    key = / upsert on conflict (key)  -> config_pkey
+--   conferencia ciclo = / upsert (ciclo, email) -> conferencia_pkey
+--   estatisticas_ciclo rota = order by ciclo desc limit n -> estatisticas_ciclo_pkey
+--   estatisticas_usuario email in (...) / order by confirmacoes desc -> pkey / _confirmacoes_idx
+--
+-- Faltavam os dois abaixo.
+
+-- limpeza da conferência: ciclo like '<rota>|%' and ciclo <> atual. O índice da
+-- chave primária (collation do banco) não atende LIKE por prefixo; text_pattern_ops atende.
+create index concurrently if not exists conferencia_ciclo_prefixo_idx on conferencia (ciclo text_pattern_ops);
+
+-- painel do ADM sem filtro de rota: ciclos mais recentes de todas as rotas
+create index concurrently if not exists estatisticas_ciclo_ciclo_idx on estatisticas_ciclo (ciclo desc);
@@ -0,0 +1,60 @@
+-- ==========================================================
+-- EDIÇÃO DE CADASTRO NUMA CHAMADA (rota/usuarios.py: atualizar_perfil)
+-- ==========================================================
+-- "SALVAR E ENTRAR" (senha temporária) e "EDITAR CADASTRO" (Recuperar) chamam
+-- esta função pelo PostgREST (POST /rpc/atualizar_perfil): checagem de telefone
+-- de outro cadastro, update e limpeza da senha temporária numa só transação.
+--
+-- Telefone de outro cadastro -> 23505 com o nome do índice único
+-- (usuarios_telefone_key), a mesma mensagem que rota/db.py:conflito_unico
+-- reconhece no insert do cadastro. O índice de 0002 continua sendo a garantia
+-- contra duas edições simultâneas; a checagem explícita cobre bancos sem ele.
+-- Senha vazia/nula mantém a atual. Devolve a linha atualizada (nenhuma se id e
+-- e-mail não baterem).
+
+create or replace function atualizar_perfil(
+  p_id         bigint,
+  p_email      text,
+  p_nome       text,
+  p_graduacao  text,
+  p_lotacao    text,
+  p_origem     text,
+  p_telefone   text,
+  p_senha      text default null
+) returns setof usuarios
+language plpgsql
+as $$
+begin
+  if exists (select 1 from usuarios where telefone = p_telefone and id <> p_id) then
+    raise exception 'duplicate key value violates unique constraint "usuarios_telefone_key"'
+      using errcode = 'unique_violation';
+  end if;
+
+  return query
+    update usuarios set
+      nome        = p_nome,
+      graduacao   = p_graduacao,
+      lotacao     = p_lotacao,
+      origem      = p_origem,
+      telefone    = p_telefone,
+      senha       = coalesce(nullif(p_senha, ''), senha),
+      temp_senha  = null,
+      temp_expira = null,
+      temp_usada  = true
+    where id = p_id and email = lower(btrim(p_email))
+    returning *;
+end;
+$$;
+
+-- troca senha: só o app (service_role) chama
+revoke execute on function atualizar_perfil(bigint, text, text, text, text, text, text, text) from public;
+do $$
+begin
+  if exists (select 1 from pg_roles where rolname = 'service_role') then
+    grant execute on function atualizar_perfil(bigint, text, text, text, text, text, text, text) to service_role;
+  end if;
+end;
+$$;
+
+-- PostgREST relê o esquema (a função nova aparece em /rpc sem reiniciar)
+notify pgrst, 'reload schema';
@@ -0,0 +1,129 @@
+-- ==========================================================
+-- LIMPEZA EM LOTES (rota/manutencao.py: limpar)
+-- ==========================================================
+-- Três varreduras que o app fazia de forma implícita (ou nunca fazia), cada uma
+-- um comando set-based por chamada (POST /rpc/<nome>):
+--
+--   manutencao_senhas_temp       senha temporária usada, vencida ou sem validade
+--                                -> temp_senha/temp_expira nulos, temp_usada = true
+--   manutencao_pendentes         cadastro PENDENTE há mais de p_dias -> apagado
+--                                (deixa de contar no limite de usuários)
+--   manutencao_presencas_orfas   presença de usuário que não existe mais (🗑️ do ADM)
+--                                -> apagada; devolve quantas por rota
+--
+-- p_aplicar = false (dry-run): só conta, sem limite. p_aplicar = true: altera no
+-- máximo p_lote linhas e devolve quantas; quem chama repete até vir menos que o
+-- lote. "for update skip locked": não espera linha que o app está gravando (ela
+-- fica para a próxima chamada) e dois executores ao mesmo tempo não se atrapalham.
+
+create or replace function manutencao_senhas_temp(
+  p_lote     integer default 1000,
+  p_aplicar  boolean default false
+) returns integer
+language plpgsql
+as $$
+declare
+  n integer;
+begin
+  if not p_aplicar then
+    select count(*) into n from usuarios
+     where coalesce(temp_senha, '') <> ''
+       and (temp_usada or temp_expira is null or temp_expira < now());
+    return n;
+  end if;
+
+  with alvo as (
+    select id from usuarios
+     where coalesce(temp_senha, '') <> ''
+       and (temp_usada or temp_expira is null or temp_expira < now())
+     order by id
+     limit p_lote
+     for update skip locked
+  )
+  update usuarios u set temp_senha = null, temp_expira = null, temp_usada = true
+    from alvo
+   where u.id = alvo.id;
+  get diagnostics n = row_count;
+  return n;
+end;
+$$;
+
+create or replace function manutencao_pendentes(
+  p_dias     integer default 30,
+  p_lote     integer default 1000,
+  p_aplicar  boolean default false
+) returns integer
+language plpgsql
+as $$
+declare
+  n integer;
+begin
+  if not p_aplicar then
+    select count(*) into n from usuarios
+     where status = 'PENDENTE' and created_at < now() - make_interval(days => p_dias);
+    return n;
+  end if;
+
+  with alvo as (
+    select id from usuarios
+     where status = 'PENDENTE' and created_at < now() - make_interval(days => p_dias)
+     order by id
+     limit p_lote
+     for update skip locked
+  )
+  delete from usuarios u using alvo where u.id = alvo.id;
+  get diagnostics n = row_count;
+  return n;
+end;
+$$;
+
+-- órfã: usuario_id que não existe mais; linhas antigas sem usuario_id, pelo e-mail
+create or replace function manutencao_presencas_orfas(
+  p_lote     integer default 1000,
+  p_aplicar  boolean default false
+) returns table (rota text, apagadas integer)
+language plpgsql
+as $$
+#variable_conflict use_column
+begin
+  if not p_aplicar then
+    return query
+      select p.rota, count(*)::integer from presencas p
+       where case when p.usuario_id is not null
+                  then not exists (select 1 from usuarios u where u.id = p.usuario_id)
+                  else not exists (select 1 from usuarios u where u.email = p.email) end
+       group by p.rota;
+    return;
+  end if;
+
+  return query
+    with alvo as (
+      select p.id from presencas p
+       where case when p.usuario_id is not null
+                  then not exists (select 1 from usuarios u where u.id = p.usuario_id)
+                  else not exists (select 1 from usuarios u where u.email = p.email) end
+       order by p.id
+       limit p_lote
+       for update skip locked
+    ), feitas as (
+      delete from presencas p using alvo where p.id = alvo.id returning p.rota
+    )
+    select f.rota, count(*)::integer from feitas f group by f.rota;
+end;
+$$;
+
+-- apagam cadastros: só o app / a linha de comando (service_role) chamam
+revoke execute on function manutencao_senhas_temp(integer, boolean) from public;
+revoke execute on function manutencao_pendentes(integer, integer, boolean) from public;
+revoke execute on function manutencao_presencas_orfas(integer, boolean) from public;
+do $$
+begin
+  if exists (select 1 from pg_roles where rolname = 'service_role') then
+    grant execute on function manutencao_senhas_temp(integer, boolean) to service_role;
+    grant execute on function manutencao_pendentes(integer, integer, boolean) to service_role;
+    grant execute on function manutencao_presencas_orfas(integer, boolean) to service_role;
+  end if;
+end;
+$$;
+
+notify pgrst, 'reload schema';
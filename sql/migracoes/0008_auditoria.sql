@@ -0,0 +1,40 @@
+-- ==========================================================
+-- TRILHA DE AUDITORIA (rota/auditoria.py)
+-- ==========================================================
+-- Ações do ADM (liberar, 🗑️, ativar todos, limite, rotas) e dos usuários
+-- (confirmar/excluir presença, editar cadastro). O app grava em lotes (insert
+-- de várias linhas); o painel do ADM pagina por id decrescente (keyset):
+--   ... order by id desc limit n               -> auditoria_pkey
+--   ... where id < :ultimo order by id desc    -> auditoria_pkey
+--   ... where acao = / ator = ... id < ...     -> auditoria_acao_idx / auditoria_ator_idx
+--
+-- Só acrescenta: update e delete são recusados pelo gatilho (também para o
+-- service_role do app). Limpar de verdade, só como dono da tabela, com
+-- "alter table auditoria disable trigger auditoria_so_insere".
+
+create table if not exists auditoria (
+  id        bigint generated by default as identity primary key,
+  em        timestamptz not null default now(),   -- quando a ação aconteceu (não quando foi gravada)
+  ator      text not null,                        -- e-mail do usuário ou 'ADM'
+  acao      text not null,
+  alvo      text,                                 -- e-mail do usuário afetado, id da rota...
+  rota      text,
+  detalhes  jsonb
+);
+
+create index if not exists auditoria_acao_idx on auditoria (acao, id desc);
+create index if not exists auditoria_ator_idx on auditoria (ator, id desc);
+
+create or replace function auditoria_so_insere() returns trigger
+language plpgsql
+as $$
+begin
+  raise exception 'auditoria: só insert (% recusado)', tg_op
+    using errcode = 'insufficient_privilege';
+end;
+$$;
+
+drop trigger if exists auditoria_so_insere on auditoria;
+create trigger auditoria_so_insere
+  before update or delete on auditoria
+  for each statement execute function auditoria_so_insere();
@@ -0,0 +1,65 @@
+-- ==========================================================
+-- FILA DE AVISOS (rota/avisos.py)
+-- ==========================================================
+-- Quem sai do excedente e ganha vaga (alguém da lista excluiu a presença) é
+-- avisado sem precisar recarregar a página. A ordenação de cada versão da
+-- lista compara os assentos com os da versão anterior e enfileira um aviso
+-- por promoção; várias réplicas podem detectar a mesma promoção:
+--   chave única + "on conflict do nothing"  -> um aviso por promoção
+--     (chave = promocao|<rota>|<email>|<data_hora da confirmação>)
+--
+-- Entrega em lotes (avisos_pegar): cada chamada reserva até p_lote avisos
+-- pendentes ("for update skip locked" + pego_em), então dois entregadores ao
+-- mesmo tempo não mandam o mesmo aviso. Aviso que falhou (ou cujo entregador
+-- caiu no meio) volta a ser pego depois de p_prazo segundos, até p_max
+-- tentativas; o último erro fica em `erro`.
+
+create table if not exists avisos (
+  id          bigint generated by default as identity primary key,
+  chave       text not null unique,
+  canal       text not null default 'email',
+  destino     text not null,                       -- e-mail
+  assunto     text not null,
+  corpo       text not null,
+  criado_em   timestamptz not null default now(),
+  tentativas  integer not null default 0,
+  pego_em     timestamptz,
+  enviado_em  timestamptz,
+  erro        text
+);
+
+-- só os pendentes (a tabela cresce com os enviados)
+create index if not exists avisos_pendentes_idx on avisos (id) where enviado_em is null;
+
+create or replace function avisos_pegar(
+  p_lote   integer default 50,
+  p_max    integer default 5,
+  p_prazo  integer default 300
+) returns setof avisos
+language sql
+as $$
+  with alvo as (
+    select id from avisos
+     where enviado_em is null
+       and tentativas < p_max
+       and (pego_em is null or pego_em < now() - make_interval(secs => p_prazo))
+     order by id
+     limit p_lote
+     for update skip locked
+  )
+  update avisos a set pego_em = now(), tentativas = a.tentativas + 1
+    from alvo
+   where a.id = alvo.id
+  returning a.*;
+$$;
+
+revoke execute on function avisos_pegar(integer, integer, integer) from public;
+do $$
+begin
+  if exists (select 1 from pg_roles where rolname = 'service_role') then
+    grant execute on function avisos_pegar(integer, integer, integer) to service_role;
+  end if;
+end;
+$$;
+
+notify pgrst, 'reload schema';
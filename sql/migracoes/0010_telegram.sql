@@ -0,0 +1,39 @@
+-- ==========================================================
+-- AVISOS DE ABERTURA/FECHAMENTO PELO TELEGRAM (rota/telegram.py)
+-- ==========================================================
+-- Quem manda /avisos ao bot entra em telegram_inscritos (uma linha por rota);
+-- /parar, ou o bot bloqueado (403), tira. A cada mudança de estado da lista
+-- (regras de rota/ciclo.py) o transmissor cria uma transmissão e manda a
+-- mensagem aos inscritos da rota em ordem de chat_id (keyset):
+--   ... where rota = :r and chat_id > :ultimo_chat order by chat_id limit n
+--                                           -> telegram_inscritos_pkey
+--
+-- chave = <rota>|aberta|fechada|<ciclo>: a mesma mudança vista de novo (reinício,
+-- outra réplica) não cria segunda transmissão. `ultimo_chat` é o progresso
+-- gravado: depois de um reinício a transmissão continua de onde parou.
+
+create table if not exists telegram_inscritos (
+  rota       text not null,
+  chat_id    bigint not null,
+  criado_em  timestamptz not null default now(),
+  primary key (rota, chat_id)
+);
+
+create index if not exists telegram_inscritos_chat_idx on telegram_inscritos (chat_id);
+
+create table if not exists telegram_transmissoes (
+  chave         text primary key,
+  rota          text not null,
+  texto         text not null,
+  criada_em     timestamptz not null default now(),
+  ultimo_chat   bigint,                  -- null: ninguém atendido ainda
+  enviadas      integer not null default 0,
+  falhas        integer not null default 0,
+  concluida_em  timestamptz
+);
+
+-- só as pendentes (uma por mudança de estado; a tabela cresce devagar)
+create index if not exists telegram_transmissoes_pendentes_idx
+  on telegram_transmissoes (criada_em) where concluida_em is null;
+
+notify pgrst, 'reload schema';
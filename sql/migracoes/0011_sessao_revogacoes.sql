@@ -0,0 +1,54 @@
+-- ==========================================================
+-- REVOGAÇÃO DE SESSÕES (rota/sessao.py)
+-- ==========================================================
+-- Uma linha por usuário com o instante (ms) da última revogação: token
+-- emitido antes disso não vale mais. Antes era um JSON único no config
+-- ("sessao_revogacoes") regravado inteiro a cada revogação; duas revogações
+-- ao mesmo tempo podiam perder uma. Agora cada revogação é um upsert da
+-- própria linha (sessao_revogar), atômico:
+--   on conflict (usuario) do update set revogado_em = greatest(...)
+-- e a conferência do token lê só a linha do usuário, no primário:
+--   select revogado_em from sessao_revogacoes where usuario = :u
+--                                        -> sessao_revogacoes_pkey
+
+create table if not exists sessao_revogacoes (
+  usuario      text primary key,          -- id do usuário (texto, como no token)
+  revogado_em  bigint not null            -- epoch em ms
+);
+
+create or replace function sessao_revogar(
+  p_usuario   text,
+  p_em        bigint,
+  p_validade  bigint                      -- ms; revogações mais velhas que isso não barram mais nada
+) returns void
+language sql
+as $$
+  insert into sessao_revogacoes (usuario, revogado_em)
+  values (p_usuario, p_em)
+  on conflict (usuario) do update
+    set revogado_em = greatest(sessao_revogacoes.revogado_em, excluded.revogado_em);
+
+  -- os tokens dessas já expiraram
+  delete from sessao_revogacoes where revogado_em < p_em - p_validade;
+$$;
+
+revoke execute on function sessao_revogar(text, bigint, bigint) from public;
+do $$
+begin
+  if exists (select 1 from pg_roles where rolname = 'service_role') then
+    grant execute on function sessao_revogar(text, bigint, bigint) to service_role;
+  end if;
+end;
+$$;
+
+-- revogações ainda gravadas no formato antigo
+insert into sessao_revogacoes (usuario, revogado_em)
+select r.key, r.value::bigint
+  from config c, jsonb_each_text(c.value::jsonb) r
+ where c.key = 'sessao_revogacoes'
+on conflict (usuario) do update
+  set revogado_em = greatest(sessao_revogacoes.revogado_em, excluded.revogado_em);
+
+delete from config where key = 'sessao_revogacoes';
+
+notify pgrst, 'reload schema';
@@ -0,0 +1,40 @@
+-- ==========================================================
+-- VERSÃO DA LISTA DE PRESENÇA (rota/db.py: presenca_versao_bump)
+-- ==========================================================
+-- A versão (config "presenca_versao" / "presenca_versao:<rota>") era
+-- calculada no processo e gravada com um upsert cego: duas réplicas, ou um
+-- relógio atrasado, podiam gravar uma versão menor ou igual depois de uma
+-- maior, e clientes com a versão "nova" ficavam sem ver a lista mudada (304 /
+-- cache por versão / guarda de atraso da réplica).
+--
+-- Agora o incremento é um só comando no banco, com o lock da linha do config:
+--   nova = greatest(atual + 1, p_minimo)
+-- sempre maior que a anterior, qualquer que seja o relógio de quem chama.
+-- p_minimo (epoch em ms) só mantém o formato dos valores já gravados.
+
+create or replace function presenca_versao_bump(
+  p_chave   text,
+  p_minimo  bigint default 0
+) returns bigint
+language sql
+as $$
+  insert into config (key, value)
+  values (p_chave, greatest(p_minimo, 1)::text)
+  on conflict (key) do update
+    set value = greatest(
+      case when config.value ~ '^[0-9]+$' then config.value::bigint else 0 end + 1,
+      p_minimo
+    )::text
+  returning value::bigint;
+$$;
+
+revoke execute on function presenca_versao_bump(text, bigint) from public;
+do $$
+begin
+  if exists (select 1 from pg_roles where rolname = 'service_role') then
+    grant execute on function presenca_versao_bump(text, bigint) to service_role;
+  end if;
+end;
+$$;
+
+notify pgrst, 'reload schema';
@@ -0,0 +1,33 @@
+-- migracao: sem transacao
+-- ==========================================================
+-- UMA PRESENÇA POR PESSOA E ROTA
+-- ==========================================================
+-- A checagem de duplicidade do app (lê a lista, depois insere pelo lote de
+-- confirmacao.py) deixa passar dois cliques/retries simultâneos da mesma
+-- pessoa: as duas linhas entravam e ocupavam dois lugares no ranking. O índice
+-- único fecha a corrida no banco; a segunda linha recebe 23505 e o app
+-- responde "Presença já registrada." (rota/db.py: UNICO_PRESENCA).
+--
+-- Substitui presencas_rota_email_idx (0004): mesmas colunas, agora único,
+-- serve ao cancelamento (rota = and email =) do mesmo jeito.
+--
+-- Sem transação (concurrently): cada comando pode rodar de novo.
+
+-- duplicatas que já existem: fica a confirmação mais antiga
+delete from presencas p
+ using presencas q
+ where p.rota = q.rota and p.email = q.email
+   and (p.data_hora, p.id) > (q.data_hora, q.id);
+
+-- tentativa anterior que falhou (duplicata chegou no meio) deixa o índice INVALID
+do $$
+begin
+  if exists (select 1 from pg_index where indexrelid = to_regclass('presencas_rota_email_key') and not indisvalid) then
+    drop index presencas_rota_email_key;
+  end if;
+end;
+$$;
+
+create unique index concurrently if not exists presencas_rota_email_key on presencas (rota, email);
+
+drop index concurrently if exists presencas_rota_email_idx;
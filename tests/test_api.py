@@ -0,0 +1,97 @@
+"""API (rota/api.py): /posicao só com sessão e erro 500 sem detalhes para o cliente."""
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+from benchmarks.bench_api import chamar
+from benchmarks.carga_apptest import relogio_lista_aberta
+from benchmarks.fake_supabase import FakeSupabase, semear
+from rota import api, db, sessao
+from rota.ciclo import definir_relogio
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    monkeypatch.setenv("ROTA_SESSAO_SEGREDO", "teste-api")
+    relogio = relogio_lista_aberta()
+    f = FakeSupabase(latencia_ms=(0.0, 0.0))
+    semear(f, usuarios=20, presencas=10, agora=relogio())
+    db.definir_cliente(f)
+    definir_relogio(relogio)
+    api._snapshots.clear()
+    yield f
+    api._snapshots.clear()
+    definir_relogio(None)
+    db.definir_cliente(None)
+
+
+def _get(caminho: str, headers=None, query=b""):
+    r = asyncio.run(chamar("GET", caminho, headers=headers, query=query))
+    return r["status"], json.loads(r["body"] or b"{}")
+
+
+def _inscritos(fake) -> list:
+    inscritos = {p["email"] for p in fake.linhas("presencas")}
+    return [u for u in fake.linhas("usuarios") if u["status"] == "ATIVO" and u["email"] in inscritos]
+
+
+def test_posicao_exige_sessao(fake):
+    alvo = _inscritos(fake)[0]["email"]
+    assert _get("/posicao", query=f"email={alvo}".encode())[0] == 401
+    assert _get("/posicao", headers={"Authorization": "Bearer lixo"})[0] == 401
+    assert _get("/posicao", headers={"Authorization": "Basic abc"})[0] == 401
+
+
+def test_posicao_usa_o_email_do_token(fake):
+    eu, outro = _inscritos(fake)[:2]
+    status, corpo = _get("/posicao", headers={"Authorization": f"Bearer {sessao.emitir(eu)}"},
+                         query=f"email={outro['email']}".encode())
+    assert status == 200
+    assert corpo["email"] == eu["email"] and corpo["registrado"]
+
+
+def test_erro_interno_nao_vaza_detalhes(fake, monkeypatch, caplog):
+    def quebrar(*args, **kwargs):
+        raise RuntimeError("senha do banco: hunter2")
+
+    monkeypatch.setattr(api, "_despachar", quebrar)
+    with caplog.at_level("ERROR", logger=api.__name__):
+        status, corpo = _get("/posicao")
+    assert status == 500 and corpo == {"erro": "Erro interno."}
+    assert "hunter2" in caplog.text
+
+
+def test_confirmacoes_simultaneas_da_mesma_pessoa_ocupam_um_lugar(fake, monkeypatch):
+    inscritos = {p["email"] for p in fake.linhas("presencas")}
+    u = next(u for u in fake.linhas("usuarios") if u["status"] == "ATIVO" and u["email"] not in inscritos)
+    ler = api.presenca_select
+    juntos = threading.Barrier(2, timeout=5)
+
+    def ler_ao_mesmo_tempo(*args, **kwargs):
+        # os dois pedidos leem a lista antes de qualquer um inserir (clique duplo / retry)
+        linhas = ler(*args, **kwargs)
+        juntos.wait()
+        return linhas
+
+    monkeypatch.setattr(api, "presenca_select", ler_ao_mesmo_tempo)
+    monkeypatch.setattr(api.auditoria, "registrar", lambda *a, **k: None)
+    token = sessao.emitir(u)
+    resultados = []
+
+    def confirmar():
+        try:
+            resultados.append(api.confirmar({"sessao": token}))
+        except api.ErroAPI as ex:
+            resultados.append((ex.status, ex.mensagem))
+
+    ts = [threading.Thread(target=confirmar) for _ in range(2)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    assert (409, "Presença já registrada.") in resultados
+    assert sum(1 for r in resultados if isinstance(r, dict) and r["registrado"]) == 1
+    assert [p["email"] for p in fake.linhas("presencas")].count(u["email"]) == 1
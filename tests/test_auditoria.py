@@ -0,0 +1,114 @@
+"""Buffer da auditoria (rota/auditoria.py): fechamento, buffer cheio e banco fora do ar."""
+
+import threading
+import time
+
+import pytest
+
+from benchmarks.fake_supabase import FakeAPIError
+from rota import auditoria
+from rota.auditoria import BufferAuditoria
+
+
+class Banco:
+    """`gravar` de mentira: guarda os lotes; com `fora` setado responde 503."""
+
+    def __init__(self, atraso: float = 0.0):
+        self.atraso = atraso
+        self.fora = threading.Event()
+        self.lotes = []
+        self.tentativas = 0
+
+    def __call__(self, rows):
+        self.tentativas += 1
+        time.sleep(self.atraso)
+        if self.fora.is_set():
+            raise FakeAPIError("503 Service Unavailable", "503")
+        self.lotes.append([r["i"] for r in rows])
+
+    def gravados(self) -> list:
+        return [i for lote in self.lotes for i in lote]
+
+
+def _esperar(cond, timeout: float = 5.0):
+    limite = time.monotonic() + timeout
+    while not cond() and time.monotonic() < limite:
+        time.sleep(0.005)
+    assert cond()
+
+
+@pytest.fixture
+def banco():
+    return Banco()
+
+
+def test_fechar_grava_o_que_ficou_no_buffer(banco):
+    buf = BufferAuditoria(lote=200, intervalo=60.0, gravar=banco)
+    for i in range(150):
+        buf.registrar({"i": i})
+    time.sleep(0.05)
+    # nem lote cheio nem intervalo vencido: nada foi ao banco ainda
+    assert banco.lotes == []
+    assert buf.fechar(timeout=5.0)
+    assert banco.gravados() == list(range(150))
+    assert buf.pendentes() == 0
+
+
+def test_buffer_auditoria_fecha_no_fim_do_processo(monkeypatch):
+    registrados = []
+    monkeypatch.setattr(auditoria.atexit, "register", registrados.append)
+    auditoria.buffer_auditoria.clear()
+    try:
+        b = auditoria.buffer_auditoria()
+        assert registrados == [b.fechar]
+    finally:
+        auditoria.buffer_auditoria.clear()
+
+
+def test_lote_cheio_grava_sem_esperar_o_intervalo(banco):
+    buf = BufferAuditoria(capacidade=1000, lote=100, intervalo=60.0, gravar=banco)
+    for i in range(350):
+        buf.registrar({"i": i})
+    _esperar(lambda: len(banco.gravados()) >= 300)
+    assert all(len(lote) <= 100 for lote in banco.lotes)
+    assert buf.fechar(timeout=5.0)
+    assert banco.gravados() == list(range(350))
+
+
+def test_buffer_cheio_descarta_os_mais_antigos(banco):
+    banco.fora.set()
+    buf = BufferAuditoria(capacidade=50, lote=1000, intervalo=60.0, gravar=banco)
+    t0 = time.perf_counter()
+    for i in range(80):
+        buf.registrar({"i": i})
+    assert time.perf_counter() - t0 < 1.0, "registrar bloqueou"
+    assert buf.pendentes() == 50 and buf.descartados == 30
+    banco.fora.clear()
+    assert buf.fechar(timeout=5.0)
+    assert banco.gravados() == list(range(30, 80))
+
+
+def test_banco_fora_devolve_ao_buffer_e_grava_quando_volta(banco):
+    banco.fora.set()
+    buf = BufferAuditoria(capacidade=500, lote=100, intervalo=0.05, gravar=banco)
+    for i in range(800):
+        buf.registrar({"i": i})
+    _esperar(lambda: banco.tentativas >= 2)
+    # as tentativas recusadas não perdem nem reordenam nada além do descarte da capacidade
+    assert buf.pendentes() == 500 and buf.descartados == 300
+    assert banco.lotes == []
+    banco.fora.clear()
+    _esperar(lambda: buf.pendentes() == 0)
+    assert buf.fechar(timeout=5.0)
+    assert banco.gravados() == list(range(300, 800))
+
+
+def test_fechar_com_o_banco_fora_nao_trava(banco):
+    banco.fora.set()
+    buf = BufferAuditoria(lote=10, intervalo=60.0, gravar=banco)
+    for i in range(5):
+        buf.registrar({"i": i})
+    t0 = time.perf_counter()
+    assert not buf.fechar(timeout=0.5)
+    assert time.perf_counter() - t0 < 2.0
+    assert buf.pendentes() == 5
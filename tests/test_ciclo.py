@@ -0,0 +1,75 @@
+"""Regras de ciclo (rota/ciclo.py): janelas sempre dentro do dia e datas do banco em qualquer Python."""
+
+import re
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from rota import ciclo
+from rota.ciclo import ciclo_expirado, marco_do_ciclo, obter_ciclo_atual, parse_dt, status_lista
+from rota.configuracao import montar
+from rota.constantes import FUSO_BR
+from rota.modelos import Rota
+from rota.ordenacao import montar_linhas_presenca
+
+
+def _rota(saidas) -> Rota:
+    return Rota(id="x", nome="x", vagas=10, saidas=saidas)
+
+
+@pytest.mark.parametrize("saidas", [("06:30", "23:45"), ("00:30", "18:30"), ("06:30", "23:30"), ("01:29", "18:30")])
+def test_saida_com_janela_fora_do_dia_e_recusada(saidas):
+    with pytest.raises(ValueError):
+        _rota(saidas).validar()
+
+
+def test_rota_invalida_no_config_fica_de_fora():
+    cfg = montar([{"key": "rota:x", "value": '{"nome": "x", "vagas": 10, "saidas": ["06:30", "23:45"]}'}])
+    assert [r.id for r in cfg.rotas] != ["x"]
+
+
+def test_saidas_nos_limites_funcionam_a_semana_toda():
+    r = _rota(("01:30", "23:29"))
+    r.validar()
+    inicio = FUSO_BR.localize(datetime(2026, 10, 19, 0, 0))   # segunda
+    for minutos in range(0, 7 * 24 * 60, 7):
+        agora = inicio + timedelta(minutes=minutos)
+        status_lista(agora, r)
+        obter_ciclo_atual(r, agora)
+        assert marco_do_ciclo(agora, r) <= agora
+
+
+def test_marco_da_madrugada_e_do_dia_anterior():
+    r = _rota(("01:30", "23:29"))
+    agora = FUSO_BR.localize(datetime(2026, 10, 20, 0, 10))
+    assert marco_do_ciclo(agora, r) == FUSO_BR.localize(datetime(2026, 10, 19, 23, 49))
+
+
+class _DatetimeAntigo(datetime):
+    """`fromisoformat` como antes do Python 3.11: só fração de 3 ou 6 dígitos e fuso +HH:MM."""
+
+    @classmethod
+    def fromisoformat(cls, s):
+        if re.search(r"\.(\d{1,2}|\d{4,5})(?!\d)", s) or re.search(r"[+-]\d\d$", s):
+            raise ValueError(f"Invalid isoformat string: {s!r}")
+        return super().fromisoformat(s)
+
+
+@pytest.fixture(params=["atual", "antes do 3.11"])
+def python(request, monkeypatch):
+    if request.param != "atual":
+        monkeypatch.setattr(ciclo, "datetime", _DatetimeAntigo)
+    return request.param
+
+
+def test_parse_dt_aceita_fracao_de_5_digitos(python):
+    dt = parse_dt("2026-10-19T10:00:00.12345+00:00")
+    assert dt == datetime(2026, 10, 19, 10, 0, 0, 123450, tzinfo=timezone.utc)
+    assert parse_dt("2026-10-19 10:00:00.1+00") == datetime(2026, 10, 19, 10, 0, 0, 100000, tzinfo=timezone.utc)
+
+
+def test_lista_com_fracao_de_5_digitos_vira_e_mostra_a_hora(python):
+    rows = [{"data_hora": "2026-10-19T09:00:00.12345+00:00", "email": "a@x"}]   # 06:00 em Brasília
+    agora = FUSO_BR.localize(datetime(2026, 10, 19, 19, 0))                      # depois do marco das 18:50
+    assert ciclo_expirado(rows, agora=agora)
+    assert montar_linhas_presenca(rows)[1][0] == "19/10/2026 06:00:00"
@@ -0,0 +1,116 @@
+"""Group commit das confirmações (rota/confirmacao.py): timeout, liderança e falhas do lote."""
+
+import threading
+import time
+
+import pytest
+
+from benchmarks.fake_supabase import FakeAPIError
+from rota import confirmacao
+from rota.confirmacao import LoteConfirmacoes
+
+
+class Banco:
+    """presenca_insert_lote / presenca_insert de mentira: registra as linhas gravadas."""
+
+    def __init__(self, atraso: float = 0.0, erro=None):
+        self.atraso = atraso
+        self.erro = erro
+        self.lotes = []
+        self.individuais = []
+
+    def lote(self, rows):
+        time.sleep(self.atraso)
+        if self.erro is not None:
+            raise self.erro
+        self.lotes.append([r["email"] for r in rows])
+        return [dict(r, id=i) for i, r in enumerate(rows)]
+
+    def uma(self, row):
+        if row["email"] == "ruim":
+            raise FakeAPIError("null value violates not-null constraint", "23502")
+        self.individuais.append(row["email"])
+        return [dict(row)]
+
+    def gravadas(self) -> list:
+        return [e for lote in self.lotes for e in lote] + self.individuais
+
+
+@pytest.fixture
+def banco(monkeypatch):
+    b = Banco()
+    monkeypatch.setattr(confirmacao, "presenca_insert_lote", b.lote)
+    monkeypatch.setattr(confirmacao, "presenca_insert", b.uma)
+    return b
+
+
+def _row(email: str) -> dict:
+    return {"email": email, "data_hora": f"2026-10-19T07:00:00.{len(email):06d}"}
+
+
+def _em_thread(fn, *args, **kw):
+    out = {}
+
+    def rodar():
+        try:
+            out["resultado"] = fn(*args, **kw)
+        except Exception as ex:
+            out["erro"] = ex
+
+    t = threading.Thread(target=rodar)
+    t.start()
+    return t, out
+
+
+def test_timeout_na_fila_nao_trava_o_lote(banco):
+    # um insert lento (backoff do sb_call) mais longo que o timeout de quem espera
+    banco.atraso = 0.5
+    lote = LoteConfirmacoes(max_lote=1)
+    lider, r_lider = _em_thread(lote.inserir, _row("lider"))
+    time.sleep(0.05)
+    seguidores = [_em_thread(lote.inserir, _row(f"seguidor{i}"), timeout=0.1) for i in range(2)]
+    for t, out in seguidores:
+        t.join(2)
+        assert isinstance(out.get("erro"), TimeoutError)
+    lider.join(2)
+    assert "erro" not in r_lider
+
+    # quem desistiu saiu da fila e ninguém ficou como líder fantasma
+    assert lote._fila == [] and lote._conduzindo is False
+    banco.atraso = 0.0
+    assert lote.inserir(_row("depois"), timeout=1.0)
+    # as linhas de quem desistiu nunca foram gravadas
+    assert banco.gravadas() == ["lider", "depois"]
+
+
+def test_seguidor_no_lote_em_gravacao_espera_o_resultado(banco):
+    banco.atraso = 0.3
+    lote = LoteConfirmacoes(max_lote=10, janela=0.05, pico=10.0)
+    lote._ultima_chegada = time.monotonic()   # em pico: o líder espera a janela
+    lider, _ = _em_thread(lote.inserir, _row("lider"))
+    time.sleep(0.01)
+    # entra no lote do líder e dá timeout no meio do insert: não pode desistir
+    seguidor, r = _em_thread(lote.inserir, _row("seguidor"), timeout=0.1)
+    lider.join(2)
+    seguidor.join(2)
+    assert "erro" not in r and r["resultado"][0]["email"] == "seguidor"
+    assert banco.gravadas() == ["lider", "seguidor"]
+
+
+def test_erro_de_transporte_falha_o_lote_sem_repetir_linha_a_linha(banco):
+    banco.erro = FakeAPIError("503 Service Unavailable", "503")
+    lote = LoteConfirmacoes()
+    pedidos = [confirmacao._Pedido(_row(e)) for e in ("a", "bb", "ccc")]
+    lote._gravar(pedidos)
+    assert all(isinstance(p.erro, FakeAPIError) for p in pedidos)
+    assert banco.individuais == []
+
+
+def test_linha_invalida_desfaz_o_lote(banco):
+    banco.erro = FakeAPIError("null value violates not-null constraint", "23502")
+    lote = LoteConfirmacoes()
+    pedidos = [confirmacao._Pedido(_row(e)) for e in ("a", "ruim", "ccc")]
+    lote._gravar(pedidos)
+    assert banco.individuais == ["a", "ccc"]
+    erros = {p.row["email"]: p.erro for p in pedidos}
+    assert erros["ruim"] is not None and erros["a"] is None and erros["ccc"] is None
@@ -0,0 +1,77 @@
+"""Migrações (rota/migracoes.py): só as pendentes, em ordem; fora de ordem não roda."""
+
+import contextlib
+import re
+
+import pytest
+
+from rota import migracoes
+from rota.migracoes import aplicar, listar, status
+
+
+class Conexao:
+    """Conexão de mentira: guarda o SQL executado e o `schema_migracoes`."""
+
+    def __init__(self, feitas=None):
+        self.feitas = dict(feitas or {})
+        self.executados = []
+
+    def execute(self, sql, params=None):
+        if sql.startswith("insert into schema_migracoes"):
+            self.feitas[params[0]] = params[2]
+        elif not sql.startswith("select versao"):
+            self.executados.append(sql)
+        return self
+
+    def fetchall(self):
+        return list(self.feitas.items())
+
+    @contextlib.contextmanager
+    def transaction(self):
+        yield
+
+
+def _migs():
+    return listar()
+
+
+def test_aplica_so_as_pendentes_em_ordem():
+    migs = _migs()
+    conn = Conexao({m.versao: m.sha256 for m in migs[:3]})
+    feitas = aplicar(conn, migs, log=lambda *_: None)
+    assert feitas == [m.versao for m in migs[3:]]
+    assert {s for _, _, s in status(conn, migs)} == {"aplicada"}
+
+
+def test_pendente_antes_da_ultima_aplicada_nao_roda():
+    migs = _migs()
+    # banco com 0002..0004 registradas e 0001 (criada depois) pendente
+    conn = Conexao({m.versao: m.sha256 for m in migs[1:4]})
+    with pytest.raises(ValueError, match=migs[0].versao):
+        aplicar(conn, migs, log=lambda *_: None)
+    assert conn.executados == [migracoes.TABELA]
+    assert status(conn, migs)[0][2] == "pendente FORA DE ORDEM"
+
+
+def test_arquivo_alterado_depois_de_aplicado_aparece_no_status():
+    migs = _migs()
+    conn = Conexao({m.versao: m.sha256 for m in migs})
+    conn.feitas[migs[2].versao] = "0" * 64
+    assert status(conn, migs)[2][2] == "ALTERADA depois de aplicada"
+
+
+
+def test_indice_unico_concurrently_apaga_o_invalid_antes():
+    """Sem transação o arquivo pode rodar de novo: índice INVALID de uma falha não pode ficar."""
+    for m in _migs():
+        for nome in re.findall(r"create unique index concurrently if not exists (\w+)", m.sql, flags=re.I):
+            assert f"to_regclass('{nome}')" in m.sql, f"{m.versao}_{m.nome}: {nome} INVALID não é apagado"
+
+
+def test_constraint_sem_transacao_so_e_criada_se_faltar():
+    for m in _migs():
+        if m.transacao:
+            continue
+        for cmd in migracoes.comandos(m.sql):
+            if re.search(r"\badd\s+constraint\b", cmd, flags=re.I):
+                assert "pg_constraint" in cmd, f"{m.versao}_{m.nome}: add constraint não repete"
@@ -0,0 +1,51 @@
+"""Versão da lista de presença (rota/db.py): incremento atômico no banco, erro não engolido."""
+
+import threading
+
+import pytest
+
+from benchmarks.fake_supabase import FakeAPIError, FakeSupabase
+from rota import db
+
+
+@pytest.fixture
+def fake():
+    f = FakeSupabase(latencia_ms=(0.0, 2.0))
+    db.definir_cliente(f)
+    yield f
+    db.definir_cliente(None)
+
+
+def test_bumps_simultaneos_devolvem_versoes_distintas_e_crescentes(fake):
+    vistas, lock = [], threading.Lock()
+
+    def escritor():
+        for _ in range(20):
+            v = db.presenca_versao_bump("a")
+            with lock:
+                vistas.append(v)
+
+    ts = [threading.Thread(target=escritor) for _ in range(8)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    assert len(set(vistas)) == len(vistas) == 160
+    assert db.presenca_versao(rota="a") == max(vistas)
+
+
+def test_relogio_atrasado_nao_faz_a_versao_voltar(fake, monkeypatch):
+    antes = db.presenca_versao_bump("a")
+    # outra réplica com o relógio uma hora atrás
+    monkeypatch.setattr(db.time_module, "time", lambda: antes / 1000 - 3600)
+    depois = db.presenca_versao_bump("a")
+    assert depois == antes + 1 and db.presenca_versao(rota="a") == depois
+
+
+def test_falha_no_bump_sobe_para_quem_escreveu(fake, monkeypatch):
+    def fora(*args, **kwargs):
+        raise FakeAPIError("permission denied for function presenca_versao_bump", "42501")
+
+    monkeypatch.setattr(fake, "rpc", fora)
+    with pytest.raises(FakeAPIError):
+        db.presenca_delete({"email": "x@exemplo.com"}, rota="a")
@@ -0,0 +1,53 @@
+"""Revogação de sessões (rota/sessao.py): atômica por usuário e lida do primário."""
+
+import threading
+
+import pytest
+
+from benchmarks.fake_supabase import FakeReplica, FakeSupabase, semear
+from rota import db, sessao
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    monkeypatch.setenv("ROTA_SESSAO_SEGREDO", "teste-sessao")
+    f = FakeSupabase(latencia_ms=(1.0, 5.0))
+    semear(f, usuarios=30)
+    # réplica bem atrasada: a conferência não pode depender dela
+    db.definir_cliente(f, leitura=FakeReplica(f, atraso_ms=60_000))
+    yield f
+    db.definir_cliente(None)
+
+
+def _ativos(fake) -> list:
+    return [u for u in fake.linhas("usuarios") if u["status"] == "ATIVO"]
+
+
+def test_revogacoes_simultaneas_nao_se_perdem(fake):
+    us = _ativos(fake)[:20]
+    tokens = [sessao.emitir(u, agora_ms=sessao._agora_ms() - 1000) for u in us]
+    ts = [threading.Thread(target=sessao.revogar, args=(u["id"],)) for u in us]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    assert len(fake.linhas("sessao_revogacoes")) == len(us)
+    assert all(sessao.restaurar(t)[0] is None for t in tokens)
+
+
+def test_revogacao_vale_na_hora_mesmo_com_a_replica_atrasada(fake):
+    u = _ativos(fake)[0]
+    antigo = sessao.emitir(u, agora_ms=sessao._agora_ms() - 1000)
+    assert sessao.restaurar(antigo)[0] is not None
+    sessao.revogar(u["id"])
+    assert sessao.restaurar(antigo)[0] is None
+    # novo login depois da revogação volta a valer
+    assert sessao.restaurar(sessao.emitir(u, agora_ms=sessao._agora_ms() + 1))[0] is not None
+
+
+def test_revogacao_mais_velha_nao_sobrescreve_a_mais_nova(fake):
+    u = _ativos(fake)[0]
+    agora = sessao._agora_ms()
+    sessao.revogar(u["id"], agora_ms=agora)
+    sessao.revogar(u["id"], agora_ms=agora - 5000)
+    assert db.sessao_revogada_em(u["id"]) == agora